@@ -7,8 +7,11 @@ pytest_plugins = [
     "pytest_plugins.issue_handlers",
     "pytest_plugins.testimony_markers",
     "pytest_plugins.manual_skipped",
+    "pytest_plugins.ssh_metrics",
+    "pytest_plugins.hammer_metrics",
     # Fixtures
     "pytest_fixtures.api_fixtures",
+    "pytest_fixtures.cli_fixtures",
     "pytest_fixtures.xdist",
     "pytest_fixtures.broker",
     # Component Fixtures
@@ -0,0 +1,13 @@
+# Module-wide CLI Entity Fixtures
+import pytest
+
+from robottelo.cli.factory import setup_pooled_org_with_rh_repo
+
+
+@pytest.fixture(scope='module')
+def module_org_with_rh_repo():
+    """An organization with a manifest, a promoted content view with the
+    Satellite Tools repository and an activation key, checked out of the
+    entity pool when the shared functions are enabled
+    """
+    return setup_pooled_org_with_rh_repo()
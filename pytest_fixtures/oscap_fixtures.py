@@ -26,7 +26,7 @@ def oscap_content_path():
     """ Download scap content from satellite and return local path of it."""
     _, file_name = os.path.split(settings.oscap.content_path)
     local_file = f"/tmp/{file_name}"
-    ssh.download_file(settings.oscap.content_path, local_file)
+    ssh.download_file(settings.oscap.content_path, local_file, cache=True)
     return local_file
 
 
@@ -0,0 +1,155 @@
+"""Report the hammer commands timings measured with ``time -p``
+
+Enabled with ``--hammer-metrics-report PATH`` when the
+``performance.time_hammer`` setting is set, the timing of every hammer command
+run through ``robottelo.cli.base`` is recorded and, at the end of the session,
+a JSON report is written to ``PATH`` with the percentiles of the real times
+per hammer command (``hammer host list``...) and the slowest invocations.
+
+The timings of each command are also sliced in time order into
+``performance.csv_buckets_count`` buckets, whose statistics are written as CSV
+next to the report, with the ``.csv`` extension, to spot the commands slowing
+down along the session.
+
+With xdist, each worker writes its records next to the report and the
+controller merges them into the final report.
+"""
+import csv
+import json
+import logging
+import os
+
+from pytest_plugins import ssh_metrics
+from robottelo.cli import base
+from robottelo.config import settings
+
+LOGGER = logging.getLogger('robottelo')
+
+_SLOWEST_COMMANDS = 20
+_CSV_FIELDS = ('command', 'bucket', 'start', 'count', 'failed', 'p50', 'p95', 'max')
+
+
+def command_name(command):
+    """Return the hammer sub command and action of ``command``
+
+    >>> command_name('host list --search="name = host"')
+    'hammer host list'
+    """
+    return ssh_metrics.command_prefix(f'hammer {command}')
+
+
+def _summary(records):
+    real_times = sorted(record['real'] for record in records)
+    return {
+        'count': len(records),
+        'failed': sum(1 for record in records if record['return_code'] != 0),
+        'real': round(sum(real_times), 3),
+        'user': round(sum(record['user'] for record in records), 3),
+        'sys': round(sum(record['sys'] for record in records), 3),
+        'p50': round(ssh_metrics._percentile(real_times, 50), 3),
+        'p95': round(ssh_metrics._percentile(real_times, 95), 3),
+        'max': round(real_times[-1], 3),
+    }
+
+
+def _group_by_command(records):
+    groups = {}
+    for record in records:
+        groups.setdefault(command_name(record['command']), []).append(record)
+    return groups
+
+
+def build_report(records):
+    """Aggregate the ``records`` dicts into the report dict"""
+    if not records:
+        return {'total': None, 'commands': {}, 'slowest': []}
+    commands = {name: _summary(group) for name, group in _group_by_command(records).items()}
+    slowest = sorted(records, key=lambda record: record['real'], reverse=True)
+    return {
+        'total': _summary(records),
+        'commands': dict(sorted(commands.items(), key=lambda item: -item[1]['real'])),
+        'slowest': slowest[:_SLOWEST_COMMANDS],
+    }
+
+
+def build_buckets(records, buckets_count):
+    """Slice the ``records`` of each command in time order into at most
+    ``buckets_count`` buckets of the same size and return their summaries as
+    CSV rows dicts
+    """
+    rows = []
+    for name, group in sorted(_group_by_command(records).items()):
+        group.sort(key=lambda record: record['timestamp'])
+        count = min(buckets_count, len(group))
+        for bucket in range(count):
+            start = bucket * len(group) // count
+            end = (bucket + 1) * len(group) // count
+            bucket_records = group[start:end]
+            summary = _summary(bucket_records)
+            rows.append(
+                {
+                    'command': name,
+                    'bucket': bucket + 1,
+                    'start': bucket_records[0]['timestamp'],
+                    **{field: summary[field] for field in _CSV_FIELDS[3:]},
+                }
+            )
+    return rows
+
+
+class HammerMetricsRecorder:
+    """Timing hook keeping the records of the hammer commands"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append({name: getattr(record, name) for name in record.__slots__})
+
+
+def pytest_addoption(parser):
+    """Add the option enabling the hammer commands report"""
+    parser.addoption(
+        '--hammer-metrics-report',
+        default=None,
+        metavar='PATH',
+        help='Write a JSON report of the hammer commands timings to PATH, '
+        'requires the performance.time_hammer setting.',
+    )
+
+
+def pytest_configure(config):
+    """Record the hammer timings when the report is enabled"""
+    if not config.getoption('hammer_metrics_report', None):
+        return
+    config._hammer_metrics = HammerMetricsRecorder()
+    base.add_timing_hook(config._hammer_metrics)
+
+
+def pytest_unconfigure(config):
+    recorder = getattr(config, '_hammer_metrics', None)
+    if recorder is not None:
+        base.remove_timing_hook(recorder)
+
+
+def pytest_sessionfinish(session):
+    """Write the report, or the worker records when running in xdist"""
+    config = session.config
+    recorder = getattr(config, '_hammer_metrics', None)
+    if recorder is None:
+        return
+    path = config.getoption('hammer_metrics_report')
+    records = ssh_metrics.merge_worker_records(config, path, recorder.records)
+    if records is None:
+        return
+    if not records and not (settings.performance and settings.performance.time_hammer):
+        LOGGER.warning('No hammer timings recorded, performance.time_hammer is not set')
+    with open(path, 'w') as report_file:
+        json.dump(build_report(records), report_file, indent=2)
+    buckets_count = settings.performance.csv_buckets_count if settings.performance else 10
+    csv_path = f'{os.path.splitext(path)[0]}.csv'
+    with open(csv_path, 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=_CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(build_buckets(records, int(buckets_count)))
+    LOGGER.info(f'Hammer commands report written to {path} and {csv_path}')
@@ -0,0 +1,191 @@
+"""Report the time spent in the ssh commands run by the tests
+
+Enabled with ``--ssh-metrics-report PATH``, every command run through
+``robottelo.ssh`` is recorded and, at the end of the session, a JSON report
+is written to ``PATH`` with the percentiles of the command execution times
+per host, per command prefix (``hammer host list``, ``yum``...) and the tests
+which spent the most time in ssh commands.
+
+With xdist, each worker writes its records next to the report and the
+controller merges them into the final report.
+"""
+import glob
+import json
+import logging
+import os
+
+from robottelo import ssh
+
+LOGGER = logging.getLogger('robottelo')
+
+# options of the hammer command taking a value as a separate argument
+_HAMMER_VALUE_OPTIONS = ('-u', '-p', '-s', '-c', '--interactive', '--output', '--server')
+_PERCENTILES = (50, 90, 95, 99)
+_SLOWEST_TESTS = 20
+
+
+def command_prefix(cmd):
+    """Return the prefix used to group a command in the report: the program
+    name, followed by the sub command and action for hammer
+
+    >>> command_prefix('LANG=en_US hammer -v -u admin -p changeme host list')
+    'hammer host list'
+    """
+    tokens = iter(cmd.split())
+    for token in tokens:
+        # skip the environment variables and the time measurement
+        if '=' in token or token in ('time', '-p'):
+            continue
+        program = os.path.basename(token)
+        break
+    else:
+        return ''
+    if program != 'hammer':
+        return program
+    words = [program]
+    for token in tokens:
+        if token.startswith('-'):
+            if token in _HAMMER_VALUE_OPTIONS:
+                next(tokens, None)
+            continue
+        words.append(token)
+        if len(words) == 3:
+            break
+    return ' '.join(words)
+
+
+def _percentile(values, percentile):
+    """Nearest rank percentile of sorted ``values``"""
+    index = max(0, -(-len(values) * percentile // 100) - 1)
+    return values[index]
+
+
+def _summary(records):
+    exec_times = sorted(record['exec_time'] for record in records)
+    summary = {
+        'count': len(records),
+        'failed': sum(1 for record in records if record['return_code'] != 0),
+        'connect_time': round(sum(record['connect_time'] for record in records), 3),
+        'exec_time': round(sum(exec_times), 3),
+        'bytes_sent': sum(record['bytes_sent'] for record in records),
+        'bytes_received': sum(record['bytes_received'] for record in records),
+    }
+    for percentile in _PERCENTILES:
+        summary[f'p{percentile}'] = round(_percentile(exec_times, percentile), 3)
+    summary['max'] = round(exec_times[-1], 3)
+    return summary
+
+
+def _group(records, key):
+    groups = {}
+    for record in records:
+        groups.setdefault(key(record), []).append(record)
+    return groups
+
+
+def build_report(records):
+    """Aggregate the ``records`` dicts into the report dict"""
+    if not records:
+        return {'total': None, 'hosts': {}, 'commands': {}, 'tests': {}}
+    tests = {
+        nodeid: _summary(test_records)
+        for nodeid, test_records in _group(records, lambda record: record['nodeid']).items()
+    }
+    slowest = sorted(
+        tests.items(),
+        key=lambda item: item[1]['connect_time'] + item[1]['exec_time'],
+        reverse=True,
+    )
+    return {
+        'total': _summary(records),
+        'hosts': {
+            host: _summary(host_records)
+            for host, host_records in _group(records, lambda record: record['hostname']).items()
+        },
+        'commands': {
+            prefix: _summary(prefix_records)
+            for prefix, prefix_records in _group(
+                records, lambda record: command_prefix(record['command'])
+            ).items()
+        },
+        'tests': dict(slowest[:_SLOWEST_TESTS]),
+    }
+
+
+def merge_worker_records(config, path, records):
+    """Write the ``records`` of an xdist worker next to the report at ``path``
+    and return ``None``, or on the controller return the ``records`` extended
+    with the ones written by the workers
+
+    The workers files are removed once merged.
+    """
+    if hasattr(config, 'workerinput'):
+        with open(f'{path}.{config.workerinput["workerid"]}', 'w') as records_file:
+            json.dump(records, records_file)
+        return None
+    for records_path in glob.glob(f'{glob.escape(path)}.gw*'):
+        with open(records_path) as records_file:
+            records.extend(json.load(records_file))
+        os.remove(records_path)
+    return records
+
+
+class SSHMetricsRecorder:
+    """Command hook keeping the records of the ssh commands"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        # the prefix is only computed at the end, keep the hook cheap
+        self.records.append(
+            {
+                'hostname': record.hostname,
+                'command': record.command,
+                'connect_time': record.connect_time,
+                'exec_time': record.exec_time,
+                'bytes_sent': record.bytes_sent,
+                'bytes_received': record.bytes_received,
+                'return_code': record.return_code,
+                'nodeid': record.nodeid,
+            }
+        )
+
+
+def pytest_addoption(parser):
+    """Add the option enabling the ssh commands report"""
+    parser.addoption(
+        '--ssh-metrics-report',
+        default=None,
+        metavar='PATH',
+        help='Write a JSON report of the ssh commands latencies to PATH.',
+    )
+
+
+def pytest_configure(config):
+    """Record the ssh commands when the report is enabled"""
+    if not config.getoption('ssh_metrics_report', None):
+        return
+    config._ssh_metrics = SSHMetricsRecorder()
+    ssh.add_command_hook(config._ssh_metrics)
+
+
+def pytest_unconfigure(config):
+    recorder = getattr(config, '_ssh_metrics', None)
+    if recorder is not None:
+        ssh.remove_command_hook(recorder)
+
+
+def pytest_sessionfinish(session):
+    """Write the report, or the worker records when running in xdist"""
+    config = session.config
+    recorder = getattr(config, '_ssh_metrics', None)
+    if recorder is None:
+        return
+    path = config.getoption('ssh_metrics_report')
+    records = merge_worker_records(config, path, recorder.records)
+    if records is None:
+        return
+    with open(path, 'w') as report_file:
+        json.dump(build_report(records), report_file, indent=2)
+    LOGGER.info(f'SSH commands report written to {path}')
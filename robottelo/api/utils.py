@@ -20,6 +20,7 @@ from robottelo.constants import REPO_TYPE
 from robottelo.constants import RHEL_6_MAJOR_VERSION
 from robottelo.constants import RHEL_7_MAJOR_VERSION
 from robottelo.constants.repos import FAKE_1_YUM_REPO
+from robottelo.host_info import cached_host_query
 
 
 def call_entity_method_with_timeout(entity_callable, timeout=300, **kwargs):
@@ -617,6 +618,18 @@ def wait_for_tasks(search_query, search_rate=1, max_tries=10, poll_rate=None, po
     return tasks
 
 
+@cached_host_query()
+def get_pulp_password(hostname=None):
+    """Fetch the Pulp admin password from the pulp server configuration
+
+    :param str hostname: the Satellite hostname, ``server.hostname`` from the
+        configuration when ``None``
+    """
+    return ssh.command(
+        'grep "^default_password" /etc/pulp/server.conf | awk \'{print $2}\'', hostname=hostname
+    ).stdout[0]
+
+
 def wait_for_syncplan_tasks(repo_backend_id=None, timeout=10, repo_name=None):
     """Search the pulp tasks and identify repositories sync tasks with
     specified name or backend_identifier
@@ -632,10 +645,7 @@ def wait_for_syncplan_tasks(repo_backend_id=None, timeout=10, repo_name=None):
             .search(query={'search': f'name="{repo_name}"', 'per_page': '1000'})[0]
             .backend_identifier
         )
-    # Fetch the Pulp password
-    pulp_pass = ssh.command(
-        'grep "^default_password" /etc/pulp/server.conf | awk \'{print $2}\''
-    ).stdout[0]
+    pulp_pass = get_pulp_password()
     # Set the Timeout value
     timeup = time.time() + int(timeout) * 60
     # Search Filter to filter out the task based on backend-id and sync action
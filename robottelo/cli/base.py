@@ -1,11 +1,18 @@
 """Generic base class for cli hammer commands."""
 import logging
+import os
 import re
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 from wait_for import wait_for
 
 from robottelo import ssh
 from robottelo.cli import hammer
+from robottelo.cli import hammer_shell
 from robottelo.config import settings
 
 
@@ -58,14 +65,223 @@ class CLIDataBaseError(CLIBaseError):
     """
 
 
-class Base:
+class HammerTimingRecord:
+    """Timing of a hammer command measured with ``performance.time_hammer``,
+    passed to the timing hooks.
+
+    :ivar str hostname: the host the command ran on
+    :ivar str command: the hammer command, without the hammer options
+    :ivar float real: elapsed seconds reported by ``time -p``
+    :ivar float user: user CPU seconds reported by ``time -p``
+    :ivar float sys: system CPU seconds reported by ``time -p``
+    :ivar int return_code: the command exit status
+    :ivar float timestamp: when the command finished, seconds since the epoch
+    :ivar str nodeid: the pytest node id of the test running the command
+    """
+
+    __slots__ = (
+        'hostname',
+        'command',
+        'real',
+        'user',
+        'sys',
+        'return_code',
+        'timestamp',
+        'nodeid',
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'HammerTimingRecord({fields})'
+
+
+_timing_hooks = []
+
+
+def add_timing_hook(hook):
+    """Register a callable called with a :class:`HammerTimingRecord` after
+    each hammer command timed with ``performance.time_hammer``.
+
+    Hooks run in the thread which ran the command and must be fast.
+    """
+    _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook):
+    """Unregister a hook registered with :func:`add_timing_hook`"""
+    _timing_hooks.remove(hook)
+
+
+def _record_timing(response, command, hostname):
+    """Strip the ``time -p`` report from the stderr of the ``response`` of
+    the hammer ``command`` and call the timing hooks with its record
+    """
+    stderr, timing = hammer.parse_timing(response.stderr)
+    if timing is None:
+        return
+    response.stderr = stderr
+    if not _timing_hooks:
+        return
+    # pytest sets it to '<nodeid> (<phase>)' while a test runs
+    nodeid = os.environ.get('PYTEST_CURRENT_TEST', '').rpartition(' ')[0] or None
+    record = HammerTimingRecord(
+        hostname=hostname or settings.server.hostname,
+        command=command,
+        return_code=response.return_code,
+        timestamp=time.time(),
+        nodeid=nodeid,
+        **timing,
+    )
+    for hook in list(_timing_hooks):
+        try:
+            hook(record)
+        except Exception:
+            Base.logger.exception(f'Hammer timing hook {hook!r} failed')
+
+
+class LazyInfo(dict):
+    """The record of a new entity returned by :meth:`Base.create` when
+    ``performance.lazy_create_info`` is enabled.
+
+    It holds the fields printed by the ``create`` command, usually ``id`` and
+    ``name``, and runs ``info`` to replace them by the full record only when
+    a missing field is read or the whole record is used, e.g. iterated,
+    compared, copied or modified.
+
+    :param created: the fields printed by the ``create`` command
+    :param fetch: the function returning the full record
+    """
+
+    def __init__(self, created, fetch):
+        super().__init__(created)
+        self._fetch = fetch
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Replace the created fields by the full record, once"""
+        if self._fetch is None:
+            return
+        with self._lock:
+            if self._fetch is not None:
+                new_obj = self._fetch()
+                # stdout should be a dictionary containing the object
+                if new_obj:
+                    dict.clear(self)
+                    dict.update(self, new_obj)
+                self._fetch = None
+
+    def __missing__(self, key):
+        if self._fetch is None:
+            raise KeyError(key)
+        self._load()
+        return self[key]
+
+    def get(self, key, default=None):
+        if self._fetch is not None and not dict.__contains__(self, key):
+            self._load()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        if self._fetch is not None and not dict.__contains__(self, key):
+            self._load()
+        return dict.__contains__(self, key)
+
+    def __reduce__(self):
+        self._load()
+        return dict, (dict(self),)
+
+    def __repr__(self):
+        if self._fetch is not None:
+            return f'{type(self).__name__}({dict.__repr__(self)}, not fetched)'
+        return dict.__repr__(self)
+
+
+def _loading(name):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._load()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in (
+    '__delitem__',
+    '__eq__',
+    '__iter__',
+    '__len__',
+    '__ne__',
+    '__setitem__',
+    'clear',
+    'copy',
+    'items',
+    'keys',
+    'pop',
+    'popitem',
+    'setdefault',
+    'update',
+    'values',
+):
+    setattr(LazyInfo, _name, _loading(_name))
+del _name
+
+
+class _CommandSub:
+    """The ``command_sub`` attribute of the cli classes, kept per thread.
+
+    The methods of the cli classes set the sub-command, like create, update,
+    etc., right before building and running the command, so concurrent calls
+    on the same class from other threads must not see it.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _command_subs(self):
+        try:
+            return self._local.command_subs
+        except AttributeError:
+            # the classes bound to a server can be garbage collected
+            command_subs = self._local.command_subs = weakref.WeakKeyDictionary()
+            return command_subs
+
+    def __get__(self, cls, metaclass=None):
+        if cls is None:
+            return self
+        command_subs = self._command_subs()
+        for klass in cls.__mro__:
+            if klass in command_subs:
+                return command_subs[klass]
+        return None
+
+    def __set__(self, cls, value):
+        self._command_subs()[cls] = value
+
+
+class _CLIMeta(type):
+    """Metaclass of the cli classes"""
+
+    command_sub = _CommandSub()
+
+
+class Base(metaclass=_CLIMeta):
     """
     @param command_base: base command of hammer.
     See Subcommands section in `hammer --help` output on your Satellite.
+
+    The ``command_sub`` of a class, like create, update, etc., is specific to
+    the thread setting it, so the classes can be used concurrently. Use
+    :meth:`with_hostname` to run the commands on another server.
     """
 
     command_base = None  # each inherited instance should define this
-    command_sub = None  # specific to instance, like: create, update, etc.
     command_requires_org = False  # True when command requires organization-id
     hostname = None  # Now used for Satellite class hammer execution
 
@@ -116,6 +332,10 @@ class Base:
     def create(cls, options=None, timeout=None):
         """
         Creates a new record using the arguments passed via dictionary.
+
+        The new record is read with ``info`` right away, or only when a field
+        not printed by ``create`` is read if ``performance.lazy_create_info``
+        is enabled, see :class:`LazyInfo`.
         """
 
         cls.command_sub = 'create'
@@ -138,18 +358,23 @@ class Base:
                     raise CLIError(tmpl.format(cls.__name__))
                 info_options['organization-id'] = options['organization-id']
 
-            # organization creation can take some time
-            if cls.command_base == 'organization':
-                new_obj, _ = wait_for(
-                    lambda: cls.info(info_options),
-                    timeout=300,
-                    delay=5,
-                    silent_failure=True,
-                    handle_exception=True,
-                )
-            else:
-                new_obj = cls.info(info_options)
-
+            def fetch():
+                # organization creation can take some time
+                if cls.command_base == 'organization':
+                    new_obj, _ = wait_for(
+                        lambda: cls.info(info_options),
+                        timeout=300,
+                        delay=5,
+                        silent_failure=True,
+                        handle_exception=True,
+                    )
+                    return new_obj
+                return cls.info(info_options)
+
+            if settings.performance and settings.performance.lazy_create_info:
+                return LazyInfo(result[0], fetch)
+
+            new_obj = fetch()
             # stdout should be a dictionary containing the object
             if len(new_obj) > 0:
                 result = new_obj
@@ -212,6 +437,19 @@ class Base:
 
         return (username, password)
 
+    @classmethod
+    def _hammer_command(cls, command, user, password, output_format=None, time_hammer=False):
+        """Build the shell command line running the hammer ``command``"""
+        # add time to measure hammer performance
+        return 'LANG={} {} hammer -v {} {} {} {}'.format(
+            settings.locale,
+            'time -p' if time_hammer else '',
+            f'-u {user}' if user else "--interactive no",
+            f'-p {password}' if password else "",
+            f'--output={output_format}' if output_format else "",
+            command,
+        )
+
     @classmethod
     def execute(
         cls,
@@ -231,27 +469,39 @@ class Base:
         if settings.performance:
             time_hammer = settings.performance.time_hammer
 
-        # add time to measure hammer performance
-        cmd = 'LANG={} {} hammer -v {} {} {} {}'.format(
-            settings.locale,
-            'time -p' if time_hammer else '',
-            f'-u {user}' if user else "--interactive no",
-            f'-p {password}' if password else "",
-            f'--output={output_format}' if output_format else "",
-            command,
-        )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            hostname=hostname or cls.hostname,
-            output_format=output_format,
-            timeout=timeout,
-            connection_timeout=connection_timeout,
-        )
+        response = None
+        if settings.ssh_client.hammer_shell and not time_hammer:
+            response = hammer_shell.execute(
+                command,
+                hostname=hostname or cls.hostname,
+                user=user,
+                password=password,
+                output_format=output_format,
+                timeout=timeout,
+            )
+        if response is None:
+            cmd = cls._hammer_command(command, user, password, output_format, time_hammer)
+            response = ssh.command(
+                cmd.encode('utf-8'),
+                hostname=hostname or cls.hostname,
+                output_format=output_format,
+                timeout=timeout,
+                connection_timeout=connection_timeout,
+            )
+            if time_hammer:
+                _record_timing(response, command, hostname or cls.hostname)
         if return_raw_response:
             return response
         else:
             return cls._handle_response(response, ignore_stderr=ignore_stderr)
 
+    @classmethod
+    def batch(cls, hostname=None, timeout=None, parallel=False):
+        """Return a :class:`CLIBatch` running its commands on ``hostname``,
+        the host of this class by default
+        """
+        return CLIBatch(hostname=hostname or cls.hostname, timeout=timeout, parallel=parallel)
+
     @classmethod
     def exists(cls, options=None, search=None):
         """Search for an entity using the query ``search[0]="search[1]"``
@@ -262,6 +512,9 @@ class Base:
         If ``options`` argument already have a search key, then the ``search``
         argument will not be evaluated. Which allows different search query.
 
+        Only the first entity found is fetched and returned, an empty list if
+        none is found.
+
         """
 
         if options is None:
@@ -270,15 +523,19 @@ class Base:
         if search is not None and 'search' not in options:
             options.update({'search': '{}=\\"{}\\"'.format(search[0], search[1])})
 
-        result = cls.list(options)
-        if result:
-            result = result[0]
-
-        return result
+        # only the first entity is needed
+        return next(cls.iter_list(options, per_page=1, prefetch=False), [])
 
     @classmethod
     def info(cls, options=None, output_format=None, return_raw_response=None):
-        """Reads the entity information."""
+        """Reads the entity information.
+
+        The default text output is parsed with :func:`hammer.parse_info`.
+        With ``output_format='json'`` the output is decoded by
+        :func:`hammer.parse_json` instead, which is faster for large entities
+        but keeps the structure of the hammer json output, e.g. the numbered
+        lists are dictionaries keyed by their number.
+        """
         cls.command_sub = 'info'
 
         if options is None:
@@ -301,6 +558,9 @@ class Base:
         """
         List information.
         @param options: ID (sometimes name works as well) to retrieve info.
+        @param output_format: ``csv`` by default, ``json`` returns the same
+            dictionaries with typed values: booleans, ``None`` and nested
+            objects instead of their CSV representation.
         """
 
         cls.command_sub = 'list'
@@ -318,6 +578,52 @@ class Base:
 
         return result
 
+    @classmethod
+    def iter_list(cls, options=None, per_page=1000, prefetch=True):
+        """Iterate over the entities returned by :meth:`list`, fetching them
+        one page of ``per_page`` entities at a time.
+
+        The next page is fetched in a thread while the entities of the current
+        one are consumed. The remaining pages are not fetched when the caller
+        stops iterating::
+
+            for host in Host.iter_list({'search': 'os = RedHat'}):
+                if host['name'] == name:
+                    break
+
+        @param options: options of the list command, but ``page`` and
+            ``per-page`` which are set for each page.
+        @param per_page: the number of entities fetched at a time.
+        @param prefetch: fetch the next page in advance.
+        """
+        options = dict(options or {})
+
+        def fetch(page):
+            return cls.list({**options, 'page': page, 'per-page': per_page})
+
+        page = 1
+        next_entities = None
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            entities = fetch(page)
+            while entities:
+                # a page which is not full is the last one
+                last_page = len(entities) < per_page
+                if not last_page and executor is not None:
+                    next_entities = executor.submit(fetch, page + 1)
+                yield from entities
+                if last_page:
+                    return
+                page += 1
+                entities = fetch(page) if next_entities is None else next_entities.result()
+                next_entities = None
+        finally:
+            if executor is not None:
+                # a page fetched in advance is not waited for if not consumed
+                if next_entities is not None:
+                    next_entities.cancel()
+                executor.shutdown(wait=False)
+
     @classmethod
     def puppetclasses(cls, options=None):
         """
@@ -382,6 +688,22 @@ class Base:
 
         return result
 
+    @classmethod
+    def with_hostname(cls, hostname):
+        """Return a subclass executing the cli commands on ``hostname``,
+        without changing the server of this class
+        """
+
+        class Wrapper(cls):
+            """Wrapper class which defines the hostname of the server the cli
+            commands are executed on.
+
+            """
+
+        Wrapper.hostname = hostname
+        Wrapper.__name__ = Wrapper.__qualname__ = cls.__name__
+        return Wrapper
+
     @classmethod
     def with_user(cls, username=None, password=None):
         """Context Manager for credentials"""
@@ -397,6 +719,32 @@ class Base:
 
         return Wrapper
 
+    @classmethod
+    def _validate_options(cls, options):
+        """Fail like hammer does on the ``options`` the command does not
+        accept, according to ``tests/foreman/data/hammer_commands.json``.
+
+        Commands missing from the file are not validated, neither are any
+        commands if ``performance.validate_hammer_options`` is disabled.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If an option is not
+            accepted by the command.
+        """
+        if settings.performance and not settings.performance.validate_hammer_options:
+            return
+        command = f'hammer {cls.command_base} {cls.command_sub or ""}'
+        accepted = hammer.command_options(command)
+        if accepted is None:
+            return
+        for key, val in options.items():
+            if val is not None and val is not False and key not in accepted:
+                command = ' '.join(command.split())
+                raise CLIReturnCodeError(
+                    64,
+                    f"Error: Unrecognised option '--{key}'.\n\nSee: '{command} --help'.\n",
+                    f'Option "{key}" is not accepted by "{command}"',
+                )
+
     @classmethod
     def _construct_command(cls, options=None):
         """Build a hammer cli command based on the options passed"""
@@ -405,6 +753,7 @@ class Base:
         if options is None:
             options = {}
 
+        cls._validate_options(options)
         for key, val in options.items():
             if val is None:
                 continue
@@ -417,3 +766,153 @@ class Base:
         cmd = f"{cls.command_base} {cls.command_sub or ''} {tail.strip()}"
 
         return cmd
+
+
+class CLIBatchResult:
+    """The result of a command of a :class:`CLIBatch`, available once the
+    batch has run.
+
+    :ivar response: the ``SSHCommandResult`` of the command, ``None`` until
+        the batch has run
+    """
+
+    def __init__(
+        self, cli, command_sub, command, output_format, ignore_stderr, return_raw_response
+    ):
+        self.cli = cli
+        self.command_sub = command_sub
+        self.command = command
+        self.output_format = output_format
+        self.ignore_stderr = ignore_stderr
+        self.return_raw_response = return_raw_response
+        self.response = None
+
+    def result(self):
+        """Return what ``Base.execute`` would have returned for the command
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If the command return
+            code is different from zero.
+        :raises robottelo.cli.base.CLIError: If the batch has not run yet.
+        """
+        if self.response is None:
+            raise CLIError(f'The batch of "{self.command}" has not run')
+        if self.return_raw_response:
+            return self.response
+        # the error message names the command_sub of the class
+        self.cli.command_sub = self.command_sub
+        return self.cli._handle_response(self.response, ignore_stderr=self.ignore_stderr)
+
+
+class CLIBatch:
+    """Independent hammer commands run as one remote script, in a single ssh
+    round trip.
+
+    The commands are added with :meth:`add`, run when leaving the ``with``
+    block, and their results read from the returned :class:`CLIBatchResult`::
+
+        with Base.batch() as batch:
+            infos = [batch.add(Org, 'info', {'id': org_id}) for org_id in org_ids]
+        orgs = [info.result() for info in infos]
+
+    A command must not depend on the outcome of another command of the batch.
+
+    :param str hostname: the host to run the commands on
+    :param int timeout: time to wait for the whole batch to finish
+    :param bool parallel: run the commands concurrently instead of one after
+        another
+    """
+
+    def __init__(self, hostname=None, timeout=None, parallel=False):
+        self.hostname = hostname
+        self.timeout = timeout
+        self.parallel = parallel
+        self.results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
+
+    def add(
+        self,
+        cli,
+        command_sub,
+        options=None,
+        output_format=None,
+        ignore_stderr=None,
+        return_raw_response=None,
+    ):
+        """Add the ``command_sub`` of the ``cli`` class, e.g. ``Org`` and
+        ``'info'``, with the given options to the batch
+
+        :return: the :class:`CLIBatchResult` of the command
+        """
+        cli.command_sub = command_sub
+        result = CLIBatchResult(
+            cli,
+            command_sub,
+            cli._construct_command(options),
+            output_format,
+            ignore_stderr,
+            return_raw_response,
+        )
+        self.results.append(result)
+        return result
+
+    def run(self):
+        """Run the commands added so far and set their response
+
+        :return: the list of the :class:`CLIBatchResult` of the commands
+        """
+        results = [result for result in self.results if result.response is None]
+        if not results:
+            return self.results
+        sentinel = uuid.uuid4().hex
+        time_hammer = settings.performance.time_hammer if settings.performance else False
+        script = ['batch=$(mktemp -d) || exit 1', 'trap \'rm -rf "$batch"\' EXIT']
+        for index, result in enumerate(results):
+            user, password = result.cli._get_username_password()
+            cmd = result.cli._hammer_command(
+                result.command, user, password, result.output_format, time_hammer
+            )
+            run = (
+                f'({cmd}) >"$batch/{index}.out" 2>"$batch/{index}.err"; '
+                f'echo $? >"$batch/{index}.rc"'
+            )
+            script.append(f'( {run} ) &' if self.parallel else run)
+        if self.parallel:
+            script.append('wait')
+        script.append(
+            f'for index in $(seq 0 {len(results) - 1}); do '
+            f'printf "\\n{sentinel} %s %s\\n" $index "$(cat "$batch/$index.rc")"; '
+            'cat "$batch/$index.out"; '
+            f'printf "\\n{sentinel}\\n"; '
+            'cat "$batch/$index.err"; done'
+        )
+        Base.logger.info(f'Running a batch of {len(results)} hammer commands')
+        response = ssh.command(
+            '\n'.join(script).encode('utf-8'),
+            hostname=self.hostname,
+            output_format='plain',
+            timeout=self.timeout,
+        )
+        # each output follows a "\n<sentinel> <index> <return code>\n" line for
+        # stdout and a "\n<sentinel>\n" line for stderr
+        parts = (response.stdout or '').split(f'\n{sentinel}')[1:]
+        if len(parts) != 2 * len(results):
+            raise CLIError(
+                f'The batch of hammer commands failed with return code {response.return_code}'
+                f'\nstderr contains:\n{response.stderr}'
+            )
+        for header_stdout, stderr in zip(parts[::2], parts[1::2]):
+            header, _, stdout = header_stdout.partition('\n')
+            index, return_code = header.split()
+            result = results[int(index)]
+            result.response = ssh._command_result(
+                stdout, stderr[1:], int(return_code), result.output_format
+            )
+            if time_hammer:
+                _record_timing(result.response, result.command, self.hostname)
+        return self.results
@@ -7,6 +7,8 @@ import os
 import pprint
 import random
 import time
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from os import chmod
 from tempfile import mkstemp
 from time import sleep
@@ -53,6 +55,7 @@ from robottelo.cli.product import Product
 from robottelo.cli.proxy import CapsuleTunnelError
 from robottelo.cli.proxy import Proxy
 from robottelo.cli.realm import Realm
+from robottelo.cli.recipe import Recipe
 from robottelo.cli.report_template import ReportTemplate
 from robottelo.cli.repository import Repository
 from robottelo.cli.repository_set import RepositorySet
@@ -91,6 +94,7 @@ from robottelo.constants import TEMPLATE_TYPES
 from robottelo.constants.repos import FAKE_1_YUM_REPO
 from robottelo.datafactory import valid_cron_expressions
 from robottelo.decorators import cacheable
+from robottelo.decorators.func_shared.shared import pooled
 from robottelo.helpers import default_url_on_new_port
 from robottelo.helpers import get_available_capsule_port
 from robottelo.helpers import update_dictionary
@@ -102,12 +106,61 @@ logger = logging.getLogger('robottelo')
 ORG_KEYS = ['organization', 'organization-id', 'organization-label']
 CONTENT_VIEW_KEYS = ['content-view', 'content-view-id']
 LIFECYCLE_KEYS = ['lifecycle-environment', 'lifecycle-environment-id']
+# the options supported by make_filter
+FILTER_OPTIONS = [
+    'location-ids',
+    'locations',
+    'organization-ids',
+    'organizations',
+    'override',
+    'permission-ids',
+    'permissions',
+    'role',
+    'role-id',
+    'search',
+]
 
 
 class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
 
 
+def cached_entity_exists(cli_object):
+    """Return a function checking with ``info`` that a cached entity of
+    ``cli_object`` still exists, for :func:`robottelo.decorators.cacheable`
+    """
+
+    def validate(entity, options):
+        info_options = {'id': entity.get('id')}
+        if info_options['id'] is None:
+            return True
+        if cli_object.command_requires_org:
+            if not (options or {}).get('organization-id'):
+                return True
+            info_options['organization-id'] = options['organization-id']
+        try:
+            cli_object.info(info_options)
+        except CLIReturnCodeError:
+            return False
+        return True
+
+    return validate
+
+
+def _supported_options(options, values):
+    """Update the default ``options`` of a CLI object create with the
+    ``values`` it supports and return them, the other values are ignored.
+    """
+    if values:
+        diff = set(values.keys()).difference(set(options.keys()))
+        if diff:
+            logger.debug(
+                "Option(s) {} not supported by CLI factory. Please check for "
+                "a typo or update default options".format(diff)
+            )
+    return update_dictionary(options, values)
+
+
 def create_object(cli_object, options, values):
     """
     Creates <object> with dictionary of arguments.
@@ -122,14 +175,7 @@ def create_object(cli_object, options, values):
     :return: A dictionary representing the newly created resource.
 
     """
-    if values:
-        diff = set(values.keys()).difference(set(options.keys()))
-        if diff:
-            logger.debug(
-                "Option(s) {} not supported by CLI factory. Please check for "
-                "a typo or update default options".format(diff)
-            )
-    update_dictionary(options, values)
+    _supported_options(options, values)
     try:
         result = cli_object.create(options)
     except CLIReturnCodeError as err:
@@ -161,7 +207,89 @@ def _entity_with_credentials(credentials, cli_entity_cls):
     return cli_entity_cls
 
 
-@cacheable
+class BulkResult(list):
+    """The entities created by :func:`make_bulk`, in the order of their
+    options, with ``None`` in place of the ones failed to be created.
+
+    The errors are kept in :attr:`errors` by index of the options.
+    """
+
+    def __init__(self, entities, errors):
+        super().__init__(entities)
+        self.errors = errors
+
+    @property
+    def created(self):
+        """The entities created, without the failed ones"""
+        return [entity for index, entity in enumerate(self) if index not in self.errors]
+
+    def raise_for_errors(self):
+        """Raise a CLIFactoryError listing the failures, if any
+
+        :raise robottelo.cli.factory.CLIFactoryError: If an entity failed to
+            be created.
+        """
+        if self.errors:
+            raise CLIFactoryError(
+                '{} of {} entities failed to be created:\n{}'.format(
+                    len(self.errors),
+                    len(self),
+                    '\n'.join(f'{index}: {err}' for index, err in sorted(self.errors.items())),
+                )
+            )
+
+
+def _bulk_options(count, options):
+    """Return the list of the options of each entity of a bulk creation"""
+    if isinstance(options, (list, tuple)):
+        if count is not None and count != len(options):
+            raise CLIFactoryError(f'{len(options)} options given to create {count} entities')
+        return [dict(item or {}) for item in options]
+    if count is None:
+        raise CLIFactoryError('Please provide the count of the entities or their options.')
+    return [dict(options or {}) for _ in range(count)]
+
+
+def make_bulk(make_function, options_list, max_workers=None):
+    """Creates an entity with ``make_function`` for each of ``options_list``
+    on at most ``max_workers`` threads, ``performance.factory_workers`` by
+    default.
+
+    A failure does not stop the creation of the other entities, the errors
+    are reported by :class:`BulkResult`::
+
+        users = make_bulk(make_user, [{'admin': 'true'}] * 10)
+        users.raise_for_errors()
+
+    :param make_function: A factory function, ``make_user``...
+    :param list options_list: The options of each entity to create.
+    :param int max_workers: The maximum number of entities created at once.
+    :rtype: BulkResult
+    """
+    if max_workers is None and settings.performance:
+        max_workers = settings.performance.factory_workers
+    max_workers = max(int(max_workers or 4), 1)
+    options_list = list(options_list)
+    entities = [None] * len(options_list)
+    errors = {}
+    if not options_list:
+        return BulkResult(entities, errors)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(options_list))) as executor:
+        futures = {
+            executor.submit(make_function, options): index
+            for index, options in enumerate(options_list)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                entities[index] = future.result()
+            except Exception as err:
+                logger.debug(f'{make_function.__name__} failed for {options_list[index]}: {err}')
+                errors[index] = err
+    return BulkResult(entities, errors)
+
+
+@cacheable(validate=cached_entity_exists(ActivationKey))
 def make_activation_key(options=None):
     """Creates an Activation Key
 
@@ -199,7 +327,7 @@ def make_activation_key(options=None):
     return create_object(ActivationKey, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Architecture))
 def make_architecture(options=None):
     """Creates an Architecture
 
@@ -212,7 +340,7 @@ def make_architecture(options=None):
     return create_object(Architecture, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(ContentView))
 def make_content_view(options=None):
     """Creates a Content View
 
@@ -309,7 +437,7 @@ def make_content_view_filter_rule(options=None):
     return create_object(ContentViewFilterRule, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(DiscoveryRule))
 def make_discoveryrule(options=None):
     """Creates a Discovery Rule
 
@@ -354,7 +482,7 @@ def make_discoveryrule(options=None):
     return create_object(DiscoveryRule, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(GPGKey))
 def make_gpg_key(options=None):
     """Creates a GPG Key
 
@@ -391,7 +519,7 @@ def make_gpg_key(options=None):
     return create_object(GPGKey, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(ContentCredential))
 def make_content_credential(options=None):
     """Creates a content credential.
 
@@ -431,7 +559,7 @@ def make_content_credential(options=None):
     return create_object(ContentCredential, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Location))
 def make_location(options=None):
     """Creates a Location
 
@@ -469,7 +597,7 @@ def make_location(options=None):
     return create_object(Location, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Model))
 def make_model(options=None):
     """Creates a Hardware Model
 
@@ -482,7 +610,7 @@ def make_model(options=None):
     return create_object(Model, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(PartitionTable))
 def make_partition_table(options=None):
     """Creates a Partition Table
 
@@ -515,7 +643,7 @@ def make_partition_table(options=None):
     return create_object(PartitionTable, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Product))
 def make_product(options=None):
     """Creates a Product
 
@@ -581,7 +709,7 @@ def make_product_wait(options=None, wait_for=5):
     return product
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Proxy))
 def make_proxy(options=None):
     """Creates a Proxy
 
@@ -603,7 +731,7 @@ def make_proxy(options=None):
     return create_object(Proxy, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Repository))
 def make_repository(options=None):
     """Creates a Repository
 
@@ -647,7 +775,7 @@ def make_repository_with_credentials(options=None, credentials=None):
     return create_object(repo_cls, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Role))
 def make_role(options=None):
     """Creates a Role
 
@@ -661,7 +789,7 @@ def make_role(options=None):
     return create_object(Role, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Filter))
 def make_filter(options=None):
     """Creates a Role Filter
 
@@ -669,18 +797,7 @@ def make_filter(options=None):
 
     :returns Role object
     """
-    args = {
-        'location-ids': None,
-        'locations': None,
-        'organization-ids': None,
-        'organizations': None,
-        'override': None,
-        'permission-ids': None,
-        'permissions': None,
-        'role': None,
-        'role-id': None,
-        'search': None,
-    }
+    args = dict.fromkeys(FILTER_OPTIONS)
 
     # Role and permissions are required fields.
     if not options:
@@ -697,7 +814,20 @@ def make_filter(options=None):
     return create_object(Filter, args, options)
 
 
-@cacheable
+def make_filter_bulk(count=None, options=None, max_workers=None):
+    """Creates role filters concurrently, see :func:`make_bulk`
+
+    :param int count: the number of role filters to create with ``options``.
+    :param options: Check options using `hammer filter create --help` on
+        satellite, the list of the options of each one or the options shared
+        by all of them.
+
+    :returns BulkResult of the role filters objects
+    """
+    return make_bulk(make_filter, _bulk_options(count, options), max_workers=max_workers)
+
+
+@cacheable(validate=cached_entity_exists(Scappolicy))
 def make_scap_policy(options=None):
     """Creates a Scap Policy
 
@@ -741,7 +871,7 @@ def make_scap_policy(options=None):
     return create_object(Scappolicy, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Subnet))
 def make_subnet(options=None):
     """Creates a Subnet
 
@@ -775,7 +905,20 @@ def make_subnet(options=None):
     return create_object(Subnet, args, options)
 
 
-@cacheable
+def make_subnet_bulk(count=None, options=None, max_workers=None):
+    """Creates subnets concurrently, see :func:`make_bulk`
+
+    :param int count: the number of subnets to create with ``options``.
+    :param options: Check options using `hammer subnet create --help` on
+        satellite, the list of the options of each one or the options shared
+        by all of them.
+
+    :returns BulkResult of the subnets objects
+    """
+    return make_bulk(make_subnet, _bulk_options(count, options), max_workers=max_workers)
+
+
+@cacheable(validate=cached_entity_exists(SyncPlan))
 def make_sync_plan(options=None):
     """Creates a Sync Plan
 
@@ -805,7 +948,7 @@ def make_sync_plan(options=None):
     return create_object(SyncPlan, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Host))
 def make_host(options=None):
     """Creates a Host
 
@@ -886,7 +1029,7 @@ def make_host(options=None):
     return create_object(Host, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Host))
 def make_fake_host(options=None):
     """Wrapper function for make_host to pass all required options for creation
     of a fake host
@@ -973,7 +1116,20 @@ def make_fake_host(options=None):
     return make_host(options)
 
 
-@cacheable
+def make_fake_host_bulk(count=None, options=None, max_workers=None):
+    """Creates fake hosts concurrently, see :func:`make_bulk`
+
+    :param int count: the number of fake hosts to create with ``options``.
+    :param options: Check options using `hammer host create --help` on
+        satellite, the list of the options of each one or the options shared
+        by all of them.
+
+    :returns BulkResult of the fake hosts objects
+    """
+    return make_bulk(make_fake_host, _bulk_options(count, options), max_workers=max_workers)
+
+
+@cacheable(validate=cached_entity_exists(HostCollection))
 def make_host_collection(options=None):
     """Creates a Host Collection
 
@@ -997,7 +1153,20 @@ def make_host_collection(options=None):
     return create_object(HostCollection, args, options)
 
 
-@cacheable
+def make_host_collection_bulk(count=None, options=None, max_workers=None):
+    """Creates host collections concurrently, see :func:`make_bulk`
+
+    :param int count: the number of host collections to create with ``options``.
+    :param options: Check options using `hammer host-collection create --help` on
+        satellite, the list of the options of each one or the options shared
+        by all of them.
+
+    :returns BulkResult of the host collections objects
+    """
+    return make_bulk(make_host_collection, _bulk_options(count, options), max_workers=max_workers)
+
+
+@cacheable(validate=cached_entity_exists(JobInvocation))
 def make_job_invocation(options=None):
     """Creates a Job Invocation
 
@@ -1030,7 +1199,7 @@ def make_job_invocation(options=None):
     return create_object(JobInvocation, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(JobTemplate))
 def make_job_template(options=None):
     """Creates a Job Template
 
@@ -1058,7 +1227,7 @@ def make_job_template(options=None):
     return create_object(JobTemplate, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(User))
 def make_user(options=None):
     """Creates a User
 
@@ -1090,7 +1259,20 @@ def make_user(options=None):
     return create_object(User, args, options)
 
 
-@cacheable
+def make_user_bulk(count=None, options=None, max_workers=None):
+    """Creates users concurrently, see :func:`make_bulk`
+
+    :param int count: the number of users to create with ``options``.
+    :param options: Check options using `hammer user create --help` on
+        satellite, the list of the options of each one or the options shared
+        by all of them.
+
+    :returns BulkResult of the users objects
+    """
+    return make_bulk(make_user, _bulk_options(count, options), max_workers=max_workers)
+
+
+@cacheable(validate=cached_entity_exists(UserGroup))
 def make_usergroup(options=None):
     """Creates a User Group
 
@@ -1136,7 +1318,7 @@ def make_usergroup_external(options=None):
     return create_object(UserGroupExternal, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(LDAPAuthSource))
 def make_ldap_auth_source(options=None):
     """Creates an LDAP Auth Source
 
@@ -1172,7 +1354,7 @@ def make_ldap_auth_source(options=None):
     return create_object(LDAPAuthSource, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(ComputeResource))
 def make_compute_resource(options=None):
     """Creates a Compute Resource
 
@@ -1227,7 +1409,7 @@ def make_compute_resource(options=None):
     return create_object(ComputeResource, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Org))
 def make_org(options=None):
     """Creates an Organization
 
@@ -1269,7 +1451,7 @@ def make_org_with_credentials(options=None, credentials=None):
     return create_object(org_cls, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Realm))
 def make_realm(options=None):
     """Creates a REALM
 
@@ -1291,7 +1473,7 @@ def make_realm(options=None):
     return create_object(Realm, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(ReportTemplate))
 def make_report_template(options=None):
     """Creates a Report Template
 
@@ -1328,7 +1510,7 @@ def make_report_template(options=None):
     return create_object(ReportTemplate, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(OperatingSys))
 def make_os(options=None):
     """Creates an Operating System
 
@@ -1358,7 +1540,7 @@ def make_os(options=None):
     return create_object(OperatingSys, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Scapcontent))
 def make_scapcontent(options=None):
     """Creates Scap Content
 
@@ -1380,7 +1562,7 @@ def make_scapcontent(options=None):
     return create_object(Scapcontent, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Domain))
 def make_domain(options=None):
     """Creates a Domain
 
@@ -1402,7 +1584,7 @@ def make_domain(options=None):
     return create_object(Domain, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(HostGroup))
 def make_hostgroup(options=None):
     """Creates a Hostgroup
 
@@ -1466,7 +1648,7 @@ def make_hostgroup(options=None):
     return create_object(HostGroup, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Medium))
 def make_medium(options=None):
     """Creates a Medium
 
@@ -1490,7 +1672,7 @@ def make_medium(options=None):
     return create_object(Medium, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Environment))
 def make_environment(options=None):
     """Creates a Puppet Environment
 
@@ -1510,7 +1692,7 @@ def make_environment(options=None):
     return create_object(Environment, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(LifecycleEnvironment))
 def make_lifecycle_environment(options=None):
     """Creates a Lifecycle Environment
 
@@ -1546,7 +1728,7 @@ def make_lifecycle_environment(options=None):
     return create_object(LifecycleEnvironment, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(TailoringFiles))
 def make_tailoringfile(options=None):
     """Creates a tailoring File
 
@@ -1568,7 +1750,7 @@ def make_tailoringfile(options=None):
     return create_object(TailoringFiles, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(Template))
 def make_template(options=None):
     """Creates a Template
 
@@ -1642,7 +1824,7 @@ def make_template_input(options=None):
     return create_object(TemplateInput, args, options)
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(VirtWhoConfig))
 def make_virt_who_config(options=None):
     """Creates a Virt Who Configuration
 
@@ -1708,6 +1890,103 @@ def activationkey_add_subscription_to_repo(options=None):
                 raise CLIFactoryError(f'Failed to add subscription to activation key\n{err.msg}')
 
 
+def _setup_org_recipe(options):
+    """Return a :class:`Recipe` setting up the organization of the ``options``
+    for a repository, the steps shared by ``setup_org_for_a_custom_repo`` and
+    ``_setup_org_for_a_rh_repo``.
+
+    The steps providing the ``repository-id`` value, the ``synchronized``
+    value once the repository is synchronized and the ``subscription`` value
+    once it is added to the activation key are left to the caller.
+    """
+    recipe = Recipe()
+
+    @recipe.step('organization-id')
+    def organization(values):
+        return make_org()['id']
+
+    @recipe.step('lifecycle-environment-id', requires=['organization-id'])
+    def lifecycle_environment(values):
+        return make_lifecycle_environment({'organization-id': values['organization-id']})['id']
+
+    @recipe.step('content-view-id', requires=['organization-id'])
+    def content_view(values):
+        return make_content_view({'organization-id': values['organization-id']})['id']
+
+    @recipe.step('content-view-repository', requires=['content-view-id', 'repository-id'])
+    def add_repository(values):
+        try:
+            ContentView.add_repository(
+                {
+                    'id': values['content-view-id'],
+                    'organization-id': values['organization-id'],
+                    'repository-id': values['repository-id'],
+                }
+            )
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to add repository to content view\n{err.msg}')
+
+    @recipe.step('content-view-version', requires=['content-view-repository', 'synchronized'])
+    def publish(values):
+        # Publish a new version of CV
+        try:
+            ContentView.publish({'id': values['content-view-id']})
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to publish new version of content view\n{err.msg}')
+        # Get the version id
+        try:
+            return ContentView.info({'id': values['content-view-id']})['versions'][-1]
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to fetch content view info\n{err.msg}')
+
+    @recipe.step('promoted', requires=['content-view-version', 'lifecycle-environment-id'])
+    def promote(values):
+        try:
+            ContentView.version_promote(
+                {
+                    'id': values['content-view-version']['id'],
+                    'organization-id': values['organization-id'],
+                    'to-lifecycle-environment-id': values['lifecycle-environment-id'],
+                }
+            )
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to promote version to next environment\n{err.msg}')
+
+    @recipe.step('activationkey-id', requires=['promoted'])
+    def activation_key(values):
+        return make_activation_key(
+            {
+                'content-view-id': values['content-view-id'],
+                'lifecycle-environment-id': values['lifecycle-environment-id'],
+                'organization-id': values['organization-id'],
+            }
+        )['id']
+
+    @recipe.step('activationkey', requires=['activationkey-id', 'promoted'])
+    def associate_activation_key(values):
+        if options.get('activationkey-id') is None:
+            return
+        # Given activation key may have no (or different) CV associated.
+        # Associate activation key with CV just to be sure
+        try:
+            ActivationKey.update(
+                {
+                    'content-view-id': values['content-view-id'],
+                    'id': values['activationkey-id'],
+                    'organization-id': values['organization-id'],
+                }
+            )
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to associate activation-key with CV\n{err.msg}')
+
+    return recipe
+
+
+def _given_options(options, keys):
+    """Return the values of the ``keys`` given in ``options``"""
+    return {key: options[key] for key in keys if options.get(key) is not None}
+
+
 def setup_org_for_a_custom_repo(options=None):
     """Sets up Org for the given custom repo by:
 
@@ -1722,90 +2001,64 @@ def setup_org_for_a_custom_repo(options=None):
         associates it with the content view.
     5. Adds the custom repo subscription to the activation key
 
+    The steps not depending on each other, like the creation of the
+    lifecycle environment, product and content view, run concurrently.
+
     :return: A dictionary with the entity ids of Activation key, Content view,
         Lifecycle Environment, Organization, Product and Repository
 
     """
     if not options or not options.get('url'):
         raise CLIFactoryError('Please provide valid custom repo URL.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
+    recipe = _setup_org_recipe(options)
+
     # Create custom product and repository
-    custom_product = make_product({'organization-id': org_id})
-    custom_repo = make_repository(
-        {'content-type': 'yum', 'product-id': custom_product['id'], 'url': options.get('url')}
-    )
-    # Synchronize custom repository
-    try:
-        Repository.synchronize({'id': custom_repo['id']})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to synchronize repository\n{err.msg}')
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository(
-            {'id': cv_id, 'organization-id': org_id, 'repository-id': custom_repo['id']}
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to add repository to content view\n{err.msg}')
-    # Publish a new version of CV
-    try:
-        ContentView.publish({'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to publish new version of content view\n{err.msg}')
-    # Get the version id
-    cvv = ContentView.info({'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote(
-            {'id': cvv['id'], 'organization-id': org_id, 'to-lifecycle-environment-id': env_id}
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to promote version to next environment\n{err.msg}')
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key(
-            {
-                'content-view-id': cv_id,
-                'lifecycle-environment-id': env_id,
-                'organization-id': org_id,
-            }
+    @recipe.step('product', requires=['organization-id'])
+    def product(values):
+        return make_product({'organization-id': values['organization-id']})
+
+    @recipe.step('repository-id', requires=['product'])
+    def repository(values):
+        return make_repository(
+            {'content-type': 'yum', 'product-id': values['product']['id'], 'url': options['url']}
         )['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+
+    @recipe.step('synchronized', requires=['repository-id'])
+    def synchronize(values):
         try:
-            ActivationKey.update(
-                {'content-view-id': cv_id, 'id': activationkey_id, 'organization-id': org_id}
-            )
+            Repository.synchronize({'id': values['repository-id']})
         except CLIReturnCodeError as err:
-            raise CLIFactoryError(f'Failed to associate activation-key with CV\n{err.msg}')
+            raise CLIFactoryError(f'Failed to synchronize repository\n{err.msg}')
+
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo(
-        {
-            'activationkey-id': activationkey_id,
-            'organization-id': org_id,
-            'subscription': custom_product['name'],
-        }
+    @recipe.step('subscription', requires=['activationkey', 'product'])
+    def subscription(values):
+        activationkey_add_subscription_to_repo(
+            {
+                'activationkey-id': values['activationkey-id'],
+                'organization-id': values['organization-id'],
+                'subscription': values['product']['name'],
+            }
+        )
+
+    values = recipe.run(
+        _given_options(
+            options,
+            [
+                'organization-id',
+                'lifecycle-environment-id',
+                'content-view-id',
+                'activationkey-id',
+            ],
+        )
     )
     return {
-        'activationkey-id': activationkey_id,
-        'content-view-id': cv_id,
-        'lifecycle-environment-id': env_id,
-        'organization-id': org_id,
-        'product-id': custom_product['id'],
-        'repository-id': custom_repo['id'],
+        'activationkey-id': values['activationkey-id'],
+        'content-view-id': values['content-view-id'],
+        'lifecycle-environment-id': values['lifecycle-environment-id'],
+        'organization-id': values['organization-id'],
+        'product-id': values['product']['id'],
+        'repository-id': values['repository-id'],
     }
 
 
@@ -1824,6 +2077,9 @@ def _setup_org_for_a_rh_repo(options=None):
         associates it with the content view.
     6. Adds the RH repo subscription to the activation key
 
+    The steps not depending on each other, like the creation of the
+    content view and the upload of the manifest, run concurrently.
+
     Note that in most cases you should use ``setup_org_for_a_rh_repo`` instead
     as it's more flexible.
 
@@ -1838,118 +2094,92 @@ def _setup_org_for_a_rh_repo(options=None):
         or not options.get('repository')
     ):
         raise CLIFactoryError('Please provide valid product, repository-set and repo.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
+    recipe = _setup_org_recipe(options)
+
     # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({'file': manifest.filename, 'organization-id': org_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to upload manifest\n{err.msg}')
+    @recipe.step('manifest', requires=['organization-id'])
+    def manifest(values):
+        with manifests.clone() as manifest:
+            upload_file(manifest.content, manifest.filename)
+        try:
+            Subscription.upload(
+                {'file': manifest.filename, 'organization-id': values['organization-id']}
+            )
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to upload manifest\n{err.msg}')
+
     # Enable repo from Repository Set
-    try:
-        RepositorySet.enable(
-            {
-                'basearch': 'x86_64',
-                'name': options['repository-set'],
-                'organization-id': org_id,
-                'product': options['product'],
-                'releasever': options.get('releasever'),
-            }
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to enable repository set\n{err.msg}')
+    @recipe.step('repository-set', requires=['manifest'])
+    def repository_set(values):
+        try:
+            RepositorySet.enable(
+                {
+                    'basearch': 'x86_64',
+                    'name': options['repository-set'],
+                    'organization-id': values['organization-id'],
+                    'product': options['product'],
+                    'releasever': options.get('releasever'),
+                }
+            )
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to enable repository set\n{err.msg}')
+
     # Fetch repository info
-    try:
-        rhel_repo = Repository.info(
-            {
-                'name': options['repository'],
-                'organization-id': org_id,
-                'product': options['product'],
-            }
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to fetch repository info\n{err.msg}')
+    @recipe.step('repository-id', requires=['repository-set'])
+    def repository(values):
+        try:
+            return Repository.info(
+                {
+                    'name': options['repository'],
+                    'organization-id': values['organization-id'],
+                    'product': options['product'],
+                }
+            )['id']
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(f'Failed to fetch repository info\n{err.msg}')
+
     # Synchronize the RH repository
-    try:
-        Repository.synchronize(
-            {
-                'name': options['repository'],
-                'organization-id': org_id,
-                'product': options['product'],
-            }
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to synchronize repository\n{err.msg}')
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository(
-            {'id': cv_id, 'organization-id': org_id, 'repository-id': rhel_repo['id']}
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to add repository to content view\n{err.msg}')
-    # Publish a new version of CV
-    try:
-        ContentView.publish({'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to publish new version of content view\n{err.msg}')
-    # Get the version id
-    try:
-        cvv = ContentView.info({'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to fetch content view info\n{err.msg}')
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote(
-            {'id': cvv['id'], 'organization-id': org_id, 'to-lifecycle-environment-id': env_id}
-        )
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(f'Failed to promote version to next environment\n{err.msg}')
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key(
-            {
-                'content-view-id': cv_id,
-                'lifecycle-environment-id': env_id,
-                'organization-id': org_id,
-            }
-        )['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    @recipe.step('synchronized', requires=['repository-set'])
+    def synchronize(values):
         try:
-            ActivationKey.update(
-                {'id': activationkey_id, 'organization-id': org_id, 'content-view-id': cv_id}
+            Repository.synchronize(
+                {
+                    'name': options['repository'],
+                    'organization-id': values['organization-id'],
+                    'product': options['product'],
+                }
             )
         except CLIReturnCodeError as err:
-            raise CLIFactoryError(f'Failed to associate activation-key with CV\n{err.msg}')
+            raise CLIFactoryError(f'Failed to synchronize repository\n{err.msg}')
+
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo(
-        {
-            'organization-id': org_id,
-            'activationkey-id': activationkey_id,
-            'subscription': options.get('subscription', DEFAULT_SUBSCRIPTION_NAME),
-        }
+    @recipe.step('subscription', requires=['activationkey', 'manifest'])
+    def subscription(values):
+        activationkey_add_subscription_to_repo(
+            {
+                'organization-id': values['organization-id'],
+                'activationkey-id': values['activationkey-id'],
+                'subscription': options.get('subscription', DEFAULT_SUBSCRIPTION_NAME),
+            }
+        )
+
+    values = recipe.run(
+        _given_options(
+            options,
+            [
+                'organization-id',
+                'lifecycle-environment-id',
+                'content-view-id',
+                'activationkey-id',
+            ],
+        )
     )
     return {
-        'activationkey-id': activationkey_id,
-        'content-view-id': cv_id,
-        'lifecycle-environment-id': env_id,
-        'organization-id': org_id,
-        'repository-id': rhel_repo['id'],
+        'activationkey-id': values['activationkey-id'],
+        'content-view-id': values['content-view-id'],
+        'lifecycle-environment-id': values['lifecycle-environment-id'],
+        'organization-id': values['organization-id'],
+        'repository-id': values['repository-id'],
     }
 
 
@@ -2005,6 +2235,28 @@ def setup_org_for_a_rh_repo(options=None, force_manifest_upload=False, force_use
         return result
 
 
+@pooled
+def setup_pooled_org_with_rh_repo():
+    """Sets up an organization with a manifest and the Satellite Tools
+    repository synchronized in a content view promoted to a new lifecycle
+    environment, with an activation key, see ``setup_org_for_a_rh_repo``.
+
+    When the shared functions are enabled, the organizations are made ahead of
+    time by an entity pool shared by the test processes, each call checking
+    out one no other caller gets.
+
+    :return: a dict with entity ids (see ``setup_org_for_a_rh_repo``).
+    """
+    return setup_org_for_a_rh_repo(
+        {
+            'product': PRDS['rhel'],
+            'repository-set': REPOSET['rhst7'],
+            'repository': REPOS['rhst7']['name'],
+        },
+        force_manifest_upload=True,
+    )
+
+
 def configure_env_for_provision(org=None, loc=None):
     """Create and configure org, loc, product, repo, env. Update proxy,
     domain, subnet, compute resource, provision templates and medium with
@@ -2365,6 +2617,7 @@ def add_role_permissions(role_id, resource_permissions):
             available_rc_permissions[permission_resource] = []
         available_rc_permissions[permission_resource].append(permission)
     # create only the required role permissions per resource type
+    filters_options = []
     for resource_type, permission_data in resource_permissions.items():
         permission_names = permission_data.get('permissions')
         if permission_names is None:
@@ -2387,10 +2640,25 @@ def add_role_permissions(role_id, resource_permissions):
                     list(missing_permissions), resource_type
                 )
             )
-        # Create the current resource type role permissions
         options = {'role-id': role_id}
         options.update(permission_data)
-        make_filter(options=options)
+        # only the options make_filter supports
+        filters_options.append(_supported_options(dict.fromkeys(FILTER_OPTIONS), options))
+    # the filters do not depend on each other, create them in one round trip
+    with Filter.batch() as batch:
+        filters = [
+            batch.add(Filter, 'create', options, output_format='csv')
+            for options in filters_options
+        ]
+    for options, result in zip(filters_options, filters):
+        try:
+            result.result()
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                'Failed to create Filter with data:\n{}\n{}'.format(
+                    pprint.pformat(options, indent=2), err.msg
+                )
+            )
 
 
 def setup_cdn_and_custom_repositories(
@@ -2457,6 +2725,9 @@ def setup_cdn_and_custom_repos_content(
 ):
     """Setup cdn and custom repositories, content view and activations key
 
+    The steps not depending on each other, like the creation of the content
+    view and the setup of the repositories, run concurrently.
+
     :param int org_id: The organization id
     :param int lce_id: the lifecycle environment id
     :param list repos: a list of dict repositories options
@@ -2474,8 +2745,12 @@ def setup_cdn_and_custom_repos_content(
         repos = []
     if rh_subscriptions is None:
         rh_subscriptions = []
+    recipe = Recipe()
 
-    if upload_manifest:
+    @recipe.step('manifest')
+    def manifest(values):
+        if not upload_manifest:
+            return
         # Upload the organization manifest
         try:
             manifests.upload_manifest_locked(
@@ -2484,80 +2759,115 @@ def setup_cdn_and_custom_repos_content(
         except CLIReturnCodeError as err:
             raise CLIFactoryError(f'Failed to upload manifest\n{err.msg}')
 
-    custom_product, repos_info = setup_cdn_and_custom_repositories(
-        org_id=org_id, repos=repos, download_policy=download_policy
-    )
-    if default_cv:
-        activation_key = make_activation_key(
-            {'organization-id': org_id, 'lifecycle-environment': 'Library'}
-        )
-        content_view = ContentView.info(
-            {'organization-id': org_id, 'name': 'Default Organization View'}
+    @recipe.step('repositories', requires=['manifest'])
+    def repositories(values):
+        return setup_cdn_and_custom_repositories(
+            org_id=org_id, repos=repos, download_policy=download_policy
         )
+
+    if default_cv:
+
+        @recipe.step('activation-key')
+        def activation_key(values):
+            return make_activation_key(
+                {'organization-id': org_id, 'lifecycle-environment': 'Library'}
+            )
+
+        @recipe.step('content-view')
+        def content_view(values):
+            return ContentView.info(
+                {'organization-id': org_id, 'name': 'Default Organization View'}
+            )
+
     else:
         # Create a content view
-        content_view = make_content_view({'organization-id': org_id})
-        # Add repositories to content view
-        for repo_info in repos_info:
-            ContentView.add_repository(
+        @recipe.step('new-content-view')
+        def new_content_view(values):
+            return make_content_view({'organization-id': org_id})
+
+        @recipe.step('content-view', requires=['new-content-view', 'repositories'])
+        def content_view(values):
+            content_view_id = values['new-content-view']['id']
+            # Add repositories to content view
+            for repo_info in values['repositories'][1]:
+                ContentView.add_repository(
+                    {
+                        'id': content_view_id,
+                        'organization-id': org_id,
+                        'repository-id': repo_info['id'],
+                    }
+                )
+            # Publish the content view
+            ContentView.publish({'id': content_view_id})
+            # Get the latest content view version id
+            content_view_version = ContentView.info({'id': content_view_id})['versions'][-1]
+            # Promote content view version to lifecycle environment
+            ContentView.version_promote(
                 {
-                    'id': content_view['id'],
+                    'id': content_view_version['id'],
                     'organization-id': org_id,
-                    'repository-id': repo_info['id'],
+                    'to-lifecycle-environment-id': lce_id,
                 }
             )
-        # Publish the content view
-        ContentView.publish({'id': content_view['id']})
-        # Get the latest content view version id
-        content_view_version = ContentView.info({'id': content_view['id']})['versions'][-1]
-        # Promote content view version to lifecycle environment
-        ContentView.version_promote(
-            {
-                'id': content_view_version['id'],
-                'organization-id': org_id,
-                'to-lifecycle-environment-id': lce_id,
-            }
-        )
-        content_view = ContentView.info({'id': content_view['id']})
-        activation_key = make_activation_key(
-            {
-                'organization-id': org_id,
-                'lifecycle-environment-id': lce_id,
-                'content-view-id': content_view['id'],
-            }
-        )
-    # Get organization subscriptions
-    subscriptions = Subscription.list({'organization-id': org_id}, per_page=False)
-    # Add subscriptions to activation-key
-    needed_subscription_names = list(rh_subscriptions)
-    if custom_product:
-        needed_subscription_names.append(custom_product['name'])
-    added_subscription_names = []
-    for subscription in subscriptions:
-        if (
-            subscription['name'] in needed_subscription_names
-            and subscription['name'] not in added_subscription_names
-        ):
-            ActivationKey.add_subscription(
-                {'id': activation_key['id'], 'subscription-id': subscription['id'], 'quantity': 1}
+            return ContentView.info({'id': content_view_id})
+
+        @recipe.step('activation-key', requires=['content-view'])
+        def activation_key(values):
+            return make_activation_key(
+                {
+                    'organization-id': org_id,
+                    'lifecycle-environment-id': lce_id,
+                    'content-view-id': values['content-view']['id'],
+                }
             )
-            added_subscription_names.append(subscription['name'])
-            if len(added_subscription_names) == len(needed_subscription_names):
-                break
-    missing_subscription_names = set(needed_subscription_names).difference(
-        set(added_subscription_names)
-    )
-    if missing_subscription_names:
-        raise CLIFactoryError(f'Missing subscriptions: {missing_subscription_names}')
+
+    @recipe.step('subscriptions', requires=['activation-key', 'repositories'])
+    def subscriptions(values):
+        custom_product = values['repositories'][0]
+        # Get organization subscriptions
+        subscriptions = Subscription.list({'organization-id': org_id}, per_page=False)
+        # Add subscriptions to activation-key
+        needed_subscription_names = list(rh_subscriptions)
+        if custom_product:
+            needed_subscription_names.append(custom_product['name'])
+        added_subscription_names = []
+        for subscription in subscriptions:
+            if (
+                subscription['name'] in needed_subscription_names
+                and subscription['name'] not in added_subscription_names
+            ):
+                ActivationKey.add_subscription(
+                    {
+                        'id': values['activation-key']['id'],
+                        'subscription-id': subscription['id'],
+                        'quantity': 1,
+                    }
+                )
+                added_subscription_names.append(subscription['name'])
+                if len(added_subscription_names) == len(needed_subscription_names):
+                    break
+        missing_subscription_names = set(needed_subscription_names).difference(
+            set(added_subscription_names)
+        )
+        if missing_subscription_names:
+            raise CLIFactoryError(f'Missing subscriptions: {missing_subscription_names}')
+
+    if lce_id:
+
+        @recipe.step('lce')
+        def lce(values):
+            return LifecycleEnvironment.info({'id': lce_id, 'organization-id': org_id})
+
+    values = recipe.run()
+    custom_product, repos_info = values['repositories']
     data = dict(
-        activation_key=activation_key,
-        content_view=content_view,
+        activation_key=values['activation-key'],
+        content_view=values['content-view'],
         product=custom_product,
         repos=repos_info,
     )
     if lce_id:
-        lce = LifecycleEnvironment.info({'id': lce_id, 'organization-id': org_id})
-        data['lce'] = lce
+        data['lce'] = values['lce']
 
     return data
 
@@ -2790,7 +3100,7 @@ def virt_who_hypervisor_config(
     }
 
 
-@cacheable
+@cacheable(validate=cached_entity_exists(HttpProxy))
 def make_http_proxy(options=None):
     """Creates a HTTP Proxy
 
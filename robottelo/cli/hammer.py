@@ -1,79 +1,160 @@
 """Helpers to interact with hammer command line utility."""
 import csv
+import functools
 import io
+import itertools
 import json
+import os
 import re
+import sys
+import threading
+
+_CHUNK_SIZE = 65536
+_COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+_LOG_LINES_REGEX = re.compile(r'^\[.*\n?', re.MULTILINE)
+_PUPPET_WARNING = 'Puppet and OSTree will no longer be supported in Katello 3.16'
+_PUPPET_WARNING_REGEX = re.compile(rf'^{re.escape(_PUPPET_WARNING)}$\n?', re.MULTILINE)
+_NUMBERED_VALUE_REGEX = re.compile(r'\d+\)\s+(.+)$')
+_VALUE_REGEX = re.compile(r'(.*)$')
+_NUMBER_REGEX = re.compile(r'(\d+)\)')
+_NUMBERS_REGEX = re.compile(r'\d+\)')
+_NORMALIZED_KEYS_MAX_SIZE = 4096
+# the ``time -p`` report ending stderr, after the exit status of the failures
+_TIMING_REGEX = re.compile(
+    r'(?:^|(?<=\n))(?:Command (?:exited with non-zero status|terminated by signal) \d+\n)?'
+    r'real (?P<real>\d+[.,]\d+)\nuser (?P<user>\d+[.,]\d+)\nsys (?P<sys>\d+[.,]\d+)\n?$'
+)
+# generated by scripts/hammer_command_tree.py
+_HAMMER_COMMANDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))),
+    'tests/foreman/data/hammer_commands.json',
+)
+_commands_index = None
+_commands_index_lock = threading.Lock()
+
+
+def _output_chunks(output, start=0):
+    """Yield the hammer ``output`` string from ``start`` in chunks of whole
+    lines, so only a chunk is copied at a time.
+
+    The chunks are cleaned as :func:`robottelo.ssh.execute_command` does for
+    the list output: ``""`` are removed, Rails log lines starting with ``[``
+    are skipped and color codes are stripped.
+    """
+    length = len(output)
+    while start < length:
+        end = output.find('\n', start + _CHUNK_SIZE) + 1 or length
+        chunk = output[start:end]
+        start = end
+        if '""' in chunk:
+            chunk = chunk.replace('""', '')
+        if '\n[' in chunk or chunk.startswith('['):
+            chunk = _LOG_LINES_REGEX.sub('', chunk)
+        if '\x1b' in chunk:
+            chunk = _COLOR_CODES_REGEX.sub('', chunk)
+        yield chunk
 
 
-def _csv_reader(output):
-    """An unicode CSV reader which processes unicode strings and return unicode
-    strings data.
-
-    This is needed because the builtin module does not support unicode strings,
-    from Python 2 docs::
-
-        Note: This version of the csv module doesn't support Unicode input.
-        Also, there are currently some issues regarding ASCII NUL characters.
-        Accordingly, all input should be UTF-8 or printable ASCII to be safe;"
+def _normalize(header):
+    """Replace empty spaces with '-' and lower all chars"""
+    return header.replace(' ', '-').lower()
 
-    On Python 3 this generator is not needed because the default string type is
-    unicode.
 
-    :param output: can be any object which supports the iterator protocol and
-        returns a unicode string each time its next() method is called.
-    :return: generator that will yield a list of unicode string values.
+class _NormalizedKeys(dict):
+    """Map the keys of the hammer JSON output to their normalized name.
 
+    The same keys are repeated on every entity of an output, so each one is
+    normalized only once. The mapping is cleared when it grows too much, as
+    some keys are user data, for instance the names of parameters.
     """
-    data = '\n'.join(output)
-    handler = io.StringIO(data)
 
-    yield from csv.reader(handler)
+    def __missing__(self, key):
+        if len(self) >= _NORMALIZED_KEYS_MAX_SIZE:
+            self.clear()
+        normalized = self[key] = sys.intern(_normalize(key))
+        return normalized
 
 
-def _normalize(header):
-    """Replace empty spaces with '-' and lower all chars"""
-    return header.replace(' ', '-').lower()
+_normalized_keys = _NormalizedKeys()
+
+# integers are decoded as strings to conform to csv parser
+_json_decoder = json.JSONDecoder(
+    object_pairs_hook=lambda pairs: {_normalized_keys[key]: value for key, value in pairs},
+    parse_int=str,
+)
 
 
 def parse_json(stdout):
     """Parse JSON output from Hammer CLI and convert it to python dictionary
     while normalizing keys.
+
+    Integers are converted to strings, to conform to the CSV parser. When
+    several JSON documents are printed, only the last one is parsed.
+
+    The keys are normalized and the integers converted while decoding, so the
+    parsed output is not walked again.
     """
     new_object_index = stdout.find('\n}\n{')
     if new_object_index > -1:
         stdout = stdout[new_object_index + 3 :]  # noqa: E203
-    parsed = json.loads(stdout)
-    return _normalize_obj(parsed)
+    return _json_decoder.decode(stdout)
 
 
-def _normalize_obj(obj):
-    """Normalize all dict's keys replacing empty spaces with "-" and lowering
-    chars
-    """
-    if isinstance(obj, dict):
-        return {_normalize(k): _normalize_obj(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_normalize_obj(v) for v in obj]
-    # doing this to conform to csv parser
-    elif isinstance(obj, int) and not isinstance(obj, bool):
-        return str(obj)
-    return obj
+def iter_csv(output):
+    """Parse CSV output from Hammer CLI and yield a dictionary per row.
 
+    The output is read in a single pass and the rows are built when iterated.
+    The keys of the rows are the normalized headers, shared by all the rows.
 
-def parse_csv(output):
-    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
-    try:
-        warning_index = output.index(
-            'Puppet and OSTree will no longer be supported in Katello 3.16'
-        )
-        output = output[warning_index + 1 :]  # noqa: E203
-    except ValueError:
-        pass
-    reader = _csv_reader(output)
+    :param output: the output string of the command, or the list of its
+        lines already cleaned by :func:`robottelo.ssh.execute_command`
+    """
+    if isinstance(output, str):
+        start = 0
+        index = output.find(_PUPPET_WARNING)
+        if index != -1:
+            # skip up to the warning, if it is on its own line
+            match = _PUPPET_WARNING_REGEX.search(output, max(index - 1, 0))
+            start = match.end() if match else 0
+        chunks = _output_chunks(output, start)
+        lines = itertools.chain.from_iterable(map(io.StringIO, chunks))
+    else:
+        try:
+            output = output[output.index(_PUPPET_WARNING) + 1 :]  # noqa: E203
+        except ValueError:
+            pass
+        lines = (f'{line}\n' for line in output)
+    reader = csv.reader(lines)
     # Generate the key names, spaces will be converted to dashes "-"
-    keys = [_normalize(header) for header in next(reader)]
+    keys = [sys.intern(_normalize(header)) for header in next(reader, [])]
     # For each entry, create a dict mapping each key with each value
-    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+    for values in reader:
+        if values:
+            yield dict(zip(keys, values))
+
+
+def parse_csv(output):
+    """Parse CSV output from Hammer CLI and convert it to python dictionary.
+
+    See :func:`iter_csv` for the accepted ``output``.
+    """
+    return list(iter_csv(output))
+
+
+def parse_timing(stderr):
+    """Split the ``time -p`` report from the end of the hammer ``stderr``.
+
+    :return: a tuple ``(stderr, timing)`` of the stderr without the report
+        and a dict of the ``real``, ``user`` and ``sys`` seconds, ``None``
+        when there is no report
+    """
+    if not stderr or 'real ' not in stderr:
+        return stderr, None
+    match = _TIMING_REGEX.search(stderr)
+    if match is None:
+        return stderr, None
+    timing = {name: float(value.replace(',', '.')) for name, value in match.groupdict().items()}
+    return stderr[: match.start()], timing
 
 
 def parse_help(output):
@@ -151,6 +232,53 @@ def parse_help(output):
     return contents
 
 
+def _index_commands(info, path, index):
+    index[path] = info
+    for subcommand in info['subcommands']:
+        _index_commands(subcommand, f'{path} {subcommand["name"]}', index)
+    return index
+
+
+def commands_index():
+    """Return the hammer commands help of ``hammer_commands.json``, as
+    parsed by :func:`parse_help`, in a dict keyed by the command path like
+    ``hammer host list``.
+
+    The file is only loaded and indexed on the first call.
+    """
+    global _commands_index
+    if _commands_index is None:
+        with _commands_index_lock:
+            if _commands_index is None:
+                with open(_HAMMER_COMMANDS_PATH) as commands_file:
+                    _commands_index = _index_commands(json.load(commands_file), 'hammer', {})
+    return _commands_index
+
+
+def command_info(command):
+    """Return the help of the hammer ``command`` like ``hammer host list``,
+    ``None`` if the command is not known.
+    """
+    return commands_index().get(' '.join(command.split()))
+
+
+@functools.lru_cache(maxsize=None)
+def command_options(command):
+    """Return the frozenset of the long and short options names accepted by
+    the hammer ``command``, ``None`` if the command is not known.
+
+    The hammer global options are included as hammer accepts them after the
+    sub commands too.
+    """
+    info = command_info(command)
+    if info is None:
+        return None
+    options = info['options'] + commands_index()['hammer']['options']
+    return frozenset(
+        name for option in options for name in (option['name'], option['shortname']) if name
+    )
+
+
 def get_line_indentation_spaces(line, tab_spaces=4):
     """Return the number of spaces chars the line begin with
 
@@ -159,16 +287,8 @@ def get_line_indentation_spaces(line, tab_spaces=4):
     """
     if not line or len(line) < tab_spaces:
         return 0
-    spaces = 0
-    for char in line:
-        if char not in (' ', '\t'):
-            break
-        if char == '\t':
-            spaces += tab_spaces
-        else:
-            spaces += 1
-
-    return spaces
+    indentation = line[: len(line) - len(line.lstrip(' \t'))]
+    return len(indentation) + indentation.count('\t') * (tab_spaces - 1)
 
 
 def get_line_indentation_level(line, tab_spaces=4, indentation_spaces=4):
@@ -195,119 +315,122 @@ def get_line_indentation_level(line, tab_spaces=4, indentation_spaces=4):
 
 
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
+    """Parse the info output and returns a dict mapping the values.
+
+    Each line is handled according to its indentation and separator: a
+    ``key: value`` property, a ``key:`` group of sub-properties, a
+    sub-property of the group, an item of a numbered list of sub-properties,
+    a property of a third level group or a value of a list.
+    """
     # info dictionary
     contents = {}
     sub_prop = None  # stores name of the last group of sub-properties
     sub_num = None  # is not None when list of properties
     second_level_key = None  # is set when a possible second level is detected
+    numbered_value_match = _NUMBERED_VALUE_REGEX.match
+    value_match = _VALUE_REGEX.match
+    number_match = _NUMBER_REGEX.match
+    remove_numbers = _NUMBERS_REGEX.sub
 
     for line in output:
         # skip empty lines and dividers
         if line == '' or line == '---':
             continue
-        current_indent_level = get_line_indentation_level(line)
-        if current_indent_level <= 1:
+        if line[0] not in ' \t' or len(line) < 4:
+            indent_level = 0
+        else:
+            indentation = line[: len(line) - len(line.lstrip(' \t'))]
+            indent_level = (len(indentation) + indentation.count('\t') * 3) // 4
+        if indent_level <= 1:
             # we are entering or leaving a second level from lower/upper levels
             # clear the second level key
             second_level_key = None
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>', but not by '::' which can be
-            # entity name like 'test::params::keys'
-            if line.find(':') != -1 and not line.find('::') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1 and len(line.lstrip().split(" =>", 1)) == 2:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
+        text = line.lstrip()
+        if line[0] != ' ':
+            sub_num = None  # new property implies no sub property
+            key, value = text.split(':', 1)
+            key = key.replace(' ', '-').lower()
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new sub-property
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:  # 'key: value' line
+                contents[key] = value
+            continue
 
+        # sub-properties are indented, values are separated by ':' or '=>',
+        # but not by '::' which can be entity name like 'test::params::keys'
+        if ':' in line and '::' not in line:
+            key, value = text.split(':', 1)
+        elif ' =>' in text:
+            key, value = text.split(' =>', 1)
+        else:
+            # single attribute collection properties, numbered or not
+            # Template
+            #  1) template1
+            #  2) template2
+            match = numbered_value_match(text) or value_match(text)
+            value = match.group(1)
+            group = contents[sub_prop]
+            if isinstance(group, list):
+                group.append(value)
+            elif isinstance(group, dict) and not group:
                 # adding list to 1 level, for example:
                 # {'template': ['template1', 'template2']}
-                if isinstance(contents[sub_prop], dict) and not contents[sub_prop]:
-                    contents[sub_prop] = []
-                    contents[sub_prop].append(value)
-                elif isinstance(contents[sub_prop], list):
-                    contents[sub_prop].append(value)
-                else:
-                    # adding list to 2 level, for example:
-                    # {'subscription-information':
-                    #      {'registered-by-activation-keys': ['ak1', 'ak2']}
-                    #  }
-                    last_key = list(contents[sub_prop].keys())[-1]
-                    if not contents[sub_prop][last_key]:
-                        contents[sub_prop][last_key] = [value]
-                    else:
-                        contents[sub_prop][last_key].append(value)
+                contents[sub_prop] = [value]
             else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-                value = value.lstrip()
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value
+                # adding list to 2 level, for example:
+                # {'subscription-information':
+                #      {'registered-by-activation-keys': ['ak1', 'ak2']}
+                #  }
+                last_key = next(reversed(group.keys()))
+                if not group[last_key]:
+                    group[last_key] = [value]
                 else:
-                    # a third level is always represented as a dictionary and
-                    # we need to detect if we are at third level
-                    # example:
-                    # Content Information:
-                    #     Content View:
-                    #         ID:   10
-                    #         Name: Default Organization View
-                    # the "ID" and "Name" are located at third indent level
-                    # "content view" is located at second indent level
-                    if current_indent_level == 2 and second_level_key:
-                        # we are at third level indentation
-                        if not contents[sub_prop][second_level_key]:
-                            contents[sub_prop][second_level_key] = {}
-                        contents[sub_prop][second_level_key][key] = value
-                    else:
-                        contents[sub_prop][key] = value
-                    if current_indent_level == 1 and not value:
-                        # always set the last possible second level key
-                        # that can form a third level
-                        second_level_key = key
+                    group[last_key].append(value)
+            continue
+
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        starts_with_number = number_match(key)
+        if starts_with_number:
+            sub_num = int(starts_with_number.group(1))
+            # no. 1) we need to change dict() to list()
+            if sub_num == 1:
+                contents[sub_prop] = []
+            # remove number from key
+            key = remove_numbers('', key)
+            # append empty dict to array
+            contents[sub_prop].append({})
+
+        key = key.lstrip().replace(' ', '-').lower()
+        value = value.lstrip()
+        # add value to dictionary
+        if sub_num is not None:
+            contents[sub_prop][-1][key] = value
+        elif indent_level == 2 and second_level_key:
+            # a third level is always represented as a dictionary
+            # example:
+            # Content Information:
+            #     Content View:
+            #         ID:   10
+            #         Name: Default Organization View
+            # the "ID" and "Name" are located at third indent level
+            # "content view" is located at second indent level
+            group = contents[sub_prop]
+            if not group[second_level_key]:
+                group[second_level_key] = {}
+            group[second_level_key][key] = value
         else:
-            sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
-            key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
-                sub_prop = key
-                contents[sub_prop] = {}
-            else:  # 'key: value' line
-                contents[key] = value.lstrip()
+            contents[sub_prop][key] = value
+            if indent_level == 1 and not value:
+                # always set the last possible second level key
+                # that can form a third level
+                second_level_key = key
 
     return contents
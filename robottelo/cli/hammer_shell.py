@@ -0,0 +1,369 @@
+"""Resident hammer process running the CLI commands of a host
+
+Every ``hammer`` command pays the ruby interpreter start up and the loading
+of the hammer plugins, often more than a second before any API call. When
+``ssh_client.hammer_shell`` is enabled, :meth:`robottelo.cli.base.Base.execute`
+sends the commands to a long lived ruby process started on the host instead.
+Each test process keeps a small pool of them per host and user, so the
+commands run by concurrent threads do not wait for each other. The process
+loads the hammer libraries once and runs each command in a forked child, so
+the commands still run isolated from each other with their own exit status.
+
+The commands and their outputs are exchanged over a persistent ssh channel:
+each command is a JSON line and each answer a header line, starting with a
+random sentinel and giving the exit status and the sizes of the outputs,
+followed by the outputs.
+
+Commands which need a shell, e.g. with pipes or redirections, and hosts where
+the process can not be started fall back to a ``hammer`` process per command.
+A command is never run again in a ``hammer`` process once it was sent to the
+resident process, as it may have run already.
+"""
+import atexit
+import io
+import json
+import logging
+import os
+import re
+import shlex
+import socket
+import threading
+import time
+import uuid
+
+from robottelo import ssh
+from robottelo.config import settings
+
+logger = logging.getLogger('robottelo')
+
+# commands with shell constructs are run by a shell as before
+_SHELL_SYNTAX_REGEX = re.compile(r'[|;&<>`$]')
+_RECV_CHUNK_SIZE = 32768
+_START_TIMEOUT = 120
+# resident processes per test process, host and user
+_POOL_SIZE = 4
+# seconds before trying again to start a shell on a host where it failed
+_RETRY_DELAY = 300
+
+_RUNNER_SCRIPT = '''\
+# Resident hammer process started by robottelo, see robottelo/cli/hammer_shell.py
+require 'json'
+require 'tmpdir'
+
+File.unlink(__FILE__)
+hammer, sentinel = ARGV.shift(2)
+# load the hammer libraries once, each command runs in a forked child
+begin
+  require 'hammer_cli'
+  HammerCLI::Settings.load_from_defaults
+  HammerCLI::Modules.load_all
+rescue StandardError, LoadError, SyntaxError => e
+  warn "hammer preload failed: #{e}"
+end
+output = File.join(Dir.tmpdir, "robottelo-hammer-#{Process.pid}")
+$stdout.binmode
+$stdout.sync = true
+$stdout.write("#{sentinel} ready\\n")
+while (line = $stdin.gets)
+  request = JSON.parse(line)
+  pid = fork do
+    $stdin.reopen(File::NULL)
+    $stdout.reopen("#{output}.out", 'w')
+    $stderr.reopen("#{output}.err", 'w')
+    request['env'].each { |name, value| ENV[name] = value }
+    $0 = hammer
+    ARGV.replace(request['args'])
+    load hammer
+  end
+  timed_out = false
+  killer = Thread.new do
+    sleep request['timeout']
+    timed_out = true
+    begin
+      Process.kill('KILL', pid)
+    rescue Errno::ESRCH
+      nil
+    end
+  end
+  Process.wait(pid)
+  killer.kill
+  status = timed_out ? 'timeout' : $?.exitstatus || 128 + $?.termsig
+  stdout = File.binread("#{output}.out")
+  stderr = File.binread("#{output}.err")
+  $stdout.write("#{sentinel} #{status} #{stdout.bytesize} #{stderr.bytesize}\\n", stdout, stderr)
+end
+['out', 'err'].each { |ext| File.unlink("#{output}.#{ext}") if File.exist?("#{output}.#{ext}") }
+'''
+
+
+class HammerShellError(Exception):
+    """The resident hammer process could not be started or stopped working"""
+
+
+class HammerShellNotSentError(HammerShellError):
+    """The command could not be sent to the resident hammer process, it did
+    not run
+    """
+
+
+class HammerShell:
+    """A resident hammer process on ``hostname`` and its ssh channel
+
+    :param str hostname: the host to run the commands on
+    """
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+        self.sentinel = uuid.uuid4().hex.encode()
+        self.client = None
+        self.channel = None
+        self.lock = threading.Lock()
+        self._buffer = b''
+
+    def start(self, timeout=_START_TIMEOUT):
+        """Upload the runner script and start it with the ruby of hammer"""
+        self.client = ssh.get_client(hostname=self.hostname)
+        runner = f'/tmp/robottelo-hammer-{self.sentinel.decode()}.rb'
+        sftp = self.client.open_sftp()
+        try:
+            sftp.putfo(io.BytesIO(_RUNNER_SCRIPT.encode()), runner)
+        finally:
+            sftp.close()
+        self.channel = self.client.get_transport().open_session()
+        # run the script with the interpreter of the hammer executable
+        self.channel.exec_command(
+            'hammer=$(command -v hammer) && '
+            f'LANG={settings.locale} exec $(sed -n "1s/^#! *//p" "$hammer") '
+            f'{runner} "$hammer" {self.sentinel.decode()}'
+        )
+        header = self._read_header(time.monotonic() + timeout)
+        if header != [b'ready']:
+            raise HammerShellError(f'Unexpected hammer shell answer: {header}')
+        logger.debug(f'Started hammer shell on {self.hostname}')
+
+    @property
+    def closed(self):
+        return self.client is None
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = self.channel = None
+
+    def run(self, args, env, timeout):
+        """Run hammer with ``args`` and the environment variables ``env``
+
+        :return: a tuple ``(stdout, stderr, return_code)``, the outputs in
+            bytes
+        :raises robottelo.ssh.SSHCommandTimeoutError: if the command did not
+            finish within ``timeout`` seconds
+        :raises HammerShellNotSentError: if the command could not be sent
+        :raises HammerShellError: if the answer to the command is missing or
+            malformed
+        """
+        request = json.dumps({'args': args, 'env': env, 'timeout': timeout}) + '\n'
+        with self.lock:
+            if self.closed:
+                raise HammerShellNotSentError(f'hammer shell closed on {self.hostname}')
+            try:
+                self.channel.sendall(request.encode())
+            except (OSError, EOFError) as err:
+                raise HammerShellNotSentError(f'Failed to send the hammer command: {err}')
+            # leave the runner the time to kill the command and answer
+            deadline = time.monotonic() + timeout + 10
+            header = self._read_header(deadline)
+            try:
+                status, stdout_size, stderr_size = header
+                stdout = self._read(int(stdout_size), deadline)
+                stderr = self._read(int(stderr_size), deadline)
+            except ValueError:
+                raise HammerShellError(f'Unexpected hammer shell answer: {header}')
+        if status == b'timeout':
+            raise ssh.SSHCommandTimeoutError(f'hammer shell command timed out (timeout={timeout})')
+        try:
+            return_code = int(status)
+        except ValueError:
+            raise HammerShellError(f'Unexpected hammer shell answer: {header}')
+        return stdout, stderr, return_code
+
+    def _recv(self, deadline):
+        """Receive data from the channel into the buffer"""
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise socket.timeout()
+            self.channel.settimeout(remaining)
+            data = self.channel.recv(_RECV_CHUNK_SIZE)
+        except socket.timeout:
+            # a late answer would be taken for the one of the next command
+            self.close()
+            raise ssh.SSHCommandTimeoutError(f'hammer shell did not answer on {self.hostname}')
+        if not data:
+            stderr = b''
+            while self.channel.recv_stderr_ready():
+                stderr += self.channel.recv_stderr(_RECV_CHUNK_SIZE)
+            raise HammerShellError(f'hammer shell exited on {self.hostname}: {stderr!r}')
+        self._buffer += data
+
+    def _read_header(self, deadline):
+        """Return the fields following the sentinel of the next header line"""
+        while True:
+            start = self._buffer.find(self.sentinel)
+            end = self._buffer.find(b'\n', start) if start != -1 else -1
+            if end != -1:
+                break
+            self._recv(deadline)
+        if start:
+            logger.warning(f'Unexpected hammer shell output: {self._buffer[:start]!r}')
+        header, _, self._buffer = self._buffer[start:].partition(b'\n')
+        return header.split()[1:]
+
+    def _read(self, size, deadline):
+        while len(self._buffer) < size:
+            self._recv(deadline)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class HammerShellPool:
+    """At most ``size`` started shells on ``hostname`` for ``user``, each one
+    running the commands of one thread at a time
+    """
+
+    def __init__(self, hostname, user, size=_POOL_SIZE):
+        self.hostname = hostname
+        self.user = user
+        self.size = size
+        self.idle = []
+        self.count = 0
+        self.failed_at = None
+        self.condition = threading.Condition()
+
+    @property
+    def available(self):
+        """Whether the shells can be started, not within ``_RETRY_DELAY``
+        seconds of a failed start
+        """
+        return self.failed_at is None or time.monotonic() - self.failed_at > _RETRY_DELAY
+
+    def acquire(self):
+        """Return an idle shell, starting one if none is and the pool is not
+        full, ``None`` if it can not be started
+        """
+        with self.condition:
+            while not self.idle and self.count >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            if not self.available:
+                return None
+            self.count += 1
+        shell = HammerShell(self.hostname)
+        try:
+            shell.start()
+        except Exception as err:
+            logger.warning(
+                f'Failed to start the hammer shell on {self.hostname}, '
+                f'running a hammer process per command instead: {err}'
+            )
+            shell.close()
+            with self.condition:
+                self.failed_at = time.monotonic()
+                self.count -= 1
+                self.condition.notify()
+            return None
+        return shell
+
+    def release(self, shell):
+        """Give back ``shell``, dropped from the pool when closed"""
+        with self.condition:
+            if shell.closed:
+                self.count -= 1
+            else:
+                self.idle.append(shell)
+            self.condition.notify()
+
+    def close(self):
+        """Stop the idle shells"""
+        with self.condition:
+            shells, self.idle = self.idle, []
+            self.count -= len(shells)
+            self.condition.notify_all()
+        for shell in shells:
+            shell.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(hostname, user):
+    """Return the shells pool of the current process for ``hostname`` and
+    ``user``
+    """
+    key = (os.getpid(), hostname, user)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = HammerShellPool(hostname, user)
+    return pool
+
+
+def close_shells():
+    """Stop the hammer shells of the current process"""
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if key[0] == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_shells)
+
+
+def execute(command, hostname, user=None, password=None, output_format=None, timeout=None):
+    """Run the hammer ``command`` in the hammer shell of the host
+
+    The arguments are the ones of :meth:`robottelo.cli.base.Base.execute`.
+
+    :return: a ``SSHCommandResult`` or ``None`` when the command must be run
+        in its own hammer process
+    """
+    if _SHELL_SYNTAX_REGEX.search(command):
+        return None
+    hostname = hostname or settings.server.hostname
+    pool = _get_pool(hostname, user)
+    shell = pool.acquire()
+    if shell is None:
+        return None
+    args = ['-v']
+    args.extend(['-u', user] if user else ['--interactive', 'no'])
+    if password:
+        args.extend(['-p', password])
+    if output_format:
+        args.append(f'--output={output_format}')
+    args.extend(shlex.split(command))
+    timeout = timeout or settings.ssh_client.command_timeout
+    logger.info('>>> [hammer shell] hammer %s', command)
+    client = shell.client
+    start = time.monotonic()
+    try:
+        stdout, stderr, return_code = shell.run(args, {'LANG': settings.locale}, int(timeout))
+    except HammerShellNotSentError as err:
+        # the command did not run, run it in a hammer process instead
+        logger.warning(f'hammer shell failed on {hostname}: {err}')
+        shell.close()
+        return None
+    except HammerShellError:
+        # the command may have run, it must not run again
+        shell.close()
+        raise
+    finally:
+        # the runner killed a timed out command, unless it did not answer at
+        # all and the shell was closed
+        pool.release(shell)
+    if ssh._command_hooks:
+        ssh._record_command(
+            client, f'hammer {command}', start, len(stdout) + len(stderr), return_code
+        )
+    return ssh._command_result(stdout, stderr, return_code, output_format)
@@ -0,0 +1,133 @@
+"""Run the steps of the factory setup recipes concurrently.
+
+A :class:`Recipe` is a graph of steps, each providing a value from the values
+it requires. The steps are run on a bounded thread pool as soon as the values
+they require are available, so the steps not depending on each other overlap::
+
+    recipe = Recipe()
+
+    @recipe.step('organization-id')
+    def org(values):
+        return make_org()['id']
+
+    @recipe.step('product', requires=['organization-id'])
+    def product(values):
+        return make_product({'organization-id': values['organization-id']})
+
+    @recipe.step('content-view-id', requires=['organization-id'])
+    def content_view(values):
+        return make_content_view({'organization-id': values['organization-id']})
+
+    values = recipe.run()
+
+The steps run only with side effects provide a value too, ``None`` usually,
+for the steps to run after them to require it.
+"""
+import logging
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from robottelo.config import settings
+
+logger = logging.getLogger('robottelo')
+
+_MAX_WORKERS = 4
+
+
+class RecipeError(Exception):
+    """Indicates the steps of a recipe cannot be run"""
+
+
+class RecipeStep:
+    """A step of a :class:`Recipe`, calling ``func`` with the values to get
+    the ``provides`` value once all the ``requires`` values are available.
+    """
+
+    def __init__(self, func, provides, requires=()):
+        self.func = func
+        self.provides = provides
+        self.requires = tuple(requires)
+
+    def __repr__(self):
+        return f'<RecipeStep {self.func.__name__}: {self.requires} -> {self.provides!r}>'
+
+
+class Recipe:
+    """A graph of :class:`RecipeStep`, run concurrently on at most
+    ``max_workers`` threads, ``performance.factory_workers`` by default.
+
+    The values given to :meth:`run` are not provided by the steps again, so
+    the same recipe creates only the entities that were not given.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None and settings.performance:
+            max_workers = settings.performance.factory_workers
+        self.max_workers = max(int(max_workers or _MAX_WORKERS), 1)
+        self.steps = []
+
+    def step(self, provides, requires=()):
+        """Decorator adding the decorated function as a step providing the
+        ``provides`` value, called with the dict of the values once all the
+        ``requires`` values are available.
+        """
+
+        def decorator(func):
+            self.steps.append(RecipeStep(func, provides, requires))
+            return func
+
+        return decorator
+
+    def _pending_steps(self, values):
+        provided = set(values)
+        steps = []
+        for step in self.steps:
+            if step.provides in provided:
+                continue
+            provided.add(step.provides)
+            steps.append(step)
+        missing = {name for step in steps for name in step.requires if name not in provided}
+        if missing:
+            raise RecipeError(f'No step provides the required values {sorted(missing)}')
+        return steps
+
+    def run(self, values=None):
+        """Run the steps and return the dict of the given and provided values
+
+        When a step fails, no step is started anymore and its exception is
+        raised once the running steps are done.
+
+        :param dict values: the values already known, their steps are skipped
+        :raises robottelo.cli.recipe.RecipeError: If a required value is not
+            provided by any step or the steps depend on each other.
+        """
+        values = dict(values or {})
+        pending = self._pending_steps(values)
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for step in [
+                        step for step in pending if all(name in values for name in step.requires)
+                    ]:
+                        pending.remove(step)
+                        # a copy, the running steps don't see the values changing
+                        running[executor.submit(step.func, dict(values))] = step
+                if not running:
+                    if error is None:
+                        raise RecipeError(f'The steps {pending} depend on each other')
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        values[step.provides] = future.result()
+                    except Exception as err:
+                        logger.debug(f'Recipe step {step.func.__name__} failed: {err!r}')
+                        if error is None:
+                            error = err
+        if error is not None:
+            raise error
+        return values
@@ -25,8 +25,8 @@ class Task(Base):
     command_base = 'task'
 
     @classmethod
-    def progress(cls, options=None, return_raw_response=None):
-        """Shows a task progress
+    def progress(cls, options=None, return_raw_response=None, timeout=None):
+        """Shows a task progress, waiting for the task to finish
 
         Usage::
             hammer task progress [OPTIONS]
@@ -37,7 +37,9 @@ class Task(Base):
         """
         cls.command_sub = 'progress'
         return cls.execute(
-            cls._construct_command(options), return_raw_response=return_raw_response
+            cls._construct_command(options),
+            return_raw_response=return_raw_response,
+            timeout=timeout,
         )
 
     @classmethod
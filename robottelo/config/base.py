@@ -1038,6 +1038,10 @@ class PerformanceSettings(FeatureSettings):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.time_hammer = None
+        self.lazy_create_info = None
+        self.validate_hammer_options = None
+        self.factory_workers = None
+        self.async_repository_sync = None
         self.cdn_address = None
         self.virtual_machines = None
         self.fresh_install_savepoint = None
@@ -1050,6 +1054,14 @@ class PerformanceSettings(FeatureSettings):
     def read(self, reader):
         """Read performance settings."""
         self.time_hammer = reader.get('performance', 'time_hammer', False, bool)
+        self.lazy_create_info = reader.get('performance', 'lazy_create_info', False, bool)
+        self.validate_hammer_options = reader.get(
+            'performance', 'validate_hammer_options', True, bool
+        )
+        self.factory_workers = reader.get('performance', 'factory_workers', 4, int)
+        self.async_repository_sync = reader.get(
+            'performance', 'async_repository_sync', False, bool
+        )
         self.cdn_address = reader.get('performance', 'cdn_address')
         self.virtual_machines = reader.get('performance', 'virtual_machines', cast=list)
         self.fresh_install_savepoint = reader.get('performance', 'fresh_install_savepoint')
@@ -1098,6 +1110,11 @@ class SSHClientSettings(FeatureSettings):
         super().__init__(*args, **kwargs)
         self._command_timeout = None
         self._connection_timeout = None
+        self._connection_pooling = None
+        self._pool_idle_timeout = None
+        self._pool_max_idle = None
+        self._output_spool_size = None
+        self._hammer_shell = None
 
     @property
     def command_timeout(self):
@@ -1107,12 +1124,45 @@ class SSHClientSettings(FeatureSettings):
     def connection_timeout(self):
         return self._connection_timeout if (self._connection_timeout is not None) else 10
 
+    @property
+    def connection_pooling(self):
+        return self._connection_pooling if (self._connection_pooling is not None) else True
+
+    @property
+    def pool_idle_timeout(self):
+        return self._pool_idle_timeout if (self._pool_idle_timeout is not None) else 60
+
+    @property
+    def pool_max_idle(self):
+        return self._pool_max_idle if (self._pool_max_idle is not None) else 4
+
+    @property
+    def output_spool_size(self):
+        if self._output_spool_size is not None:
+            return self._output_spool_size
+        return 10485760
+
+    @property
+    def hammer_shell(self):
+        return self._hammer_shell if (self._hammer_shell is not None) else False
+
     def read(self, reader):
         """Read SSHClient settings."""
         self._command_timeout = reader.get('ssh_client', 'command_timeout', default=300, cast=int)
         self._connection_timeout = reader.get(
             'ssh_client', 'connection_timeout', default=10, cast=int
         )
+        self._connection_pooling = reader.get(
+            'ssh_client', 'connection_pooling', default=True, cast=bool
+        )
+        self._pool_idle_timeout = reader.get(
+            'ssh_client', 'pool_idle_timeout', default=60, cast=int
+        )
+        self._pool_max_idle = reader.get('ssh_client', 'pool_max_idle', default=4, cast=int)
+        self._output_spool_size = reader.get(
+            'ssh_client', 'output_spool_size', default=10485760, cast=int
+        )
+        self._hammer_shell = reader.get('ssh_client', 'hammer_shell', default=False, cast=bool)
 
     def validate(self):
         """Validate SSHClient settings."""
@@ -1231,6 +1281,7 @@ class SharedFunctionSettings(FeatureSettings):
         self.redis_db = None
         self.redis_password = None
         self.call_retries = None
+        self.pool_size = None
 
     def read(self, reader):
         """Read shared settings."""
@@ -1246,6 +1297,7 @@ class SharedFunctionSettings(FeatureSettings):
         self.redis_db = reader.get('shared_function', 'redis_db', 0, int)
         self.redis_password = reader.get('shared_function', 'redis_password', None)
         self.call_retries = reader.get('shared_function', 'call_retries', 2, int)
+        self.pool_size = reader.get('shared_function', 'pool_size', 2, int)
 
     def validate(self):
         """Validate the shared settings"""
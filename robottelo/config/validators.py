@@ -185,6 +185,10 @@ validators = dict(
             must_exist=True,
         ),
         Validator("performance.time_hammer", default=False),
+        Validator("performance.lazy_create_info", default=False),
+        Validator("performance.validate_hammer_options", default=True),
+        Validator("performance.factory_workers", default=4),
+        Validator("performance.async_repository_sync", default=False),
         Validator("performance.csv_buckets_count", default=10),
         Validator("performance.sync_count", default=3),
         Validator("performance.sync_type", default='sync'),
@@ -234,6 +238,14 @@ validators = dict(
         Validator("shared_function.redis_port", default=6379),
         Validator("shared_function.redis_db", default=0),
         Validator("shared_function.call_retries", default=2),
+        Validator("shared_function.pool_size", default=2),
+    ],
+    ssh_client=[
+        Validator("ssh_client.connection_pooling", default=True),
+        Validator("ssh_client.pool_idle_timeout", default=60),
+        Validator("ssh_client.pool_max_idle", default=4),
+        Validator("ssh_client.output_spool_size", default=10485760),
+        Validator("ssh_client.hammer_shell", default=False),
     ],
     upgrade=[
         Validator("upgrade.rhev_cap_host", must_exist=False)
@@ -1,5 +1,11 @@
 """Implements various decorators"""
+import hashlib
+import importlib
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
 import unittest2
@@ -7,7 +13,7 @@ import unittest2
 from robottelo.config import settings
 
 LOGGER = logging.getLogger('robottelo')
-OBJECT_CACHE = {}
+OBJECT_CACHE_MAX_SIZE = 128
 
 
 def setting_is_set(option):
@@ -98,24 +104,168 @@ def skip_if_not_set(*options):
     return decorator
 
 
-def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+def _normalize_options(options):
+    """Return the ``options`` as they are passed to hammer, see
+    :meth:`robottelo.cli.base.Base._construct_command`
+    """
+    normalized = {}
+    for key, value in (options or {}).items():
+        if value is None or value is False:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ','.join(str(item) for item in value)
+        normalized[key] = value if value is True else str(value)
+    return normalized
 
-    @wraps(func)
-    def cacheable_function(options=None, cached=False):
-        """
-        This is the function being returned.
-        Requires input function's name start with 'make_'
+
+def _object_cache_key(object_name, options):
+    """Return the key of the object made by ``object_name`` with ``options``"""
+    text = json.dumps(_normalize_options(options), sort_keys=True)
+    return f'{object_name}.{hashlib.md5(text.encode()).hexdigest()}'
+
+
+class ObjectCache:
+    """Cache of the objects made by the :func:`cacheable` functions.
+
+    The least recently used objects are evicted beyond ``maxsize`` objects and
+    the objects expire ``ttl`` seconds after their creation, if set.
+
+    When the shared functions are enabled, the objects are stored in the
+    shared function storage too, so the other processes reuse them, for
+    ``ttl`` or ``shared_function.share_timeout`` seconds.
+    """
+
+    def __init__(self, maxsize=OBJECT_CACHE_MAX_SIZE, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._objects = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def _shared(self):
+        # imported here as the shared functions use this module, the module
+        # attribute of the package is the shared decorator
+        return importlib.import_module('robottelo.decorators.func_shared.shared')
+
+    def _storage(self):
+        """Return the shared function storage handler and the prefix of the
+        storage keys, ``None`` if the shared functions are disabled
         """
-        object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
-
-    return cacheable_function
+        shared = self._shared()
+        shared._check_config()
+        if not shared.ENABLED:
+            return None
+        return shared._get_default_storage_handler(), f'{shared._get_scope_name()}.object_cache'
+
+    def _shared_ttl(self):
+        return self.ttl or self._shared().SHARE_DEFAULT_TIMEOUT
+
+    def get(self, key):
+        """Return the object of ``key``, ``None`` if not cached"""
+        with self._lock:
+            if key in self._objects:
+                created, value = self._objects[key]
+                if self.ttl is None or time.time() < created + self.ttl:
+                    self._objects.move_to_end(key)
+                    return value
+                del self._objects[key]
+        storage = self._storage()
+        if storage is None:
+            return None
+        handler, prefix = storage
+        with handler.lock(f'{prefix}.{key}') as data:
+            handler.when_lock_acquired(data)
+            entry = handler.get(f'{prefix}.{key}')
+        if not entry or time.time() >= entry['created'] + self._shared_ttl():
+            return None
+        self._set_local(key, entry['value'], entry['created'])
+        return entry['value']
+
+    def _set_local(self, key, value, created):
+        with self._lock:
+            self._objects[key] = (created, value)
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.maxsize:
+                self._objects.popitem(last=False)
+
+    def _set_shared(self, key, entry):
+        storage = self._storage()
+        if storage is None:
+            return
+        handler, prefix = storage
+        with handler.lock(f'{prefix}.{key}') as data:
+            handler.when_lock_acquired(data)
+            handler.set(f'{prefix}.{key}', entry)
+
+    def set(self, key, value):
+        """Cache the ``value`` object of ``key``"""
+        created = time.time()
+        self._set_local(key, value, created)
+        try:
+            self._set_shared(key, {'created': created, 'value': value})
+        except TypeError as err:
+            LOGGER.warning(f'Object {key} not shared, it is not json compatible: {err}')
+
+    def pop(self, key):
+        """Remove the object of ``key`` from the cache"""
+        with self._lock:
+            self._objects.pop(key, None)
+        self._set_shared(key, None)
+
+    def clear(self):
+        """Remove all the objects from the local cache"""
+        with self._lock:
+            self._objects.clear()
+
+
+OBJECT_CACHE = ObjectCache()
+
+
+def cacheable(function_=None, validate=None):
+    """Decorator that makes an optional object cache available
+
+    The decorated ``make_*`` function accepts a ``cached`` argument, when
+    ``True`` the object made before with the same options is returned, see
+    :class:`ObjectCache`.
+
+    :param function_: the function that is intended to be cached
+    :param validate: a function called with a cached object and the options,
+        returning whether the object can still be used, a new object is made
+        otherwise
+    """
+
+    def main_wrapper(func):
+        object_name = func.__name__.replace('make_', '')
+
+        @wraps(func)
+        def cacheable_function(options=None, cached=False):
+            """
+            This is the function being returned.
+            Requires input function's name start with 'make_'
+            """
+            if cached is not True:
+                return func(options)
+            key = _object_cache_key(object_name, options)
+            new_object = OBJECT_CACHE.get(key)
+            if new_object is not None:
+                if validate is None or validate(new_object, options):
+                    return new_object
+                LOGGER.debug(f'Cached {object_name} {new_object.get("id")} does not exist anymore')
+                OBJECT_CACHE.pop(key)
+            new_object = func(options)
+            OBJECT_CACHE.set(key, new_object)
+            return new_object
+
+        return cacheable_function
+
+    if function_:
+        return main_wrapper(function_)
+    return main_wrapper
 
 
 class ProjectModeError(Exception):
@@ -1,3 +1,4 @@
+from robottelo.decorators.func_shared.shared import pooled  # noqa
 from robottelo.decorators.func_shared.shared import shared  # noqa
 from robottelo.decorators.func_shared.shared import SharedFunctionError  # noqa
 from robottelo.decorators.func_shared.shared import SharedFunctionException  # noqa
@@ -83,6 +83,36 @@ Usage::
             # create a virtual machine
 
             return dict(org=cls.org, repo=cls.repo}
+
+Pooled function is a decorator keeping ready made results of an expensive
+function, like an organization with an uploaded manifest and a published
+content view, in the shared function storage. Each call checks out a result no
+other caller, of the same or other processes, will get, and a background thread
+makes new results to keep the pool full. The pooled function must not have
+arguments, as all its results are interchangeable.
+
+Usage::
+
+    from robottelo.decorators.func_shared.shared import pooled
+
+    @pooled(size=2)
+    def org_with_manifest():
+        org = make_org()
+        # upload manifest
+        return org
+
+    @pytest.fixture(scope='module')
+    def module_org_with_manifest():
+        return org_with_manifest()
+
+    # start to fill the pool ahead of the first call
+    org_with_manifest.pool.warm()
+
+The results being made are counted in the pool for ``fill_timeout`` seconds,
+the ``shared_function.lock_timeout`` by default, or until their process is
+found dead on the same host, so that the other processes do not make more of
+them than needed. See ``setup_pooled_org_with_rh_repo`` in
+``robottelo.cli.factory`` for a pooled setup.
 """
 import datetime
 import functools
@@ -90,7 +120,9 @@ import hashlib
 import inspect
 import logging
 import os
+import socket
 import sys
+import threading
 import traceback
 import uuid
 from importlib import import_module
@@ -115,10 +147,13 @@ NAMESPACE_SCOPE = None
 # after 24 hours the shared function data will became not valid
 SHARE_DEFAULT_TIMEOUT = 86400
 DEFAULT_CALL_RETRIES = 2
+# the number of ready results kept by the entity pools
+DEFAULT_POOL_SIZE = 2
 
 _configured = False
 
 _NAMESPACE_SCOPE_KEY_TYPE = 'shared_function'
+_POOL_NAMESPACE_SCOPE_KEY_TYPE = 'entity_pool'
 _DEFAULT_CLASS_NAME_DEPTH = 3
 
 _STATE_READY = 'READY'
@@ -141,12 +176,14 @@ def _check_config():
     global NAMESPACE_SCOPE
     global SHARE_DEFAULT_TIMEOUT
     global DEFAULT_CALL_RETRIES
+    global DEFAULT_POOL_SIZE
     if not _configured and setting_is_set('shared_function'):
         DEFAULT_STORAGE_HANDLER = settings.shared_function.storage
         ENABLED = settings.shared_function.enabled
         NAMESPACE_SCOPE = settings.shared_function.scope
         SHARE_DEFAULT_TIMEOUT = settings.shared_function.share_timeout
         DEFAULT_CALL_RETRIES = settings.shared_function.call_retries
+        DEFAULT_POOL_SIZE = settings.shared_function.pool_size
         file_storage.LOCK_TIMEOUT = settings.shared_function.lock_timeout
         redis_storage.LOCK_TIMEOUT = settings.shared_function.lock_timeout
         redis_storage.REDIS_HOST = settings.shared_function.redis_host
@@ -572,3 +609,219 @@ def shared(
         return main_wrapper(function_)
     else:
         return wait_function
+
+
+class EntityPool:
+    """Keep ``size`` results of ``function`` ready in the shared function
+    storage under ``name``.
+
+    :param name: the name of the pool in the storage
+    :param function: the function without arguments making a new result
+    :param size: the number of results to keep ready, the
+        ``shared_function.pool_size`` setting by default
+    :param scope: the namespace of the pool, like the shared functions scope
+    :param scope_kwargs: kwargs to be passed to scope if is a callable
+    :param timeout: the time in seconds the results can be checked out, the
+        ``shared_function.share_timeout`` setting by default
+    :param fill_timeout: the time in seconds after which a result still being
+        made is not waited for anymore, as its process may have been
+        interrupted, the ``shared_function.lock_timeout`` setting by default.
+        A result taking longer to be made is not counted in the pool anymore,
+        which is then overfilled.
+    """
+
+    def __init__(
+        self,
+        name,
+        function,
+        size=None,
+        scope=_get_default_scope,
+        scope_kwargs=None,
+        timeout=None,
+        fill_timeout=None,
+    ):
+        self.name = name
+        self.function = function
+        self.scope = scope
+        self.scope_kwargs = scope_kwargs
+        # the defaults are read from the settings when used, the pooled
+        # functions being created at import time
+        self._size = size
+        self._timeout = timeout
+        self._fill_timeout = fill_timeout
+        self._storage_handler = None
+        self._fill_thread = None
+        self._fill_thread_lock = threading.Lock()
+
+    @property
+    def size(self):
+        _check_config()
+        return DEFAULT_POOL_SIZE if self._size is None else self._size
+
+    @property
+    def timeout(self):
+        _check_config()
+        return SHARE_DEFAULT_TIMEOUT if self._timeout is None else self._timeout
+
+    @property
+    def fill_timeout(self):
+        _check_config()
+        return file_storage.LOCK_TIMEOUT if self._fill_timeout is None else self._fill_timeout
+
+    @property
+    def storage(self):
+        if self._storage_handler is None:
+            self._storage_handler = _get_default_storage_handler()
+        return self._storage_handler
+
+    @property
+    def key(self):
+        scope_name = _get_scope_name(scope=self.scope, scope_kwargs=self.scope_kwargs)
+        return '.'.join([scope_name, _POOL_NAMESPACE_SCOPE_KEY_TYPE, self.name])
+
+    def _has_expired(self, entry, timeout):
+        creation_datetime = datetime.datetime.strptime(
+            entry['creation_datetime'], _DATETIME_FORMAT
+        )
+        return datetime.datetime.utcnow() >= creation_datetime + datetime.timedelta(
+            seconds=timeout
+        )
+
+    def _get_state(self):
+        """Return the pool state without its expired entries, the storage
+        must be locked
+        """
+        state = self.storage.get(self.key) or {'ready': [], 'filling': []}
+        state['ready'] = [
+            entry for entry in state['ready'] if not self._has_expired(entry, self.timeout)
+        ]
+        state['filling'] = [
+            entry
+            for entry in state['filling']
+            if not self._has_expired(entry, self.fill_timeout) and self._filler_alive(entry)
+        ]
+        return state
+
+    @staticmethod
+    def _filler_alive(entry):
+        """Whether the process making the result of ``entry`` still runs, only
+        known for the processes of this host
+        """
+        if entry.get('hostname') != socket.gethostname():
+            return True
+        try:
+            os.kill(entry['pid'], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _new_entry(self, **kwargs):
+        return dict(
+            id=uuid.uuid4().hex,
+            pid=os.getpid(),
+            hostname=socket.gethostname(),
+            creation_datetime=datetime.datetime.utcnow().strftime(_DATETIME_FORMAT),
+            **kwargs,
+        )
+
+    def _reserve(self):
+        """Return the entry of a new result to make, ``None`` if the pool is
+        full or is being filled enough by the other callers
+        """
+        with self.storage.lock(self.key) as data:
+            self.storage.when_lock_acquired(data)
+            state = self._get_state()
+            if len(state['ready']) + len(state['filling']) >= self.size:
+                return None
+            entry = self._new_entry()
+            state['filling'].append(entry)
+            self.storage.set(self.key, state)
+        return entry
+
+    def _release(self, reserved, result=None, failed=False):
+        with self.storage.lock(self.key) as data:
+            self.storage.when_lock_acquired(data)
+            state = self._get_state()
+            state['filling'] = [
+                entry for entry in state['filling'] if entry['id'] != reserved['id']
+            ]
+            if not failed:
+                state['ready'].append(self._new_entry(result=result))
+            self.storage.set(self.key, state)
+
+    def fill(self):
+        """Make new results until the pool is full"""
+        for _ in range(self.size):
+            reserved = self._reserve()
+            if reserved is None:
+                return
+            logger.info(f'filling the entity pool: {self.key}')
+            try:
+                result = self.function()
+            except Exception:
+                self._release(reserved, failed=True)
+                raise
+            self._release(reserved, result)
+
+    def _fill_in_background(self):
+        try:
+            self.fill()
+        except Exception as err:
+            logger.exception(f'failed to fill the entity pool: {self.key}: {err}')
+
+    def warm(self):
+        """Fill the pool in a background thread, if not already filling"""
+        _check_config()
+        if not ENABLED or self.size <= 0:
+            return
+        with self._fill_thread_lock:
+            if self._fill_thread is None or not self._fill_thread.is_alive():
+                self._fill_thread = threading.Thread(
+                    target=self._fill_in_background, name=f'pool-{self.name}', daemon=True
+                )
+                self._fill_thread.start()
+
+    def checkout(self):
+        """Return a result of the pool, removed from it, or a new result if
+        none is ready, and refill the pool in the background.
+        """
+        _check_config()
+        if not ENABLED:
+            return self.function()
+        with self.storage.lock(self.key) as data:
+            self.storage.when_lock_acquired(data)
+            state = self._get_state()
+            entry = state['ready'].pop(0) if state['ready'] else None
+            self.storage.set(self.key, state)
+        self.warm()
+        if entry is None:
+            logger.info(f'no ready result in the entity pool: {self.key}')
+            return self.function()
+        return entry['result']
+
+
+def pooled(function_=None, name=None, **pool_kwargs):
+    """Decorator making the calls of the decorated function check out the
+    results of an :class:`EntityPool`, available as its ``pool`` attribute.
+
+    :param function_: the function that is intended to be pooled
+    :param name: the name of the pool, the function module and name by
+        default
+    :param pool_kwargs: the other :class:`EntityPool` arguments
+    """
+
+    def main_wrapper(func):
+        pool = EntityPool(name or _get_function_name(func), func, **pool_kwargs)
+
+        @functools.wraps(func)
+        def function_wrapper():
+            return pool.checkout()
+
+        function_wrapper.pool = pool
+        return function_wrapper
+
+    if function_:
+        return main_wrapper(function_)
+    return main_wrapper
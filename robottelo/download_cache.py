@@ -0,0 +1,154 @@
+"""Content addressed cache of downloaded files shared by the test processes
+
+Files are stored once under ``<tmp_dir>/robottelo/download_cache/blobs``,
+named by their sha256 checksum, and copied from there to the requested
+location. The pytest xdist workers share the cache: a file lock per artifact
+ensures only one of them downloads it, the others wait for it and reuse the
+stored copy. The cache persists between runs, so that unchanged artifacts are
+not downloaded again:
+
+* remote files are looked up by the checksum of their remote content, see
+  ``robottelo.ssh.download_file``.
+* URLs are revalidated with a conditional request using the ``ETag`` and
+  ``Last-Modified`` headers of the cached response, see :func:`fetch_url`.
+
+Usage::
+
+    from robottelo import download_cache
+
+    local_file = download_cache.fetch_url('https://example.com/file.xml')
+    download_cache.copy_to(local_file, '/tmp/file.xml')
+
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import requests
+from pytest_services.locks import file_lock
+
+from robottelo.decorators.func_locker import get_temp_dir
+from robottelo.decorators.func_locker import LOCK_DEFAULT_TIMEOUT
+
+logger = logging.getLogger('robottelo')
+
+CACHE_DIR_NAME = os.path.join('robottelo', 'download_cache')
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_cache_dir(*paths):
+    """Return the path of the cache directory or of a sub directory of it,
+    creating it if needed
+    """
+    cache_dir = os.path.join(get_temp_dir(), CACHE_DIR_NAME, *paths)
+    # the workers may create the same directory at the same time
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _key_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_blob(checksum):
+    """Return the path of the cached file with the sha256 ``checksum`` or
+    ``None`` if there is no such file in the cache
+    """
+    blob = os.path.join(get_cache_dir('blobs'), checksum)
+    return blob if os.path.exists(blob) else None
+
+
+@contextmanager
+def lock(key, timeout=LOCK_DEFAULT_TIMEOUT):
+    """Lock the cache entry ``key`` across the processes sharing the cache"""
+    lock_file = os.path.join(get_cache_dir('locks'), f'{_key_digest(key)}.lock')
+    with file_lock(lock_file, remove=False, timeout=timeout):
+        yield
+
+
+def store(chunks, checksum=None):
+    """Write the ``chunks`` of bytes to the cache and return the path of the
+    stored file
+
+    The content is streamed to a temporary file which is atomically renamed to
+    its checksum once complete, so a cached file is never seen partially
+    written.
+
+    :param chunks: an iterable of bytes
+    :param str checksum: the expected sha256 checksum of the content, an
+        ``IOError`` is raised if the content does not match it
+    """
+    blobs_dir = get_cache_dir('blobs')
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=blobs_dir, prefix='.tmp', delete=False) as tmp_file:
+        try:
+            for chunk in chunks:
+                digest.update(chunk)
+                tmp_file.write(chunk)
+        except BaseException:
+            os.unlink(tmp_file.name)
+            raise
+    if checksum is not None and digest.hexdigest() != checksum:
+        os.unlink(tmp_file.name)
+        raise OSError(f'Checksum mismatch, expected {checksum} got {digest.hexdigest()}')
+    blob = os.path.join(blobs_dir, digest.hexdigest())
+    os.replace(tmp_file.name, blob)
+    return blob
+
+
+def _write_json(path, data):
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), delete=False) as tmp_file:
+        json.dump(data, tmp_file)
+    os.replace(tmp_file.name, path)
+
+
+def fetch_url(url, timeout=LOCK_DEFAULT_TIMEOUT):
+    """Return the path of the cached copy of ``url``, downloading it first if
+    it is not in the cache or has changed since it was cached
+
+    :param str url: the URL of the file to download
+    :param int timeout: time to wait for another process downloading the same
+        URL
+    """
+    entry_file = os.path.join(get_cache_dir('urls'), f'{_key_digest(url)}.json')
+    with lock(url, timeout=timeout):
+        entry = {}
+        if os.path.exists(entry_file):
+            with open(entry_file) as handler:
+                entry = json.load(handler)
+        blob = get_blob(entry['sha256']) if entry.get('sha256') else None
+        headers = {}
+        if blob is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        with requests.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if blob is not None and response.status_code == 304:
+                logger.debug(f'Using cached {url}')
+                return blob
+            logger.debug(f'Downloading {url} to the cache')
+            blob = store(response.iter_content(CHUNK_SIZE))
+            entry = {
+                'sha256': os.path.basename(blob),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+        _write_json(entry_file, entry)
+    return blob
+
+
+def copy_to(blob, local_file):
+    """Copy the cached ``blob`` to ``local_file`` atomically"""
+    local_dir = os.path.dirname(os.path.abspath(local_file))
+    with tempfile.NamedTemporaryFile(dir=local_dir, prefix='.tmp', delete=False) as tmp_file:
+        with open(blob, 'rb') as source:
+            shutil.copyfileobj(source, tmp_file, CHUNK_SIZE)
+    os.chmod(tmp_file.name, 0o644)
+    os.replace(tmp_file.name, local_file)
+    return local_file
@@ -10,6 +10,7 @@ from urllib.parse import urljoin  # noqa
 import requests
 from nailgun.config import ServerConfig
 
+from robottelo import download_cache
 from robottelo import ssh
 from robottelo.cli.base import CLIReturnCodeError
 from robottelo.cli.proxy import CapsuleTunnelError
@@ -18,9 +19,13 @@ from robottelo.constants import PULP_PUBLISHED_YUM_REPOS_PATH
 from robottelo.constants import RHEL_6_MAJOR_VERSION
 from robottelo.constants import RHEL_7_MAJOR_VERSION
 from robottelo.errors import GCECertNotFoundError
+from robottelo.host_info import cached_host_query
 
 LOGGER = logging.getLogger('robottelo')
 
+# the hostnames of the content hosts are reused by the provisioned VMs
+HOST_INFO_TTL = 300
+
 
 class DataFileError(Exception):
     """Indicates any issue when reading a data file."""
@@ -81,7 +86,7 @@ class ServerFileDownloader:
 download_server_file = ServerFileDownloader()
 
 
-def file_downloader(file_url, local_path=None, file_name=None, hostname=None):
+def file_downloader(file_url, local_path=None, file_name=None, hostname=None, cache=True):
     """Downloads file from given fileurl to directory specified by local_path
     with given file_name on host specified by hostname. Leave hostname as None
     to download file on the localhost.If remote directory is not specified it
@@ -94,6 +99,9 @@ def file_downloader(file_url, local_path=None, file_name=None, hostname=None):
     :param str file_name: Name of the file to be saved with. If not provided filename
         from url will be used.
     :param str hostname: Hostname of server where the file need to be downloaded.
+    :param bool cache: when downloading on localhost, get the file through the
+        local download cache shared by the test processes, which only downloads
+        it again when it changed. See ``robottelo.download_cache``.
     :returns: Returns list containing complete file path and name of downloaded file.
     """
     if file_name is None:
@@ -103,11 +111,14 @@ def file_downloader(file_url, local_path=None, file_name=None, hostname=None):
 
     # download on localhost
     if hostname is None:
-        with open(f'{local_path}{file_name}', 'wb') as fileobj:
-            r = requests.get(file_url)
-            r.raise_for_status()
-            fileobj.write(r.content)
-            fileobj.close()
+        if cache:
+            download_cache.copy_to(download_cache.fetch_url(file_url), f'{local_path}{file_name}')
+        else:
+            with requests.get(file_url, stream=True) as r:
+                r.raise_for_status()
+                with open(f'{local_path}{file_name}', 'wb') as fileobj:
+                    for chunk in r.iter_content(download_cache.CHUNK_SIZE):
+                        fileobj.write(chunk)
         if not os.path.exists(f"{local_path}{file_name}"):
             raise DownloadFileError(f'Unable to download {file_name}')
     # download on any server.
@@ -150,6 +161,7 @@ def get_server_version():
     return result
 
 
+@cached_host_query(ttl=HOST_INFO_TTL)
 def get_host_info(hostname=None):
     """Get remote host's distribution information
 
@@ -536,11 +548,11 @@ def create_repo(name, repo_fetch_url=None, packages=None, wipe_repodata=False, h
         # Add trailing slash if it's not there already
         if not repo_fetch_url.endswith('/'):
             repo_fetch_url += '/'
-        for package in packages:
-            result = ssh.command(
-                f'wget -P {repo_path} {urljoin(repo_fetch_url, package)}',
-                hostname=hostname,
-            )
+        results = ssh.command_many(
+            [f'wget -P {repo_path} {urljoin(repo_fetch_url, package)}' for package in packages],
+            hostname=hostname,
+        )
+        for package, result in zip(packages, results):
             if result.return_code != 0:
                 raise CLIReturnCodeError(
                     result.return_code,
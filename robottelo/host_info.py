@@ -1,23 +1,108 @@
 """Module that gather several informations about host"""
 import functools
+import inspect
 import logging
 import os
 import re
+import threading
+import time
 
 from packaging.version import Version
 
 from robottelo import ssh
 from robottelo.cli.base import CLIReturnCodeError
+from robottelo.config import settings
 
 LOGGER = logging.getLogger('robottelo')
 
 
-@functools.lru_cache(maxsize=1)
-def get_host_os_version():
+class HostQueryCache:
+    """Results of read-only remote queries, kept per host for a time to live
+
+    The entries are keyed by ``(hostname, query, arguments)``, so different
+    Satellites never share a result, and expire after the ``ttl`` seconds of
+    their query, never when it is ``None``.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, ttl, compute):
+        """Return the cached result of ``key``, calling ``compute`` to get it
+        when it is missing or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > now):
+            return entry[0]
+        # queries are idempotent, concurrent misses may both run it
+        result = compute()
+        with self._lock:
+            self._entries[key] = (result, None if ttl is None else now + ttl)
+        return result
+
+    def invalidate(self, hostname=None, query=None):
+        """Drop the entries of ``hostname`` and ``query``, all the entries
+        when both are ``None``
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (hostname is None or key[0] == hostname) and (query is None or key[1] == query):
+                    del self._entries[key]
+
+
+_host_query_cache = HostQueryCache()
+
+
+def cached_host_query(ttl=None):
+    """Cache the results of a read-only remote query function per host
+
+    The decorated function must accept a ``hostname`` argument, ``None``
+    meaning ``server.hostname`` from the configuration, and its other
+    arguments must be hashable. The results are cached per host, for ``ttl``
+    seconds or until invalidated when ``ttl`` is ``None``.
+    ``func.cache_clear()`` drops the cached results of the function and
+    :func:`invalidate_host_cache` the results of a host.
+
+    :param int ttl: time to live of the results in seconds
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        query = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            hostname = arguments.pop('hostname', None) or settings.server.hostname
+            key = (hostname, query, tuple(arguments.items()))
+            return _host_query_cache.get(key, ttl, lambda: func(*args, **kwargs))
+
+        wrapper.cache_clear = lambda: _host_query_cache.invalidate(query=query)
+        return wrapper
+
+    return decorator
+
+
+def invalidate_host_cache(hostname=None):
+    """Drop the cached query results of ``hostname``, of all the hosts when it
+    is ``None``
+
+    To be called when the host changes in a way the cached queries may see,
+    e.g. after an upgrade, an installer run or a services restart.
+    """
+    LOGGER.debug(f'Invalidating the cached queries of {hostname or "all hosts"}')
+    _host_query_cache.invalidate(hostname=hostname)
+
+
+@cached_host_query()
+def get_host_os_version(hostname=None):
     """Fetches host's OS version through SSH
     :return: str with version
     """
-    cmd = ssh.command('cat /etc/redhat-release')
+    cmd = ssh.command('cat /etc/redhat-release', hostname=hostname)
     if cmd.stdout:
         version_description = cmd.stdout[0]
         version_re = r'Red Hat Enterprise Linux Server release (?P<version>\d(\.\d)*)'
@@ -36,14 +121,15 @@ _SAT_6_2_VERSION_COMMAND = 'rpm -q satellite'
 _SAT_6_1_VERSION_COMMAND = 'grep "VERSION" /usr/share/foreman/lib/satellite/version.rb'
 
 
-@functools.lru_cache(maxsize=1)
-def get_host_sat_version():
+@cached_host_query()
+def get_host_sat_version(hostname=None):
     """Fetches host's Satellite version through SSH
     :return: Satellite version
     :rtype: version
     """
     commands = (
-        _extract_sat_version(c) for c in (_SAT_6_2_VERSION_COMMAND, _SAT_6_1_VERSION_COMMAND)
+        _extract_sat_version(c, hostname=hostname)
+        for c in (_SAT_6_2_VERSION_COMMAND, _SAT_6_1_VERSION_COMMAND)
     )
     for version, ssh_result in commands:
         if version != 'Not Available':
@@ -54,14 +140,14 @@ def get_host_sat_version():
     return version
 
 
-def _extract_sat_version(ssh_cmd):
+def _extract_sat_version(ssh_cmd, hostname=None):
     """Extracts Satellite version if possible or 'Not Available' otherwise
 
     :param ssh_cmd: str ssh command
     :return: Satellite version
     :rtype: str
     """
-    ssh_result = ssh.command(ssh_cmd)
+    ssh_result = ssh.command(ssh_cmd, hostname=hostname)
     if ssh_result.stdout:
         version_description = ssh_result.stdout[0]
         version_re = r'[^\d]*(?P<version>\d(\.\d){1})'
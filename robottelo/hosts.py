@@ -12,6 +12,7 @@ from robottelo.constants import DISTRO_RHEL7
 from robottelo.constants import REPOS
 from robottelo.helpers import install_katello_ca
 from robottelo.helpers import remove_katello_ca
+from robottelo.host_info import invalidate_host_cache
 
 logger = logging.getLogger('robottelo')
 
@@ -393,6 +394,7 @@ class Capsule(ContentHost):
     def restart_services(self):
         """Restart services, returning True if passed and stdout if not"""
         result = self.execute('foreman-maintain service restart').status
+        invalidate_host_cache(self.hostname)
         return True if result.status == 0 else result.stdout
 
     def check_services(self):
@@ -412,7 +414,10 @@ class Capsule(ContentHost):
             [f'--{key.replace("_", "-")} {value}' for key, value in command_args.items()]
         )
         self.execute(f'echo "satellite-installer {command_args}" > /root/install.txt')
-        return self.execute(f'satellite-installer {command_args}')
+        try:
+            return self.execute(f'satellite-installer {command_args}')
+        finally:
+            invalidate_host_cache(self.hostname)
 
 
 class Satellite(Capsule):
@@ -459,15 +464,18 @@ class Satellite(Capsule):
         from robottelo.cli.base import Base
 
         self.cli = lambda: None
+        bound_classes = {}
         for file in Path('robottelo/cli/').iterdir():
             if file.suffix == '.py' and not file.name.startswith('_'):
                 cli_module = importlib.import_module(f'robottelo.cli.{file.stem}')
                 for name, obj in cli_module.__dict__.items():
                     try:
                         if Base in obj.mro():
-                            # set our hostname as a class attribute
-                            obj.hostname = self.hostname
-                            setattr(self.cli, name, obj)
+                            # bind a subclass to our hostname, leaving the shared
+                            # class to the other satellites
+                            if obj not in bound_classes:
+                                bound_classes[obj] = obj.with_hostname(self.hostname)
+                            setattr(self.cli, name, bound_classes[obj])
                     except AttributeError:
                         # not everything has an mro method, we don't care about them
                         pass
@@ -181,6 +181,9 @@ return cdn repo data::
     # also test usage located at:
     # tests/foreman/cli/test_vm_install_products_package.py
 """
+import logging
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import List
@@ -190,6 +193,7 @@ from typing import TYPE_CHECKING
 
 from robottelo import manifests
 from robottelo.cli.activationkey import ActivationKey
+from robottelo.cli.base import CLIReturnCodeError
 from robottelo.cli.contentview import ContentView
 from robottelo.cli.factory import make_activation_key
 from robottelo.cli.factory import make_content_view
@@ -202,6 +206,7 @@ from robottelo.cli.org import Org
 from robottelo.cli.repository import Repository
 from robottelo.cli.repository_set import RepositorySet
 from robottelo.cli.subscription import Subscription
+from robottelo.cli.task import Task
 from robottelo.config import settings
 from robottelo.constants import DEFAULT_ARCHITECTURE
 from robottelo.constants import DEFAULT_SUBSCRIPTION_NAME
@@ -234,6 +239,10 @@ PRODUCT_KEY_VIRT_AGENTS = 'rhva6'
 PRODUCT_KEY_CLOUD_FORMS_TOOLS = 'rhct6'
 PRODUCT_KEY_ANSIBLE_ENGINE = 'rhae2'
 
+logger = logging.getLogger('robottelo')
+
+SYNC_TIMEOUT = 4800
+
 _server_distro = None  # type: str
 
 
@@ -348,9 +357,16 @@ class BaseRepository:
             self.synchronize()
         return repo_info
 
-    def synchronize(self):
-        """Synchronize the repository"""
-        Repository.synchronize({'id': self.repo_info['id']}, timeout=4800)
+    def synchronize(self, asynchronous=False):
+        # type: (bool) -> Optional[str]
+        """Synchronize the repository
+
+        :param asynchronous: start the sync without waiting for it and return
+            the id of its task
+        """
+        if asynchronous:
+            return Repository.synchronize({'id': self.repo_info['id'], 'async': True})[0]['id']
+        Repository.synchronize({'id': self.repo_info['id']}, timeout=SYNC_TIMEOUT)
 
     def add_to_content_view(self, organization_id, content_view_id):
         # type: (int, int) -> None
@@ -621,7 +637,10 @@ class GenericRHRepository(BaseRepository):
                 self.synchronize()
         else:
             repo_info = super().create(
-                organization_id, product_id, download_policy=download_policy
+                organization_id,
+                product_id,
+                download_policy=download_policy,
+                synchronize=synchronize,
             )
         return repo_info
 
@@ -792,13 +811,28 @@ class RepositoryCollection:
     def __iter__(self):
         yield from self._items
 
-    def setup(self, org_id, download_policy=DOWNLOAD_POLICY_ON_DEMAND, synchronize=True):
-        # type: (int, str, bool) -> Tuple[Dict, List[Dict]]
+    @property
+    def async_sync(self):  # type: () -> bool
+        """Whether the repositories are synced all at once, see
+        ``performance.async_repository_sync``
+        """
+        return bool(settings.performance and settings.performance.async_repository_sync)
+
+    def setup(
+        self, org_id, download_policy=DOWNLOAD_POLICY_ON_DEMAND, synchronize=True, async_sync=None
+    ):
+        # type: (int, str, bool, Optional[bool]) -> Tuple[Dict, List[Dict]]
         """Setup the repositories on server.
 
         Recommended usage: repository only setup, for full content setup see
             setup_content.
+
+        :param async_sync: start the syncs of all the repositories at once and
+            wait for them together instead of syncing them one after the
+            other, ``performance.async_repository_sync`` by default
         """
+        if async_sync is None:
+            async_sync = self.async_sync
         if self._repos_info:
             raise RepositoryAlreadyCreated('Repositories already created')
         custom_product = None
@@ -808,17 +842,66 @@ class RepositoryCollection:
         custom_product_id = custom_product['id'] if custom_product else None
         for repo in self:
             repo_info = repo.create(
-                org_id, custom_product_id, download_policy=download_policy, synchronize=synchronize
+                org_id,
+                custom_product_id,
+                download_policy=download_policy,
+                synchronize=synchronize and not async_sync,
             )
             repos_info.append(repo_info)
         self._custom_product_info = custom_product
         self._repos_info = repos_info
+        if synchronize and async_sync:
+            self.wait_for_sync_tasks(self.start_sync_tasks())
         return custom_product, repos_info
 
-    def setup_content_view(self, org_id, lce_id=None):
-        # type: (int, int) -> Tuple[Dict, Dict]
+    def start_sync_tasks(self):
+        # type: () -> List[str]
+        """Start the syncs of all the repositories without waiting for them
+
+        :return: the ids of the sync tasks, see :meth:`wait_for_sync_tasks`
+        """
+        return [repo.synchronize(asynchronous=True) for repo in self]
+
+    @staticmethod
+    def wait_for_sync_tasks(task_ids, timeout=SYNC_TIMEOUT):
+        # type: (List[str], int) -> None
+        """Wait for all the sync tasks together, logging their progress
+
+        All the tasks are waited for, even when one of them failed.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: the error of the first
+            task failed
+        """
+        if not task_ids:
+            return
+        error = None
+        with ThreadPoolExecutor(max_workers=len(task_ids)) as executor:
+            futures = {
+                executor.submit(Task.progress, {'id': task_id}, timeout=timeout): task_id
+                for task_id in task_ids
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    future.result()
+                except CLIReturnCodeError as err:
+                    logger.error(f'Repository sync task {futures[future]} failed: {err.msg}')
+                    if error is None:
+                        error = err
+                else:
+                    logger.info(
+                        f'Repository sync task {futures[future]} finished, '
+                        f'{done}/{len(task_ids)} done'
+                    )
+        if error is not None:
+            raise error
+
+    def setup_content_view(self, org_id, lce_id=None, sync_task_ids=None):
+        # type: (int, int, Optional[List[str]]) -> Tuple[Dict, Dict]
         """Setup organization content view by adding all the repositories, publishing and promoting
         to lce if needed.
+
+        :param sync_task_ids: the sync tasks of the repositories still running,
+            waited for before publishing the content view
         """
         if lce_id is None:
             lce = make_lifecycle_environment({'organization-id': org_id})
@@ -828,6 +911,8 @@ class RepositoryCollection:
         # Add repositories to content view
         for repo in self:
             repo.add_to_content_view(org_id, content_view['id'])
+        if sync_task_ids:
+            self.wait_for_sync_tasks(sync_task_ids)
         # Publish the content view
         ContentView.publish({'id': content_view['id']})
         if lce['name'] != ENVIRONMENT:
@@ -922,8 +1007,17 @@ class RepositoryCollection:
             if not rh_subscriptions:
                 # add the default subscription if no subscription provided
                 rh_subscriptions = [DEFAULT_SUBSCRIPTION_NAME]
-        custom_product, repos_info = self.setup(org_id=org_id, download_policy=download_policy)
-        content_view, lce = self.setup_content_view(org_id, lce_id)
+        if self.async_sync:
+            # the content view is set up while the repositories sync
+            custom_product, repos_info = self.setup(
+                org_id=org_id, download_policy=download_policy, synchronize=False
+            )
+            content_view, lce = self.setup_content_view(
+                org_id, lce_id, sync_task_ids=self.start_sync_tasks()
+            )
+        else:
+            custom_product, repos_info = self.setup(org_id=org_id, download_policy=download_policy)
+            content_view, lce = self.setup_content_view(org_id, lce_id)
         custom_product_name = custom_product['name'] if custom_product else None
         subscription_names = list(rh_subscriptions)
         if custom_product_name:
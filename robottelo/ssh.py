@@ -1,20 +1,37 @@
 """Utility module to handle the shared ssh connection."""
+import asyncio
+import atexit
 import base64
+import codecs
+import functools
+import hashlib
 import logging
 import os
 import re
+import selectors
+import shlex
+import socket
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from fnmatch import fnmatch
 from io import StringIO
 
 import paramiko
 
+from robottelo import download_cache
 from robottelo.cli import hammer
 from robottelo.config import settings
 
 logger = logging.getLogger('robottelo')
 
+# Remove escape code for colors displayed in the output
+_COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+# Size of the chunks read from the channel streams, same as paramiko's own
+_RECV_CHUNK_SIZE = 32768
+
 
 class SSHCommandTimeoutError(Exception):
     """Raised when the SSH command has not finished executing after a
@@ -22,6 +39,12 @@ class SSHCommandTimeoutError(Exception):
     """
 
 
+class SSHChannelOpenError(paramiko.SSHException):
+    """Raised when the channel running the SSH command could not be opened,
+    the command did not run.
+    """
+
+
 def decode_to_utf8(text):  # pragma: no cover
     """Paramiko returns bytes object and we need to ensure it is utf-8 before
     parsing
@@ -55,6 +78,87 @@ class SSHCommandResult:
         return tmpl.format(**self.__dict__)
 
 
+class SSHCommandRecord:
+    """Timing and size of a command, passed to the command hooks.
+
+    :ivar str hostname: the host the command ran on
+    :ivar str command: the command
+    :ivar float connect_time: seconds spent opening the connection, only set
+        for the first command run over a new connection, ``0`` otherwise
+    :ivar float exec_time: seconds from the command start to its exit status
+    :ivar int bytes_sent: size of the command
+    :ivar int bytes_received: size of the stdout and stderr output
+    :ivar return_code: the exit status, ``None`` if the command timed out
+    :ivar str nodeid: the pytest node id of the test running the command
+    """
+
+    __slots__ = (
+        'hostname',
+        'command',
+        'connect_time',
+        'exec_time',
+        'bytes_sent',
+        'bytes_received',
+        'return_code',
+        'nodeid',
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'SSHCommandRecord({fields})'
+
+
+_command_hooks = []
+
+
+def add_command_hook(hook):
+    """Register a callable called with a :class:`SSHCommandRecord` after each
+    command run by :func:`execute_command` or :func:`stream_command`.
+
+    Hooks run in the thread which ran the command and must be fast, nothing
+    is measured while no hook is registered.
+    """
+    _command_hooks.append(hook)
+
+
+def remove_command_hook(hook):
+    """Unregister a hook registered with :func:`add_command_hook`"""
+    _command_hooks.remove(hook)
+
+
+def _record_command(connection, cmd, start, bytes_received, return_code):
+    """Call the command hooks with the record of a finished command"""
+    exec_time = time.monotonic() - start
+    # the attributes are only set on the clients created by get_client
+    attributes = vars(connection)
+    # the connection time is only accounted for once, on its first command
+    connect_time = attributes.get('_connect_time', 0)
+    connection._connect_time = 0
+    if isinstance(cmd, bytes):
+        cmd = cmd.decode('utf-8', errors='replace')
+    # pytest sets it to '<nodeid> (<phase>)' while a test runs
+    nodeid = os.environ.get('PYTEST_CURRENT_TEST', '').rpartition(' ')[0] or None
+    record = SSHCommandRecord(
+        hostname=attributes.get('_hostname'),
+        command=cmd,
+        connect_time=connect_time,
+        exec_time=exec_time,
+        bytes_sent=len(cmd),
+        bytes_received=bytes_received,
+        return_code=return_code,
+        nodeid=nodeid,
+    )
+    for hook in list(_command_hooks):
+        try:
+            hook(record)
+        except Exception:
+            logger.exception(f'SSH command hook {hook!r} failed')
+
+
 class SSHClient(paramiko.SSHClient):
     """Extended SSHClient allowing custom methods"""
 
@@ -86,6 +190,25 @@ def _call_paramiko_sshclient():  # pragma: no cover
     return SSHClient()
 
 
+def _get_credentials(
+    hostname=None, username=None, password=None, key_filename=None, key_string=None
+):
+    """Fill in the missing connection credentials from settings.server
+
+    Processes ssh credentials in the order: password, key_filename, ssh_key
+
+    :return: A tuple ``(hostname, username, password, key_filename, key_string)``
+    """
+    hostname = hostname or settings.server.hostname
+    username = username or settings.server.ssh_username
+    password = password or settings.server.ssh_password
+    if password is None:
+        key_filename = key_filename or settings.server.ssh_key
+    if password is None and key_filename is None:
+        key_string = key_string or settings.server.ssh_key_string
+    return hostname, username, password, key_filename, key_string
+
+
 def get_client(
     hostname=None,
     username=None,
@@ -100,15 +223,17 @@ def get_client(
     Processes ssh credentials in the order: password, key_filename, ssh_key
     Config validation enforces one of the three must be set in settings.server
     """
-    hostname = hostname or settings.server.hostname
-    username = username or settings.server.ssh_username
-    password = password or settings.server.ssh_password
-    if password is None:
-        key_filename = key_filename or settings.server.ssh_key
+    hostname, username, password, key_filename, key_string = _get_credentials(
+        hostname=hostname,
+        username=username,
+        password=password,
+        key_filename=key_filename,
+        key_string=key_string,
+    )
     if password is None and key_filename is None:
-        key_string = key_string or settings.server.ssh_key_string
         key_string = paramiko.rsakey.RSAKey.from_private_key(StringIO(str(key_string)))
     timeout = timeout or settings.ssh_client.connection_timeout
+    start = time.monotonic()
     client = _call_paramiko_sshclient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     client.connect(
@@ -120,7 +245,12 @@ def get_client(
         timeout=timeout,
         port=port,
     )
+    # a command is a few small messages, each waiting for the previous to be
+    # acknowledged with Nagle's algorithm, which delayed acks stretch to 40ms
+    client.get_transport().sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     client._id = hex(id(client))
+    client._hostname = hostname
+    client._connect_time = time.monotonic() - start
     return client
 
 
@@ -170,6 +300,205 @@ def get_connection(
         logger.debug(f'Destroyed Paramiko client {client._id}')
 
 
+class SSHConnectionPool:
+    """Keep authenticated SSH clients around to be reused across calls.
+
+    Clients are keyed by ``(hostname, username, port, credential)`` so a
+    connection is only ever reused for the very same login. Idle clients are
+    evicted after ``ssh_client.pool_idle_timeout`` seconds and at most
+    ``ssh_client.pool_max_idle`` idle clients are kept per key. A client
+    whose transport is no longer active is discarded and a new one is
+    transparently created on checkout.
+
+    The pool is process local; it is reset whenever the pid changes so that
+    forked processes (e.g. xdist workers) never share a transport.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _idle_timeout():
+        return int(settings.ssh_client.pool_idle_timeout)
+
+    @staticmethod
+    def _max_idle():
+        return int(settings.ssh_client.pool_max_idle)
+
+    @staticmethod
+    def _is_alive(client):
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.close()
+        except Exception:  # pragma: no cover
+            pass
+        logger.debug(f'Destroyed pooled Paramiko client {client._id}')
+
+    def _reset_after_fork(self):
+        """Forget (without closing) clients inherited from a parent process"""
+        if self._pid != os.getpid():
+            self._idle = {}
+            self._pid = os.getpid()
+
+    def acquire(self, key, connect):
+        """Return an idle alive client for ``key`` or a new one from ``connect``
+
+        :param key: the pool key, see :func:`_pool_key`
+        :param connect: callable returning a new connected client
+        :return: a tuple ``(client, reused)``
+        """
+        stale = []
+        client = None
+        now = time.monotonic()
+        with self._lock:
+            self._reset_after_fork()
+            idle = self._idle.get(key, [])
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used <= self._idle_timeout() and self._is_alive(candidate):
+                    client = candidate
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            self._close(candidate)
+        if client is not None:
+            logger.debug(f'Reusing pooled Paramiko client {client._id}')
+            return client, True
+        return connect(), False
+
+    def release(self, key, client):
+        """Give back a client to the pool, closing it when it can't be reused"""
+        evicted = None
+        if self._is_alive(client):
+            with self._lock:
+                self._reset_after_fork()
+                idle = self._idle.setdefault(key, [])
+                idle.append((client, time.monotonic()))
+                if len(idle) > self._max_idle():
+                    evicted, _ = idle.pop(0)
+        else:
+            evicted = client
+        if evicted is not None:
+            self._close(evicted)
+
+    def discard(self, client):
+        """Close a client which must not go back to the pool"""
+        self._close(client)
+
+    def close_all(self, hostname=None):
+        """Close all idle clients, or only the ones for ``hostname``"""
+        with self._lock:
+            self._reset_after_fork()
+            keys = [key for key in self._idle if hostname in (None, key[0])]
+            clients = [client for key in keys for client, _ in self._idle.pop(key)]
+        for client in clients:
+            self._close(client)
+
+
+_connection_pool = SSHConnectionPool()
+atexit.register(_connection_pool.close_all)
+
+
+def _pool_key(
+    hostname=None, username=None, password=None, key_filename=None, key_string=None, port=22
+):
+    """Return the pool key identifying a login on a host"""
+    hostname, username, password, key_filename, key_string = _get_credentials(
+        hostname=hostname,
+        username=username,
+        password=password,
+        key_filename=key_filename,
+        key_string=key_string,
+    )
+    return hostname, username, port, password or key_filename or str(key_string)
+
+
+@contextmanager
+def get_pooled_connection(
+    hostname=None,
+    username=None,
+    password=None,
+    key_filename=None,
+    key_string=None,
+    timeout=None,
+    port=22,
+):
+    """Yield an ssh connection object taken from the connection pool.
+
+    Behaves like :func:`get_connection` except that the connection is given
+    back to the pool instead of being closed when the caller is done, so the
+    next call for the same host and credentials skips the TCP, key exchange
+    and authentication handshakes::
+
+        with get_pooled_connection() as connection:
+            ...
+
+    The connection is discarded if the caller raised an exception, as its
+    state can not be trusted anymore.
+
+    kwargs are passed through to get_client
+
+    :return: An SSH connection.
+    :rtype: ``paramiko.SSHClient``
+    """
+    key = _pool_key(
+        hostname=hostname,
+        username=username,
+        password=password,
+        key_filename=key_filename,
+        key_string=key_string,
+        port=port,
+    )
+    client, reused = _connection_pool.acquire(
+        key,
+        lambda: get_client(
+            hostname=hostname,
+            username=username,
+            password=password,
+            key_filename=key_filename,
+            key_string=key_string,
+            timeout=timeout,
+            port=port,
+        ),
+    )
+    client._reused = reused
+    if not reused:
+        logger.debug(f'Instantiated pooled Paramiko client {client._id}')
+        logger.info('Connected to [%s]', key[0])
+    try:
+        yield client
+    except BaseException:
+        _connection_pool.discard(client)
+        raise
+    else:
+        _connection_pool.release(key, client)
+
+
+def _get_connection(**kwargs):
+    """Return :func:`get_pooled_connection` or :func:`get_connection`
+    depending on the ``ssh_client.connection_pooling`` setting.
+    """
+    if settings.ssh_client.connection_pooling:
+        return get_pooled_connection(**kwargs)
+    return get_connection(**kwargs)
+
+
+def close_pooled_connections(hostname=None):
+    """Close the pooled connections, e.g. after a host was rebooted or its
+    ssh keys changed.
+
+    :param str hostname: close only the connections to that host, all of them
+        when not provided.
+    """
+    _connection_pool.close_all(hostname)
+
+
 @contextmanager
 def get_sftp_session(
     hostname=None, username=None, password=None, key_filename=None, key_string=None, timeout=None
@@ -187,9 +516,10 @@ def get_sftp_session(
       with get_sftp_session() as session:
       ...
 
-    kwargs are passed through to get_connection
+    kwargs are passed through to get_connection, the connection is taken from
+    the connection pool when ``ssh_client.connection_pooling`` is enabled.
     """
-    with get_connection(
+    with _get_connection(
         hostname=hostname,
         username=username,
         password=password,
@@ -236,32 +566,29 @@ def add_authorized_key(
     ssh_path = '~/.ssh'
     auth_file = os.path.join(ssh_path, 'authorized_keys')
 
-    with get_connection(
+    ssh_user = username or settings.server.ssh_username
+    command_many(
+        [
+            # ensure ssh directory exists
+            f'mkdir -p {ssh_path}',
+            # append the key if doesn't exists
+            "grep -q '{key}' {dest} || echo '{key}' >> {dest}".format(
+                key=key_content, dest=auth_file
+            ),
+            # set proper permissions
+            f'chmod 700 {ssh_path}',
+            f'chmod 600 {auth_file}',
+            f'chown -R {ssh_user} {ssh_path}',
+            # Restore SELinux context with restorecon, if it's available:
+            f'command -v restorecon && restorecon -RvF {ssh_path} || true',
+        ],
         hostname=hostname,
         username=username,
         password=password,
         key_filename=key_filename,
-        timeout=timeout,
-    ) as con:
-
-        # ensure ssh directory exists
-        execute_command('mkdir -p %s' % ssh_path, con)
-
-        # append the key if doesn't exists
-        add_key = "grep -q '{key}' {dest} || echo '{key}' >> {dest}".format(
-            key=key_content, dest=auth_file
-        )
-        execute_command(add_key, con)
-
-        # set proper permissions
-        execute_command('chmod 700 %s' % ssh_path, con)
-        execute_command('chmod 600 %s' % auth_file, con)
-        ssh_user = username or settings.server.ssh_username
-        execute_command(f'chown -R {ssh_user} {ssh_path}', con)
-
-        # Restore SELinux context with restorecon, if it's available:
-        cmd = 'command -v restorecon && restorecon -RvF %s || true' % ssh_path
-        execute_command(cmd, con)
+        connection_timeout=timeout,
+        parallel=False,
+    )
 
 
 def upload_file(local_file, remote_file, key_filename=None, key_string=None, hostname=None):
@@ -284,7 +611,15 @@ def upload_file(local_file, remote_file, key_filename=None, key_string=None, hos
 
 
 def upload_files(
-    local_dir, remote_dir, file_search='*.txt', hostname=None, key_filename=None, key_string=None
+    local_dir,
+    remote_dir,
+    file_search='*.txt',
+    hostname=None,
+    key_filename=None,
+    key_string=None,
+    workers=1,
+    incremental=False,
+    checksum=False,
 ):
     """Upload all files from directory to a remote directory
 
@@ -297,16 +632,92 @@ def upload_files(
     :param str key_filename: The path of the ssh private key to use when
         connecting to the server. If it is ``None`` ``key_filename`` from
         configuration's ``server`` section will be used.
+    :param int workers: number of SFTP sessions uploading files concurrently
+        over the same connection.
+    :param bool incremental: skip the files whose remote copy is unchanged,
+        that is with the same size and modification time (which is preserved
+        on upload), or with the same checksum when ``checksum`` is set.
+    :param bool checksum: compare the sha256 checksums of the local and remote
+        files instead of their size and modification time, only used when
+        ``incremental`` is set.
+    :return: the sorted list of the uploaded remote files.
     """
-    command(f"mkdir -p {remote_dir}")
-    # making only one SFTP Session to transfer all files
-    with get_sftp_session(hostname=hostname, key_filename=key_filename) as sftp:
-        for root, dirs, files in os.walk(local_dir):
-            for local_filename in files:
-                if fnmatch(local_filename, file_search):
-                    remote_file = f"{remote_dir}/{local_filename}"
-                    local_file = os.path.join(local_dir, local_filename)
+    files = {}
+    for root, dirs, filenames in os.walk(local_dir):
+        for local_filename in filenames:
+            if fnmatch(local_filename, file_search):
+                files[f"{remote_dir}/{local_filename}"] = os.path.join(root, local_filename)
+    uploaded = []
+    with _get_connection(
+        hostname=hostname, key_filename=key_filename, key_string=key_string
+    ) as connection:
+        execute_command(f'mkdir -p {remote_dir}', connection)
+        if incremental and checksum:
+            files = _changed_files(connection, remote_dir, files)
+
+        def upload(chunk):
+            sftp = connection.open_sftp()
+            try:
+                for remote_file, local_file in chunk:
+                    local_stat = os.stat(local_file)
+                    if incremental and not checksum:
+                        try:
+                            remote_stat = sftp.stat(remote_file)
+                        except OSError:
+                            remote_stat = None
+                        if (
+                            remote_stat is not None
+                            and remote_stat.st_size == local_stat.st_size
+                            and remote_stat.st_mtime == int(local_stat.st_mtime)
+                        ):
+                            continue
                     _upload_file(sftp, local_file, remote_file)
+                    if incremental:
+                        sftp.utime(remote_file, (local_stat.st_atime, local_stat.st_mtime))
+                    uploaded.append(remote_file)
+            finally:
+                sftp.close()
+
+        items = sorted(files.items())
+        workers = max(1, min(workers, len(items)))
+        chunks = [items[index::workers] for index in range(workers)]
+        if workers == 1:
+            upload(chunks[0])
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # consume the results to raise the first upload error if any
+                list(executor.map(upload, chunks))
+    return sorted(uploaded)
+
+
+def _changed_files(connection, remote_dir, files):
+    """Filter out the files whose remote copy has the same sha256 checksum
+
+    :param connection: SSH Paramiko client connection
+    :param remote_dir: the remote directory the files are uploaded to
+    :param files: a dict mapping remote file paths to local file paths
+    :return: a dict with the items of ``files`` that must be uploaded
+    """
+    if not files:
+        return files
+    names = ' '.join(shlex.quote(os.path.basename(remote_file)) for remote_file in files)
+    # missing remote files are simply not listed in the output
+    result = execute_command(
+        f'cd {remote_dir} && sha256sum -- {names} 2>/dev/null', connection, output_format='plain'
+    )
+    remote_checksums = {}
+    for line in (result.stdout or '').splitlines():
+        remote_checksum, _, name = line.partition('  ')
+        remote_checksums[f'{remote_dir}/{name}'] = remote_checksum
+    changed = {}
+    for remote_file, local_file in files.items():
+        local_checksum = hashlib.sha256()
+        with open(local_file, 'rb') as handler:
+            for chunk in iter(lambda: handler.read(1024 * 1024), b''):
+                local_checksum.update(chunk)
+        if remote_checksums.get(remote_file) != local_checksum.hexdigest():
+            changed[remote_file] = local_file
+    return changed
 
 
 def _upload_file(sftp, local_file, remote_file):
@@ -326,14 +737,19 @@ def _upload_file(sftp, local_file, remote_file):
         sftp.put(local_file, remote_file)
 
 
-def download_file(remote_file, local_file=None, hostname=None):
+def download_file(remote_file, local_file=None, hostname=None, cache=False):
     """Download a remote file to the local machine. If ``hostname`` is not
     provided will be used the server.
 
+    :param bool cache: keep a copy of the file in the local download cache,
+        shared by the test processes, and only download it when its remote
+        checksum is not in the cache. See ``robottelo.download_cache``.
     """
     if local_file is None:  # pragma: no cover
         local_file = remote_file
-    with get_connection(hostname=hostname) as connection:  # pragma: no cover
+    with _get_connection(hostname=hostname) as connection:  # pragma: no cover
+        if cache and _download_cached_file(connection, remote_file, local_file):
+            return
         try:
             sftp = connection.open_sftp()
             sftp.get(remote_file, local_file)
@@ -341,6 +757,35 @@ def download_file(remote_file, local_file=None, hostname=None):
             sftp.close()
 
 
+def _download_cached_file(connection, remote_file, local_file):
+    """Copy a remote file from the download cache, downloading it to the cache
+    first if its checksum is not there yet
+
+    :return: ``False`` if the remote checksum could not be computed
+    """
+    result = execute_command(
+        f'sha256sum -- {shlex.quote(remote_file)}', connection, output_format='plain'
+    )
+    if result.return_code != 0 or not result.stdout:
+        return False
+    checksum = result.stdout.split()[0]
+    # the other processes wait for the one downloading the same content
+    with download_cache.lock(checksum):
+        blob = download_cache.get_blob(checksum)
+        if blob is None:
+            logger.debug(f'Downloading {remote_file} to the cache')
+            sftp = connection.open_sftp()
+            try:
+                with sftp.open(remote_file, 'rb') as remote:
+                    remote.prefetch()
+                    chunks = iter(functools.partial(remote.read, _RECV_CHUNK_SIZE), b'')
+                    blob = download_cache.store(chunks, checksum=checksum)
+            finally:
+                sftp.close()
+    download_cache.copy_to(blob, local_file)
+    return True
+
+
 def command(
     cmd,
     hostname=None,
@@ -355,7 +800,8 @@ def command(
 ):
     """Executes SSH command(s) on remote hostname.
 
-    kwargs are passed through to get_connection
+    kwargs are passed through to get_connection, the connection is taken from
+    the connection pool when ``ssh_client.connection_pooling`` is enabled.
 
     :param str cmd: The command to run
     :param str output_format: json, csv or None
@@ -365,7 +811,86 @@ def command(
     hostname = hostname or settings.server.hostname
     timeout = timeout or settings.ssh_client.command_timeout
     connection_timeout = connection_timeout or settings.ssh_client.connection_timeout
-    with get_connection(
+    connection_kwargs = dict(
+        hostname=hostname,
+        username=username,
+        password=password,
+        key_filename=key_filename,
+        key_string=key_string,
+        timeout=connection_timeout,
+        port=port,
+    )
+    connection = None
+    try:
+        with _get_connection(**connection_kwargs) as connection:
+            return execute_command(cmd, connection, output_format, timeout, connection_timeout)
+    except SSHChannelOpenError:
+        # A pooled transport may have been dropped by the server after being
+        # checked out, in which case no channel could be opened and the
+        # command did not run: retry it once on a brand new connection.
+        if not getattr(connection, '_reused', False):
+            raise
+        logger.debug(f'Pooled Paramiko client {connection._id} is dead, reconnecting')
+        close_pooled_connections(hostname)
+        with _get_connection(**connection_kwargs) as connection:
+            return execute_command(cmd, connection, output_format, timeout, connection_timeout)
+
+
+def _wait_for_exit_status(channel, timeout):
+    """Block until the command running in ``channel`` exits or ``timeout``
+    seconds have elapsed.
+
+    Paramiko sets ``channel.status_event`` from its transport thread as soon
+    as the exit status is received or the channel is closed, so this returns
+    right when the command finishes instead of on the next polling tick.
+
+    :param channel: paramiko channel the command runs in
+    :param timeout: time to wait, in seconds
+    :return: ``True`` if the exit status is ready, ``False`` on timeout
+    """
+    return channel.status_event.wait(timeout)
+
+
+def command_many(
+    cmds,
+    hostname=None,
+    parallel=True,
+    output_format=None,
+    username=None,
+    password=None,
+    key_filename=None,
+    key_string=None,
+    timeout=None,
+    connection_timeout=None,
+    port=22,
+    max_channels=10,
+):
+    """Executes several SSH commands on remote hostname over one connection.
+
+    Each command runs in its own channel of the same authenticated transport,
+    so the handshakes are done once for all of them. Independent commands
+    can run concurrently::
+
+        results = ssh.command_many([f'wget {url}' for url in urls], hostname)
+
+    kwargs are passed through to get_connection, the connection is taken from
+    the connection pool when ``ssh_client.connection_pooling`` is enabled.
+
+    :param cmds: the commands to run
+    :param bool parallel: run the commands concurrently, otherwise one after
+        another in the given order.
+    :param str output_format: json, csv or None, applies to all the commands
+    :param int timeout: Time to wait for each ssh command to finish.
+    :param connection_timeout: Time to wait for establishing the connection.
+    :param int max_channels: maximum number of commands running at once, it
+        must not exceed the server ``MaxSessions`` (10 by default for sshd).
+    :return: a list of SSHCommandResult in the order of ``cmds``
+    """
+    cmds = list(cmds)
+    hostname = hostname or settings.server.hostname
+    timeout = timeout or settings.ssh_client.command_timeout
+    connection_timeout = connection_timeout or settings.ssh_client.connection_timeout
+    with _get_connection(
         hostname=hostname,
         username=username,
         password=password,
@@ -374,7 +899,153 @@ def command(
         timeout=connection_timeout,
         port=port,
     ) as connection:
-        return execute_command(cmd, connection, output_format, timeout, connection_timeout)
+        run = functools.partial(
+            execute_command,
+            connection=connection,
+            output_format=output_format,
+            timeout=timeout,
+            connection_timeout=connection_timeout,
+        )
+        if not parallel or len(cmds) < 2:
+            return [run(cmd) for cmd in cmds]
+        with ThreadPoolExecutor(max_workers=min(max_channels, len(cmds))) as executor:
+            return list(executor.map(run, cmds))
+
+
+async def acommand(
+    cmd,
+    hostname=None,
+    output_format=None,
+    username=None,
+    password=None,
+    key_filename=None,
+    key_string=None,
+    timeout=None,
+    connection_timeout=None,
+    port=22,
+    executor=None,
+):
+    """Asynchronous version of :func:`command`.
+
+    The command runs in a thread of ``executor`` (the event loop default one
+    when not provided) using the same pooled connections as :func:`command`,
+    so any number of commands on different hosts can be awaited at once::
+
+        results = await asyncio.gather(
+            ssh.acommand('rpm -q katello', hostname=satellite),
+            ssh.acommand('rpm -q foreman-proxy', hostname=capsule),
+        )
+
+    Cancelling the awaiting task does not interrupt the remote command, which
+    is still bound by ``timeout``.
+
+    :param executor: a ``concurrent.futures.Executor`` to run the command in
+    :return: SSHCommandResult
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            command,
+            cmd,
+            hostname=hostname,
+            output_format=output_format,
+            username=username,
+            password=password,
+            key_filename=key_filename,
+            key_string=key_string,
+            timeout=timeout,
+            connection_timeout=connection_timeout,
+            port=port,
+        ),
+    )
+
+
+async def agather(cmd, hostnames, concurrency=10, return_exceptions=False, **kwargs):
+    """Run ``cmd`` on all ``hostnames`` concurrently::
+
+        results = asyncio.run(ssh.agather('subscription-manager refresh', hostnames))
+
+    :param str cmd: The command to run, or a dict mapping each hostname to the
+        command to run on it.
+    :param hostnames: the hosts to run the command on.
+    :param int concurrency: maximum number of commands running at once.
+    :param bool return_exceptions: return the exception raised for a host
+        in place of its result instead of raising the first one.
+    :param kwargs: passed through to :func:`acommand`, ``timeout`` applies to
+        each host separately.
+    :return: a list of SSHCommandResult in the order of ``hostnames``.
+    """
+    hostnames = list(hostnames)
+    # the executor size is the concurrency cap, it is not waited for on exit
+    # so that an early failure is raised right away
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(hostnames))))
+    try:
+        return await asyncio.gather(
+            *(
+                acommand(
+                    cmd[hostname] if isinstance(cmd, dict) else cmd,
+                    hostname=hostname,
+                    executor=executor,
+                    **kwargs,
+                )
+                for hostname in hostnames
+            ),
+            return_exceptions=return_exceptions,
+        )
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _iter_channel(channel, timeout=None):
+    """Drain stdout and stderr of the command running in ``channel``.
+
+    Both streams are read while the command runs, so a large output can not
+    fill the channel window and stall the command. The generator is over
+    once the command exited and both streams reached their end.
+
+    :param channel: paramiko channel the command runs in
+    :param timeout: Time to wait for the ssh command to finish, wait forever
+        when ``None`` or ``0``.
+    :return: a generator of ``(stream, data)`` tuples where stream is either
+        ``'stdout'`` or ``'stderr'`` and data a chunk of bytes.
+    :raises SSHCommandTimeoutError: if the command did not finish in time.
+    """
+    end_time = time.monotonic() + timeout if timeout else None
+    with selectors.DefaultSelector() as selector:
+        while True:
+            pending = False
+            if channel.recv_ready():
+                pending = True
+                yield 'stdout', channel.recv(_RECV_CHUNK_SIZE)
+            if channel.recv_stderr_ready():
+                pending = True
+                yield 'stderr', channel.recv_stderr(_RECV_CHUNK_SIZE)
+            if pending:
+                continue
+            remaining = None
+            if end_time is not None:
+                remaining = end_time - time.monotonic()
+                if remaining <= 0:
+                    raise SSHCommandTimeoutError(f'ssh command timed out (timeout={timeout})')
+            if channel.eof_received or channel.closed:
+                if channel.exit_status_ready():
+                    return
+                _wait_for_exit_status(channel, remaining)
+            else:
+                # the channel file descriptor becomes readable when data is
+                # received on any of the streams or when the channel reaches
+                # its end of file
+                if not selector.get_map():
+                    selector.register(channel, selectors.EVENT_READ)
+                selector.select(remaining)
+
+
+def _spooled_file():
+    """Return a temporary file kept in memory until it grows bigger than
+    ``ssh_client.output_spool_size`` bytes.
+    """
+    return tempfile.SpooledTemporaryFile(max_size=int(settings.ssh_client.output_spool_size))
 
 
 def execute_command(cmd, connection, output_format=None, timeout=None, connection_timeout=None):
@@ -386,41 +1057,62 @@ def execute_command(cmd, connection, output_format=None, timeout=None, connectio
     :param timeout: Time to wait for the ssh command to finish.
     :param connection_timeout: Time to wait for establishing the connection.
     :return: SSHCommandResult
+    :raises SSHChannelOpenError: if the command could not be started
     """
     if timeout is None:
         timeout = settings.ssh_client.command_timeout
     if connection_timeout is None:
         connection_timeout = settings.ssh_client.connection_timeout
     logger.info('>>> %s', cmd)
-    _, stdout, stderr = connection.exec_command(cmd, timeout=connection_timeout)
-    if timeout:
-        # wait for the exit status ready
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            if stdout.channel.exit_status_ready():
-                break
-            time.sleep(1)
-        else:
+    start = time.monotonic()
+    try:
+        _, stdout, _ = connection.exec_command(cmd, timeout=connection_timeout)
+    except paramiko.SSHException as err:
+        raise SSHChannelOpenError(f'Failed to start the ssh command: {err}') from err
+    channel = stdout.channel
+    with _spooled_file() as stdout, _spooled_file() as stderr:
+        streams = {'stdout': stdout, 'stderr': stderr}
+        try:
+            for stream, data in _iter_channel(channel, timeout):
+                streams[stream].write(data)
+        except SSHCommandTimeoutError:
+            if _command_hooks:
+                _record_command(
+                    connection, cmd, start, stdout.tell() + stderr.tell(), return_code=None
+                )
             logger.error(
                 'ssh command did not respond in the predefined time'
                 ' (timeout=%s) and will be interrupted',
                 timeout,
             )
-            stdout.channel.close()
-            stderr.channel.close()
-            logger.error(f'[Captured stdout]\n{stdout.read()}\n-----\n')
-            logger.error(f'[Captured stderr]\n{stderr.read()}\n-----\n')
+            channel.close()
+            for name, stream in streams.items():
+                stream.seek(0)
+                logger.error(f'[Captured {name}]\n{stream.read()}\n-----\n')
             raise SSHCommandTimeoutError(
                 'ssh command: {} \n did not respond in the predefined time '
                 '(timeout={})'.format(cmd, timeout)
             )
-
-    errorcode = stdout.channel.recv_exit_status()
-
-    stdout = stdout.read()
-    stderr = stderr.read()
-    # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
+        errorcode = channel.recv_exit_status()
+        if _command_hooks:
+            _record_command(connection, cmd, start, stdout.tell() + stderr.tell(), errorcode)
+        stdout.seek(0)
+        stderr.seek(0)
+        stdout = stdout.read()
+        stderr = stderr.read()
+    return _command_result(stdout, stderr, errorcode, output_format)
+
+
+def _command_result(stdout, stderr, return_code, output_format=None):
+    """Build the SSHCommandResult of a command from its raw output
+
+    :param bytes stdout: the command standard output
+    :param bytes stderr: the command standard error
+    :param int return_code: the command exit status
+    :param output_format: base|json|csv|list valid only for hammer commands
+    :return: SSHCommandResult
+    """
+    regex = _COLOR_CODES_REGEX
     if stdout:
         # Convert to unicode string
         stdout = decode_to_utf8(stdout)
@@ -429,8 +1121,10 @@ def execute_command(cmd, connection, output_format=None, timeout=None, connectio
         # Convert to unicode string and remove all color codes characters
         stderr = regex.sub('', decode_to_utf8(stderr))
         logger.info('<<< stderr\n%s', stderr)
-    # Skip converting to list if 'plain', or the hammer options 'json' or 'base' are passed
-    if stdout and output_format not in ('json', 'base', 'plain'):
+    # Skip converting to list if 'plain', or the hammer options 'json' or 'base' are passed.
+    # The csv output to parse is cleaned by hammer.iter_csv in the same pass.
+    parsed_csv = output_format == 'csv' and return_code == 0
+    if stdout and output_format not in ('json', 'base', 'plain') and not parsed_csv:
         # Mostly only for hammer commands
         # for output we don't really want to see all of Rails traffic
         # information, so strip it out.
@@ -438,7 +1132,101 @@ def execute_command(cmd, connection, output_format=None, timeout=None, connectio
         stdout = stdout.replace('""', '')
         stdout = ''.join(stdout).split('\n')
         stdout = [regex.sub('', line) for line in stdout if not line.startswith('[')]
-    return SSHCommandResult(stdout, stderr, errorcode, output_format)
+    return SSHCommandResult(stdout, stderr, return_code, output_format)
+
+
+class SSHCommandStream:
+    """Iterate over the stdout lines of a remote command while it runs.
+
+    Use :func:`stream_command` to build it. The command is started when the
+    iteration begins and the lines are yielded as soon as they are received,
+    without the trailing new line, so the whole output is never held in
+    memory. ``stderr`` is captured in a temporary file which spills to disk
+    above ``ssh_client.output_spool_size`` bytes.
+
+    ``return_code`` and ``stderr`` are available once the iteration is over.
+    Breaking the iteration interrupts the command.
+    """
+
+    def __init__(self, cmd, timeout=None, connection_timeout=None, **connection_kwargs):
+        self.cmd = cmd
+        self.timeout = timeout
+        self.connection_timeout = connection_timeout
+        self.connection_kwargs = connection_kwargs
+        self.return_code = None
+        self.stderr = None
+
+    def __iter__(self):
+        timeout = self.timeout or settings.ssh_client.command_timeout
+        connection_timeout = self.connection_timeout or settings.ssh_client.connection_timeout
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with _get_connection(timeout=connection_timeout, **self.connection_kwargs) as connection:
+            logger.info('>>> %s', self.cmd)
+            start = time.monotonic()
+            _, stdout, _ = connection.exec_command(self.cmd, timeout=connection_timeout)
+            channel = stdout.channel
+            received = 0
+            with _spooled_file() as stderr:
+                try:
+                    line = ''
+                    for stream, data in _iter_channel(channel, timeout):
+                        received += len(data)
+                        if stream == 'stderr':
+                            stderr.write(data)
+                            continue
+                        *lines, line = (line + decoder.decode(data)).split('\n')
+                        yield from lines
+                    line += decoder.decode(b'', final=True)
+                    if line:
+                        yield line
+                    self.return_code = channel.recv_exit_status()
+                finally:
+                    channel.close()
+                    if _command_hooks:
+                        _record_command(connection, self.cmd, start, received, self.return_code)
+                stderr.seek(0)
+                self.stderr = _COLOR_CODES_REGEX.sub('', decode_to_utf8(stderr.read()))
+        if self.stderr:
+            logger.info('<<< stderr\n%s', self.stderr)
+
+
+def stream_command(
+    cmd,
+    hostname=None,
+    username=None,
+    password=None,
+    key_filename=None,
+    key_string=None,
+    timeout=None,
+    connection_timeout=None,
+    port=22,
+):
+    """Executes SSH command on remote hostname, yielding the stdout lines as
+    they are received::
+
+        stream = ssh.stream_command('cat /var/log/rhsm/rhsm.log')
+        for line in stream:
+            ...
+        assert stream.return_code == 0
+
+    kwargs are passed through to get_connection
+
+    :param str cmd: The command to run
+    :param int timeout: Time to wait for the ssh command to finish.
+    :param connection_timeout: Time to wait for establishing the connection.
+    :return: SSHCommandStream
+    """
+    return SSHCommandStream(
+        cmd,
+        timeout=timeout,
+        connection_timeout=connection_timeout,
+        hostname=hostname or settings.server.hostname,
+        username=username,
+        password=password,
+        key_filename=key_filename,
+        key_string=key_string,
+        port=port,
+    )
 
 
 def is_ssh_pub_key(key):
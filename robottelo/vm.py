@@ -32,6 +32,7 @@ from robottelo.constants import REPOS
 from robottelo.helpers import install_katello_ca
 from robottelo.helpers import remove_katello_ca
 from robottelo.host_info import get_host_os_version
+from robottelo.host_info import invalidate_host_cache
 
 logger = logging.getLogger('robottelo')
 
@@ -204,6 +205,8 @@ class VirtualMachine:
         """
         if self._created:
             return
+        # the hostname may be the one of a destroyed VM
+        invalidate_host_cache(self.hostname)
 
         command_args = [
             'snap-guest',
@@ -348,6 +351,7 @@ class VirtualMachine:
             hostname=self.provisioning_server,
             connection_timeout=30,
         )
+        invalidate_host_cache(self.hostname)
 
     def download_install_rpm(self, repo_url, package_name):
         """Downloads and installs custom rpm on the virtual machine.
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""Benchmark of the hammer info and json output parsers.
+
+Compares the former implementations of ``hammer.parse_info`` and
+``hammer.parse_json`` with the current ones on the corpus of outputs in
+``tests/robottelo/data/hammer_info`` and ``tests/robottelo/data/hammer_json``,
+after checking they return the same dicts. Then compares parsing the csv and
+text outputs of ``Base.list`` and ``Base.info`` with parsing their
+``--output=json`` equivalent::
+
+    PYTHONPATH=. python scripts/hammer_parse_benchmark.py --runs 500 --rows 20000
+
+"""
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import re
+import time
+
+from robottelo.cli import hammer
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'robottelo', 'data'
+)
+CORPUS_DIR = os.path.join(DATA_DIR, 'hammer_info')
+JSON_CORPUS_DIR = os.path.join(DATA_DIR, 'hammer_json')
+
+
+def former_indentation_spaces(line, tab_spaces=4):
+    """The indentation computation used by the former info parser"""
+    if not line or len(line) < tab_spaces:
+        return 0
+    spaces = 0
+    for char in line:
+        if char not in (' ', '\t'):
+            break
+        if char == '\t':
+            spaces += tab_spaces
+        else:
+            spaces += 1
+
+    return spaces
+
+
+def former_parse_info(output):
+    """The info parser as it was implemented before the rewrite"""
+    # info dictionary
+    contents = {}
+    sub_prop = None  # stores name of the last group of sub-properties
+    sub_num = None  # is not None when list of properties
+    second_level_key = None  # is set when a possible second level is detected
+
+    for line in output:
+        # skip empty lines and dividers
+        if line == '' or line == '---':
+            continue
+        current_indent_level = former_indentation_spaces(line) // 4
+        if current_indent_level <= 1:
+            # we are entering or leaving a second level from lower/upper levels
+            # clear the second level key
+            second_level_key = None
+        if line.startswith(' '):  # sub-properties are indented
+            # values are separated by ':' or '=>', but not by '::' which can be
+            # entity name like 'test::params::keys'
+            if line.find(':') != -1 and not line.find('::') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1 and len(line.lstrip().split(" =>", 1)) == 2:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+
+            if key is None and value is None:
+                # Parse single attribute collection properties
+                # Template
+                #  1) template1
+                #  2) template2
+                #
+                # or
+                # Template
+                #  template1
+                #  template2
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+
+                value = match.group(1)
+
+                # adding list to 1 level, for example:
+                # {'template': ['template1', 'template2']}
+                if isinstance(contents[sub_prop], dict) and not contents[sub_prop]:
+                    contents[sub_prop] = []
+                    contents[sub_prop].append(value)
+                elif isinstance(contents[sub_prop], list):
+                    contents[sub_prop].append(value)
+                else:
+                    # adding list to 2 level, for example:
+                    # {'subscription-information':
+                    #      {'registered-by-activation-keys': ['ak1', 'ak2']}
+                    #  }
+                    last_key = list(contents[sub_prop].keys())[-1]
+                    if not contents[sub_prop][last_key]:
+                        contents[sub_prop][last_key] = [value]
+                    else:
+                        contents[sub_prop][last_key].append(value)
+            else:
+                # some properties have many numbered values
+                # Example:
+                # Content:
+                #  1) Repo Name: repo1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                #  2) Repo Name: puppet1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    # no. 1) we need to change dict() to list()
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    # remove number from key
+                    key = re.sub(r'\d+\)', '', key)
+                    # append empty dict to array
+                    contents[sub_prop].append({})
+
+                key = key.lstrip().replace(' ', '-').lower()
+                value = value.lstrip()
+                # add value to dictionary
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value
+                else:
+                    # a third level is always represented as a dictionary and
+                    # we need to detect if we are at third level
+                    # example:
+                    # Content Information:
+                    #     Content View:
+                    #         ID:   10
+                    #         Name: Default Organization View
+                    # the "ID" and "Name" are located at third indent level
+                    # "content view" is located at second indent level
+                    if current_indent_level == 2 and second_level_key:
+                        # we are at third level indentation
+                        if not contents[sub_prop][second_level_key]:
+                            contents[sub_prop][second_level_key] = {}
+                        contents[sub_prop][second_level_key][key] = value
+                    else:
+                        contents[sub_prop][key] = value
+                    if current_indent_level == 1 and not value:
+                        # always set the last possible second level key
+                        # that can form a third level
+                        second_level_key = key
+        else:
+            sub_num = None  # new property implies no sub property
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':  # 'key:' no value, new sub-property
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:  # 'key: value' line
+                contents[key] = value.lstrip()
+
+    return contents
+
+
+def former_normalize_obj(obj):
+    """The normalization of the decoded output used by the former json parser"""
+    if isinstance(obj, dict):
+        return {hammer._normalize(k): former_normalize_obj(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [former_normalize_obj(v) for v in obj]
+    # doing this to conform to csv parser
+    elif isinstance(obj, int) and not isinstance(obj, bool):
+        return str(obj)
+    return obj
+
+
+def former_parse_json(stdout):
+    """The json parser as it was implemented before decoding with hooks"""
+    new_object_index = stdout.find('\n}\n{')
+    if new_object_index > -1:
+        stdout = stdout[new_object_index + 3 :]  # noqa: E203
+    parsed = json.loads(stdout)
+    return former_normalize_obj(parsed)
+
+
+def load_corpus(corpus_dir=CORPUS_DIR, pattern='*.txt', split=True):
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, pattern))):
+        with open(path) as output_file:
+            output = output_file.read()
+        corpus[os.path.basename(path)] = output.split('\n') if split else output
+    return corpus
+
+
+def list_outputs(rows):
+    """Return the csv and json outputs of a ``host list`` of ``rows`` hosts"""
+    with open(os.path.join(JSON_CORPUS_DIR, 'host_list.out')) as output_file:
+        hosts = json.load(output_file)
+    hosts = [dict(hosts[index % len(hosts)], Id=index) for index in range(rows)]
+    csv_output = io.StringIO()
+    writer = csv.writer(csv_output, lineterminator='\n')
+    writer.writerow(hosts[0])
+    writer.writerows(
+        [('' if value is None else value for value in host.values()) for host in hosts]
+    )
+    return csv_output.getvalue(), json.dumps(hosts, indent=2)
+
+
+def measure(parse, outputs, runs):
+    """Return the mean duration of parsing each of the ``outputs``"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        for output in outputs:
+            parse(output)
+    return (time.perf_counter() - start) / runs / len(outputs)
+
+
+def compare(names, durations):
+    """Print both durations and the speedup of the second one"""
+    for name, duration in zip(names, durations):
+        print(f'{name:>8}: {duration * 1e6:.1f}us per output')
+    print(f'{"speedup":>8}: {durations[0] / durations[1]:.2f}x')
+
+
+def compare_parsers(title, former_parse, parse, corpus, runs):
+    for name, output in corpus.items():
+        if former_parse(output) != parse(output):
+            raise SystemExit(f'The {title} parsers return different dicts for {name}')
+    print(f'{title}: {len(corpus)} outputs')
+    compare(
+        ('former', 'current'),
+        (measure(former_parse, corpus.values(), runs), measure(parse, corpus.values(), runs)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=200, help='number of runs over the corpus')
+    parser.add_argument('--rows', type=int, default=10000, help='number of rows listed')
+    args = parser.parse_args()
+
+    compare_parsers('info', former_parse_info, hammer.parse_info, load_corpus(), args.runs)
+    json_corpus = load_corpus(JSON_CORPUS_DIR, '*.out', split=False)
+    compare_parsers('json', former_parse_json, hammer.parse_json, json_corpus, args.runs)
+
+    list_runs = max(args.runs // 100, 1)
+    csv_output, json_output = list_outputs(args.rows)
+    print(f'json list of {args.rows} rows')
+    compare(
+        ('former', 'current'),
+        (
+            measure(former_parse_json, [json_output], list_runs),
+            measure(hammer.parse_json, [json_output], list_runs),
+        ),
+    )
+    print(f'list of {args.rows} rows')
+    compare(
+        ('csv', 'json'),
+        (
+            measure(hammer.parse_csv, [csv_output], list_runs),
+            measure(hammer.parse_json, [json_output], list_runs),
+        ),
+    )
+    print('host info')
+    compare(
+        ('text', 'json'),
+        (
+            measure(hammer.parse_info, [load_corpus()['host.txt']], args.runs),
+            measure(hammer.parse_json, [json_corpus['host_info.out']], args.runs),
+        ),
+    )
+
+
+if __name__ == '__main__':
+    main()
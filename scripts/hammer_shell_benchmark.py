@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Benchmark of the hammer shell against a hammer process per command.
+
+Runs read-only hammer commands on the configured Satellite, first each in its
+own ``hammer`` process as ``Base.execute`` does by default, then in the
+resident process of ``robottelo.cli.hammer_shell``, and prints the latency
+distribution of both modes. The start up of the hammer shell is reported
+separately, it is paid once per test process::
+
+    make benchmark-hammer-shell
+    PYTHONPATH=. python scripts/hammer_shell_benchmark.py --runs 10 'organization list'
+
+"""
+import argparse
+import statistics
+import time
+
+from robottelo import ssh
+from robottelo.cli import hammer_shell
+from robottelo.config import settings
+
+DEFAULT_COMMANDS = ['organization list', 'host list', 'settings list --search "name = per_page"']
+
+
+def run_process(command, user, password):
+    cmd = f'LANG={settings.locale} hammer -v -u {user} -p {password} --output=csv {command}'
+    return ssh.command(cmd, output_format='csv')
+
+
+def run_shell(command, user, password):
+    result = hammer_shell.execute(
+        command, settings.server.hostname, user=user, password=password, output_format='csv'
+    )
+    if result is None:
+        raise SystemExit(f'The hammer shell could not run "{command}", see the log')
+    return result
+
+
+def measure(run, command, runs, user, password):
+    durations = []
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        results.append(run(command, user, password))
+        durations.append(time.perf_counter() - start)
+    return sorted(durations), results
+
+
+def report(name, durations):
+    print(
+        f'{name:>8}: p50={statistics.median(durations):.3f}s '
+        f'p95={durations[min(len(durations) - 1, int(len(durations) * 0.95))]:.3f}s '
+        f'max={durations[-1]:.3f}s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('commands', nargs='*', default=DEFAULT_COMMANDS, help='hammer commands')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs per command')
+    args = parser.parse_args()
+    user = settings.server.admin_username
+    password = settings.server.admin_password
+
+    start = time.perf_counter()
+    if hammer_shell._get_shell(settings.server.hostname, user) is None:
+        raise SystemExit('The hammer shell could not be started, see the log')
+    print(f'hammer shell start up: {time.perf_counter() - start:.3f}s')
+    try:
+        for command in args.commands:
+            print(f'hammer {command}')
+            process_durations, process_results = measure(
+                run_process, command, args.runs, user, password
+            )
+            shell_durations, shell_results = measure(run_shell, command, args.runs, user, password)
+            report('process', process_durations)
+            report('shell', shell_durations)
+            print(
+                f'{"speedup":>8}: '
+                f'{statistics.median(process_durations) / statistics.median(shell_durations):.1f}x'
+            )
+            if process_results[-1].stdout != shell_results[-1].stdout:
+                print(f'{"warning":>8}: the outputs of both modes differ')
+    finally:
+        hammer_shell.close_shells()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""Benchmark of robottelo.ssh against the local stand-in SSH server.
+
+Measures the latency of ``ssh.command`` with and without connection pooling,
+the ``execute_command`` output post-processing, the ``upload_file``
+throughput and the overhead of ``Base.execute`` over the bare ssh command,
+without any Satellite. See ``tests/robottelo/ssh_server.py`` for the server.
+
+The results are appended to a history file, keyed by the git commit, and
+compared with the results of the previous commit found in it, so running the
+benchmark on two checkouts shows the effect of a change::
+
+    make benchmark-ssh
+    PYTHONPATH=. python scripts/ssh_benchmark.py --runs 50 --cases command_pooled
+
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from unittest import mock
+
+from robottelo import ssh
+from robottelo.cli.base import Base
+from tests.robottelo.ssh_server import sized_output
+from tests.robottelo.ssh_server import SSHServer
+
+DEFAULT_HISTORY = os.path.join(tempfile.gettempdir(), 'robottelo_ssh_benchmark.json')
+CASES = {}
+
+
+def case(func):
+    """Register a benchmark case, called with the server and the number of
+    runs and returning a dict of metrics
+    """
+    CASES[func.__name__] = func
+    return func
+
+
+def timings(func, runs):
+    """Run ``func`` ``runs`` times, return the p50, p95 and max durations"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return {
+        'p50': statistics.median(durations),
+        'p95': durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        'max': durations[-1],
+    }
+
+
+@case
+def command_pooled(server, runs):
+    server.script('^true$')
+    with server.patch(connection_pooling=True):
+        return timings(lambda: ssh.command('true'), runs)
+
+
+@case
+def command_unpooled(server, runs):
+    server.script('^true$')
+    with server.patch(connection_pooling=False):
+        return timings(lambda: ssh.command('true'), runs)
+
+
+@case
+def command_output(server, runs):
+    """5MB of output split into lines, the default hammer output format"""
+    server.script('^cat$', stdout=sized_output(5 * 1024 * 1024))
+    with server.patch():
+        return timings(lambda: ssh.command('cat'), max(1, runs // 5))
+
+
+@case
+def upload_file(server, runs):
+    size = 20 * 1024 * 1024
+    with tempfile.NamedTemporaryFile() as local_file:
+        local_file.write(sized_output(size))
+        local_file.flush()
+        with server.patch():
+            result = timings(
+                lambda: ssh.upload_file(local_file.name, '/upload'), max(1, runs // 5)
+            )
+    result['MB/s'] = size / 1024 / 1024 / result['p50']
+    return result
+
+
+@case
+def cli_execute(server, runs):
+    """``Base.execute`` of a hammer list of 500 records, and its overhead
+    over running the same command with ``ssh.command``
+    """
+    output = 'Id,Name,Description\n' + ''.join(
+        f'{index},name{index},description {index}\n' for index in range(500)
+    )
+    server.script('hammer', stdout=output.encode())
+    settings = mock.MagicMock()
+    settings.locale = 'en_US.UTF-8'
+    settings.performance.time_hammer = False
+    settings.ssh_client.hammer_shell = False
+    settings.server.admin_username = 'admin'
+    settings.server.admin_password = 'changeme'
+    with server.patch(), mock.patch('robottelo.cli.base.settings', settings):
+        result = timings(lambda: Base.execute('host list', output_format='csv'), runs)
+        command = 'LANG=en_US.UTF-8 hammer -v -u admin -p changeme --output=csv host list'
+        raw = timings(lambda: ssh.command(command, output_format='csv'), runs)
+    result['overhead'] = result['p50'] - raw['p50']
+    return result
+
+
+def git_commit():
+    """Return the current commit, suffixed with ``-dirty`` for local changes"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True)
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD']).returncode
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit.strip() + ('-dirty' if dirty else '')
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as history_file:
+        return json.load(history_file)
+
+
+def report(results, previous):
+    """Print the results, and their change from the ``previous`` entry"""
+    if previous:
+        print(f'compared with {previous["commit"]} ({previous["date"]})')
+    for name, metrics in results.items():
+        before = previous['results'].get(name, {}) if previous else {}
+        values = []
+        for metric, value in metrics.items():
+            value_str = f'{metric}={value:.4f}'
+            if before.get(metric):
+                value_str += f' ({(value - before[metric]) / before[metric]:+.0%})'
+            values.append(value_str)
+        print(f'{name:>18}: {" ".join(values)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='number of runs per case')
+    parser.add_argument(
+        '--cases', nargs='+', choices=sorted(CASES), default=sorted(CASES), help='cases to run'
+    )
+    parser.add_argument(
+        '--latency', type=float, default=0.0, help='simulated server latency in seconds'
+    )
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='results history file')
+    parser.add_argument('--no-save', action='store_true', help='do not save the results')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.cases:
+        # a new server per case, so the cases do not share connections
+        with SSHServer(latency=args.latency) as server:
+            results[name] = CASES[name](server, args.runs)
+
+    entry = {
+        'commit': git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'runs': args.runs,
+        'latency': args.latency,
+        'results': results,
+    }
+    history = load_history(args.history)
+    previous = next(
+        (
+            old
+            for old in reversed(history)
+            if old['commit'] != entry['commit'] and old['latency'] == args.latency
+        ),
+        None,
+    )
+    report(results, previous)
+    if not args.no_save:
+        history.append(entry)
+        with open(args.history, 'w') as history_file:
+            json.dump(history, history_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Micro-benchmark of the ssh command completion wait.
+
+Compares the latency distribution of the former one second exit status
+polling loop with the event based wait used by
+``robottelo.ssh.execute_command``.
+
+Commands are simulated with channels completing after a random delay, so no
+server is needed::
+
+    python scripts/ssh_wait_benchmark.py --runs 50
+
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from robottelo import ssh
+
+
+def poll_wait(channel, timeout):
+    """The exit status wait as it was implemented before the event based one"""
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if channel.exit_status_ready():
+            return True
+        time.sleep(1)
+    return False
+
+
+class SimulatedChannel:
+    """Channel whose command exits after ``latency`` seconds"""
+
+    def __init__(self, latency):
+        self.status_event = threading.Event()
+        threading.Timer(latency, self.status_event.set).start()
+
+    def exit_status_ready(self):
+        return self.status_event.is_set()
+
+
+def run_simulated(wait, latencies):
+    durations = []
+    for latency in latencies:
+        channel = SimulatedChannel(latency)
+        start = time.monotonic()
+        wait(channel, 300)
+        durations.append(time.monotonic() - start)
+    return durations
+
+
+def report(name, durations):
+    durations = sorted(durations)
+    if len(durations) > 1:
+        percentiles = statistics.quantiles(durations, n=100, method='inclusive')
+    else:
+        percentiles = durations * 99
+    print(
+        f'{name:>6}: min={durations[0]:.3f}s p50={percentiles[49]:.3f}s '
+        f'p90={percentiles[89]:.3f}s p99={percentiles[98]:.3f}s max={durations[-1]:.3f}s '
+        f'total={sum(durations):.3f}s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='number of commands per mode')
+    parser.add_argument(
+        '--max-latency', type=float, default=0.5, help='max simulated command duration'
+    )
+    args = parser.parse_args()
+
+    for name, wait in (('poll', poll_wait), ('event', ssh._wait_for_exit_status)):
+        rand = random.Random(0)
+        latencies = [rand.uniform(0.001, args.max_latency) for _ in range(args.runs)]
+        durations = run_simulated(wait, latencies)
+        report(name, durations)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,7 +15,6 @@
 :Upstream: No
 """
 import io
-import json
 import re
 
 import pytest
@@ -27,31 +26,10 @@ from robottelo.cli.admin import Admin
 from robottelo.cli.defaults import Defaults
 from robottelo.cli.factory import make_org
 from robottelo.cli.factory import make_product
-from robottelo.helpers import read_data_file
 from robottelo.test import CLITestCase
 from robottelo.utils.issue_handlers import is_open
 
 
-HAMMER_COMMANDS = json.loads(read_data_file('hammer_commands.json'))
-
-
-def _fetch_command_info(command):
-    """Fetch command info from expected commands info dictionary."""
-    info = HAMMER_COMMANDS
-    if command != 'hammer':
-        found = []
-        parts = command.split(' ')[1:]  # exclude hammer
-        for part in parts:
-            for command in info['subcommands']:
-                if command['name'] == part:
-                    found.append(part)
-                    info = command
-                    break
-        if found != parts:
-            return None
-    return info
-
-
 def _format_commands_diff(commands_diff):
     """Format the commands differences into a human readable format."""
     output = io.StringIO()
@@ -105,7 +83,7 @@ class HammerCommandsTestCase(CLITestCase):
             output = hammer.parse_help(raw_command)
             command_options = {option['name'] for option in output['options']}
             command_subcommands = {subcommand['name'] for subcommand in output['subcommands']}
-            expected = _fetch_command_info(command)
+            expected = hammer.command_info(command)
             expected_options = set()
             expected_subcommands = set()
 
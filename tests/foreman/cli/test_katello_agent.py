@@ -21,15 +21,14 @@ import pytest
 from robottelo.api.utils import wait_for_errata_applicability_task
 from robottelo.cleanup import vm_cleanup
 from robottelo.cli.activationkey import ActivationKey
+from robottelo.cli.contentview import ContentView
 from robottelo.cli.factory import make_activation_key
-from robottelo.cli.factory import make_content_view
 from robottelo.cli.factory import make_host_collection
-from robottelo.cli.factory import make_lifecycle_environment
-from robottelo.cli.factory import make_org
 from robottelo.cli.factory import setup_org_for_a_custom_repo
-from robottelo.cli.factory import setup_org_for_a_rh_repo
 from robottelo.cli.host import Host
 from robottelo.cli.hostcollection import HostCollection
+from robottelo.cli.lifecycleenvironment import LifecycleEnvironment
+from robottelo.cli.org import Org
 from robottelo.constants import DISTRO_RHEL7
 from robottelo.constants import FAKE_0_CUSTOM_PACKAGE_GROUP
 from robottelo.constants import FAKE_0_CUSTOM_PACKAGE_GROUP_NAME
@@ -39,16 +38,41 @@ from robottelo.constants import FAKE_1_CUSTOM_PACKAGE_NAME
 from robottelo.constants import FAKE_1_ERRATA_ID
 from robottelo.constants import FAKE_2_CUSTOM_PACKAGE
 from robottelo.constants import FAKE_2_CUSTOM_PACKAGE_NAME
-from robottelo.constants import PRDS
 from robottelo.constants import REPOS
-from robottelo.constants import REPOSET
 from robottelo.constants.repos import FAKE_1_YUM_REPO
 from robottelo.decorators import skip_if_not_set
 from robottelo.test import CLITestCase
 from robottelo.vm import VirtualMachine
 
 
+@pytest.fixture(scope='class')
+def katello_agent_setup(request, module_org_with_rh_repo):
+    """Check out an organization with the Satellite Tools repository, add a custom
+    repository to its content view and activation key
+    """
+    org_id = module_org_with_rh_repo['organization-id']
+    request.cls.org = Org.info({'id': org_id})
+    request.cls.env = LifecycleEnvironment.info(
+        {'id': module_org_with_rh_repo['lifecycle-environment-id'], 'organization-id': org_id}
+    )
+    request.cls.content_view = ContentView.info({'id': module_org_with_rh_repo['content-view-id']})
+    request.cls.activation_key = ActivationKey.info(
+        {'id': module_org_with_rh_repo['activationkey-id'], 'organization-id': org_id}
+    )
+    # Create custom repo, add subscription to activation key
+    setup_org_for_a_custom_repo(
+        {
+            'url': FAKE_1_YUM_REPO,
+            'organization-id': org_id,
+            'content-view-id': request.cls.content_view['id'],
+            'lifecycle-environment-id': request.cls.env['id'],
+            'activationkey-id': request.cls.activation_key['id'],
+        }
+    )
+
+
 @pytest.mark.run_in_one_thread
+@pytest.mark.usefixtures('katello_agent_setup')
 class KatelloAgentTestCase(CLITestCase):
     """Host tests, which require VM with installed katello-agent."""
 
@@ -60,44 +84,10 @@ class KatelloAgentTestCase(CLITestCase):
     @classmethod
     @skip_if_not_set('clients', 'fake_manifest')
     def setUpClass(cls):
-        """Create Org, Lifecycle Environment, Content View, Activation key"""
+        """Skip the tests when the clients or the manifest are not set, the
+        content is set up by the katello_agent_setup fixture
+        """
         super().setUpClass()
-        # Create new org, environment, CV and activation key
-        KatelloAgentTestCase.org = make_org()
-        KatelloAgentTestCase.env = make_lifecycle_environment(
-            {'organization-id': KatelloAgentTestCase.org['id']}
-        )
-        KatelloAgentTestCase.content_view = make_content_view(
-            {'organization-id': KatelloAgentTestCase.org['id']}
-        )
-        KatelloAgentTestCase.activation_key = make_activation_key(
-            {
-                'lifecycle-environment-id': KatelloAgentTestCase.env['id'],
-                'organization-id': KatelloAgentTestCase.org['id'],
-            }
-        )
-        # Add subscription to Satellite Tools repo to activation key
-        setup_org_for_a_rh_repo(
-            {
-                'product': PRDS['rhel'],
-                'repository-set': REPOSET['rhst7'],
-                'repository': REPOS['rhst7']['name'],
-                'organization-id': KatelloAgentTestCase.org['id'],
-                'content-view-id': KatelloAgentTestCase.content_view['id'],
-                'lifecycle-environment-id': KatelloAgentTestCase.env['id'],
-                'activationkey-id': KatelloAgentTestCase.activation_key['id'],
-            }
-        )
-        # Create custom repo, add subscription to activation key
-        setup_org_for_a_custom_repo(
-            {
-                'url': FAKE_1_YUM_REPO,
-                'organization-id': KatelloAgentTestCase.org['id'],
-                'content-view-id': KatelloAgentTestCase.content_view['id'],
-                'lifecycle-environment-id': KatelloAgentTestCase.env['id'],
-                'activationkey-id': KatelloAgentTestCase.activation_key['id'],
-            }
-        )
 
     def setUp(self):
         """Create VM, subscribe it to satellite-tools repo, install katello-ca
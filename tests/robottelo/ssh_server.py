@@ -0,0 +1,367 @@
+"""Local stand-in SSH server for exercising ``robottelo.ssh`` without a
+Satellite
+
+The server is built on paramiko's server interface and listens on a random
+local port. It accepts any username and password and answers the commands
+from a script of regular expressions, each with its output, exit status and
+latency, instead of running them. SFTP requests are served from a local root
+directory.
+
+Usage::
+
+    with SSHServer() as server:
+        server.script(r'hammer .* host list', stdout=b'Id,Name\\n1,host\\n')
+        server.script(r'sleep', latency=0.5)
+        ssh.command('hammer host list', **server.connection_kwargs)
+        # or for the functions without connection arguments
+        with server.patch():
+            ssh.upload_file('/tmp/file', '/tmp/file')
+"""
+import functools
+import io
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+import paramiko
+
+from robottelo import ssh
+
+_HOST_KEY = None
+_HOST_KEY_LOCK = threading.Lock()
+_CHUNK_SIZE = 32768
+_SSH_CLIENT_SETTINGS = {
+    'command_timeout': 300,
+    'connection_timeout': 10,
+    'connection_pooling': True,
+    'pool_idle_timeout': 60,
+    'pool_max_idle': 4,
+    'output_spool_size': 10485760,
+}
+
+
+def _host_key():
+    """Return the server host key, generated once as it takes a while"""
+    global _HOST_KEY
+    with _HOST_KEY_LOCK:
+        if _HOST_KEY is None:
+            _HOST_KEY = paramiko.RSAKey.generate(2048)
+    return _HOST_KEY
+
+
+def sized_output(size, line_length=80):
+    """Return ``size`` bytes of output made of lines of ``line_length``"""
+    line = b'x' * (line_length - 1) + b'\n'
+    lines, rest = divmod(size, line_length)
+    return line * lines + b'x' * rest
+
+
+class ScriptedCommand:
+    """The scripted answer of the server to the commands matching ``pattern``
+
+    :param str pattern: regular expression searched in the command
+    :param stdout: bytes or a callable returning bytes for the command
+    :param bytes stderr: standard error output
+    :param int return_code: exit status
+    :param float latency: seconds to wait before answering, the server
+        latency when ``None``
+    """
+
+    def __init__(self, pattern, stdout=b'', stderr=b'', return_code=0, latency=None):
+        self.pattern = re.compile(pattern)
+        self.stdout = stdout
+        self.stderr = stderr
+        self.return_code = return_code
+        self.latency = latency
+
+    def output(self, command):
+        if callable(self.stdout):
+            return self.stdout(command)
+        return self.stdout
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    def __init__(self, server):
+        self.server = server
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password,publickey'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        channel.transport.start_after_reply(
+            threading.Thread(
+                target=self.server._run, args=(channel, command.decode('utf-8')), daemon=True
+            )
+        )
+        return True
+
+
+class _Transport(paramiko.Transport):
+    """Transport starting the commands once their exec request is replied,
+    otherwise a fast command could close its channel before the reply and the
+    client would see its exec request fail
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = []
+
+    def start_after_reply(self, thread):
+        self._pending.append(thread)
+
+    def _send_user_message(self, data):
+        super()._send_user_message(data)
+        # the requests are handled and replied in the transport thread
+        while self._pending and threading.current_thread() is self:
+            self._pending.pop(0).start()
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as err:
+            return paramiko.SFTPServer.convert_errno(err.errno)
+
+    def chattr(self, attr):
+        return _SFTPServerInterface.set_attributes(self.filename, attr)
+
+
+class _SFTPServerInterface(paramiko.SFTPServerInterface):
+    """SFTP server storing the files under the server root, absolute remote
+    paths are relative to the root
+    """
+
+    def __init__(self, server, ssh_server, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.root = ssh_server.root
+
+    def _path(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip('/'))
+
+    @staticmethod
+    def set_attributes(path, attr):
+        if attr.st_mode is not None:
+            os.chmod(path, attr.st_mode)
+        if attr.st_atime is not None and attr.st_mtime is not None:
+            os.utime(path, (attr.st_atime, attr.st_mtime))
+        return paramiko.SFTP_OK
+
+    def _call(self, func, *args):
+        try:
+            return func(*args)
+        except OSError as err:
+            return paramiko.SFTPServer.convert_errno(err.errno)
+
+    def stat(self, path):
+        return self._call(lambda: paramiko.SFTPAttributes.from_stat(os.stat(self._path(path))))
+
+    def lstat(self, path):
+        return self._call(lambda: paramiko.SFTPAttributes.from_stat(os.lstat(self._path(path))))
+
+    def list_folder(self, path):
+        def list_folder():
+            path_ = self._path(path)
+            return [
+                paramiko.SFTPAttributes.from_stat(os.lstat(os.path.join(path_, name)), name)
+                for name in os.listdir(path_)
+            ]
+
+        return self._call(list_folder)
+
+    def open(self, path, flags, attr):
+        def open_():
+            path_ = self._path(path)
+            fd = os.open(path_, flags, 0o644)
+            if flags & os.O_WRONLY:
+                mode = 'ab' if flags & os.O_APPEND else 'wb'
+            elif flags & os.O_RDWR:
+                mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+            else:
+                mode = 'rb'
+            handle = _SFTPHandle(flags)
+            handle.filename = path_
+            handle.readfile = handle.writefile = os.fdopen(fd, mode)
+            return handle
+
+        return self._call(open_)
+
+    def remove(self, path):
+        return self._call(lambda: os.remove(self._path(path)) or paramiko.SFTP_OK)
+
+    def rename(self, oldpath, newpath):
+        return self._call(
+            lambda: os.rename(self._path(oldpath), self._path(newpath)) or paramiko.SFTP_OK
+        )
+
+    def mkdir(self, path, attr):
+        return self._call(lambda: os.mkdir(self._path(path)) or paramiko.SFTP_OK)
+
+    def rmdir(self, path):
+        return self._call(lambda: os.rmdir(self._path(path)) or paramiko.SFTP_OK)
+
+    def chattr(self, path, attr):
+        return self._call(self.set_attributes, self._path(path), attr)
+
+
+class SSHServer:
+    """Local SSH server answering scripted commands
+
+    The commands are matched against the scripted patterns, the last scripted
+    first, and the unmatched ones exit with the status 127.
+
+    :param float latency: seconds waited before answering each command
+    :param str root: the directory the SFTP files are stored in, a temporary
+        directory when ``None``
+    :ivar list commands: the commands received, in order
+    """
+
+    def __init__(self, latency=0.0, root=None):
+        self.latency = latency
+        self._tmp_dir = None if root else tempfile.TemporaryDirectory()
+        self.root = root or self._tmp_dir.name
+        self.commands = []
+        self._scripts = []
+        self._socket = None
+        self._transports = []
+        self._lock = threading.Lock()
+
+    @property
+    def connections(self):
+        """Number of connections accepted so far"""
+        return len(self._transports)
+
+    @property
+    def connection_kwargs(self):
+        """Keyword arguments connecting the ``robottelo.ssh`` functions to the
+        server
+        """
+        return dict(
+            hostname='127.0.0.1',
+            port=self.port,
+            username='robottelo',
+            password='robottelo',
+        )
+
+    @contextmanager
+    def patch(self, **ssh_client_settings):
+        """Point the ``robottelo.ssh`` settings to the server, for the code
+        which does not take the connection arguments, and connect to the
+        server port whatever the requested port
+
+        :param ssh_client_settings: ``ssh_client`` settings overriding the
+            defaults
+        """
+        settings = mock.MagicMock()
+        settings.server.hostname = '127.0.0.1'
+        settings.server.ssh_username = 'robottelo'
+        settings.server.ssh_password = 'robottelo'
+        settings.server.ssh_key = None
+        settings.server.ssh_key_string = None
+        for name, value in dict(_SSH_CLIENT_SETTINGS, **ssh_client_settings).items():
+            setattr(settings.ssh_client, name, value)
+        port = self.port
+
+        class SSHClient(ssh.SSHClient):
+            def connect(self, *args, **kwargs):
+                kwargs['port'] = port
+                return super().connect(*args, **kwargs)
+
+        with mock.patch('robottelo.ssh.settings', settings), mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', SSHClient
+        ):
+            try:
+                yield settings
+            finally:
+                ssh.close_pooled_connections()
+
+    def script(self, pattern, stdout=b'', stderr=b'', return_code=0, latency=None):
+        """Answer the commands matching ``pattern``, see
+        :class:`ScriptedCommand`
+        """
+        self._scripts.insert(
+            0, ScriptedCommand(pattern, stdout, stderr, return_code, latency=latency)
+        )
+
+    def start(self):
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(100)
+        self.port = self._socket.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        ssh.close_pooled_connections('127.0.0.1')
+        self._socket.close()
+        with self._lock:
+            for transport in self._transports:
+                transport.close()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                # the server was stopped
+                return
+            # do not hold the small packets of the scripted answers for the
+            # acknowledgment of the previous ones
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = _Transport(client)
+            transport.add_server_key(_host_key())
+            transport.set_subsystem_handler(
+                'sftp', paramiko.SFTPServer, _SFTPServerInterface, ssh_server=self
+            )
+            with self._lock:
+                self._transports.append(transport)
+            transport.start_server(server=_ServerInterface(self))
+
+    def _run(self, channel, command):
+        self.commands.append(command)
+        for scripted in self._scripts:
+            if scripted.pattern.search(command):
+                break
+        else:
+            scripted = ScriptedCommand('', stderr=b'command not found\n', return_code=127)
+        latency = self.latency if scripted.latency is None else scripted.latency
+        try:
+            if latency:
+                time.sleep(latency)
+            stdout = io.BytesIO(scripted.output(command))
+            for chunk in iter(functools.partial(stdout.read, _CHUNK_SIZE), b''):
+                channel.sendall(chunk)
+            if scripted.stderr:
+                channel.sendall_stderr(scripted.stderr)
+            channel.send_exit_status(scripted.return_code)
+            channel.shutdown_write()
+        except (OSError, EOFError):
+            # the client closed the channel, e.g. on timeout
+            pass
+        finally:
+            channel.close()
@@ -1,14 +1,22 @@
+import os
+import pickle
+import subprocess
+import tempfile
+import threading
 from functools import partial
 from unittest import mock
 
 import pytest
 import unittest2
 
+from robottelo.cli.base import add_timing_hook
 from robottelo.cli.base import Base
 from robottelo.cli.base import CLIBaseError
 from robottelo.cli.base import CLIDataBaseError
 from robottelo.cli.base import CLIError
 from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.base import remove_timing_hook
+from robottelo.ssh import SSHCommandResult
 
 
 class CLIClass(Base):
@@ -21,6 +29,35 @@ class CLIClass(Base):
 class BaseCliTestCase(unittest2.TestCase):
     """Tests for the Base cli class"""
 
+    def test_command_sub_per_thread(self):
+        """The command_sub set by a thread is not seen by the other threads
+        using the same class
+        """
+
+        class ThreadCLIClass(Base):
+            command_base = 'basecommand'
+
+        barrier = threading.Barrier(2)
+        commands = {}
+
+        def construct(command_sub):
+            ThreadCLIClass.command_sub = command_sub
+            # let the other thread set its command_sub before building
+            barrier.wait(timeout=10)
+            commands[command_sub] = ThreadCLIClass._construct_command({'id': 1})
+
+        ThreadCLIClass.command_sub = 'list'
+        threads = [threading.Thread(target=construct, args=(sub,)) for sub in ('info', 'delete')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert commands == {
+            'info': 'basecommand info --id="1"',
+            'delete': 'basecommand delete --id="1"',
+        }
+        assert ThreadCLIClass.command_sub == 'list'
+
     def test_construct_command(self):
         """_construct_command builds a command using flags and arguments"""
         Base.command_base = 'basecommand'
@@ -36,6 +73,37 @@ class BaseCliTestCase(unittest2.TestCase):
         assert '--flag-two' not in command_parts
         assert len(command_parts) == 4
 
+    @mock.patch('robottelo.cli.base.settings')
+    def test_construct_command_validate_options(self, settings):
+        """_construct_command fails on the options not accepted by hammer"""
+        settings.performance.validate_hammer_options = True
+        Base.command_base = 'host'
+        Base.command_sub = 'list'
+        assert (
+            Base._construct_command(
+                {'search': 'name = host', 'per-page': 1, 'unknown': None, 'unknown-flag': False}
+            )
+            == 'host list --search="name = host" --per-page="1"'
+        )
+        with pytest.raises(CLIReturnCodeError) as context:
+            Base._construct_command({'search': 'name = host', 'serch': 'name = host'})
+        assert context.value.return_code == 64
+        assert "Unrecognised option '--serch'" in context.value.stderr
+        assert "See: 'hammer host list --help'" in context.value.stderr
+
+    @mock.patch('robottelo.cli.base.settings')
+    def test_construct_command_skip_validation(self, settings):
+        """_construct_command does not validate the options of unknown
+        commands or if the validation is disabled
+        """
+        settings.performance.validate_hammer_options = True
+        Base.command_base = 'basecommand'
+        Base.command_sub = 'list'
+        assert Base._construct_command({'serch': 'value'}) == 'basecommand list --serch="value"'
+        settings.performance.validate_hammer_options = False
+        Base.command_base = 'host'
+        assert Base._construct_command({'serch': 'value'}) == 'host list --serch="value"'
+
     def test_username_password_parameters_lookup(self):
         """Username and password returned are the parameters"""
         username, password = CLIClass._get_username_password('auser', 'apass')
@@ -172,13 +240,17 @@ class BaseCliTestCase(unittest2.TestCase):
         execute.called_once_with(construct.return_value, output_format='csv')
         assert not info.called
 
+    @mock.patch('robottelo.cli.base.settings')
     @mock.patch('robottelo.cli.base.Base.info')
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
-    def test_add_create_with_result_dct_with_id_not_required_org(self, construct, execute, info):
+    def test_add_create_with_result_dct_with_id_not_required_org(
+        self, construct, execute, info, settings
+    ):
         """Check command create when result has dct id key and organization
         is not required
         """
+        settings.performance = False
         execute.return_value = [{'id': 'foo', 'bar': 'bas'}]
         Base.command_requires_org = False
         assert execute.return_value == Base.create()
@@ -187,13 +259,17 @@ class BaseCliTestCase(unittest2.TestCase):
         execute.called_once_with(construct.return_value, output_format='csv')
         info.called_once_with({'id': 'foo'})
 
+    @mock.patch('robottelo.cli.base.settings')
     @mock.patch('robottelo.cli.base.Base.info')
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
-    def test_add_create_with_result_dct_with_id_required_org(self, construct, execute, info):
+    def test_add_create_with_result_dct_with_id_required_org(
+        self, construct, execute, info, settings
+    ):
         """Check command create when result has dct id key and organization
         is required
         """
+        settings.performance = False
         execute.return_value = [{'id': 'foo', 'bar': 'bas'}]
         Base.command_requires_org = True
         assert execute.return_value == Base.create({'organization-id': 'org-id'})
@@ -216,6 +292,62 @@ class BaseCliTestCase(unittest2.TestCase):
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
 
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_add_create_lazy_info(self, construct, execute, info, settings):
+        """Check command create runs info only when a field not printed by
+        create is read
+        """
+        settings.performance.lazy_create_info = True
+        execute.return_value = [{'id': 'foo', 'name': 'bar'}]
+        info.return_value = {'id': 'foo', 'name': 'bar', 'label': 'baz'}
+        Base.command_requires_org = False
+        result = Base.create()
+        assert result['id'] == 'foo'
+        assert result.get('name') == 'bar'
+        assert 'id' in result
+        info.assert_not_called()
+        assert result['label'] == 'baz'
+        info.assert_called_once_with({'id': 'foo'})
+        assert result == info.return_value
+        assert list(result) == ['id', 'name', 'label']
+        info.assert_called_once_with({'id': 'foo'})
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_add_create_lazy_info_whole_record(self, construct, execute, info, settings):
+        """Check the whole record is fetched before being used as a dict"""
+        settings.performance.lazy_create_info = True
+        execute.return_value = [{'id': 'foo', 'message': 'Created.'}]
+        info.return_value = {'id': 'foo', 'name': 'bar'}
+        Base.command_requires_org = True
+        result = Base.create({'organization-id': 'org-id'})
+        assert dict(result) == {'id': 'foo', 'name': 'bar'}
+        info.assert_called_once_with({'id': 'foo', 'organization-id': 'org-id'})
+        with pytest.raises(KeyError):
+            result['message']
+        assert result.get('message') is None
+        assert pickle.loads(pickle.dumps(result)) == {'id': 'foo', 'name': 'bar'}
+        assert info.call_count == 1
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_add_create_lazy_info_update(self, construct, execute, info, settings):
+        """Check fields set on the record are not overridden by the fetch"""
+        settings.performance.lazy_create_info = True
+        execute.return_value = [{'id': 'foo'}]
+        info.return_value = {'id': 'foo', 'name': 'bar'}
+        Base.command_requires_org = False
+        result = Base.create()
+        result['name'] = 'new'
+        assert result == {'id': 'foo', 'name': 'new'}
+
     def assert_cmd_execution(
         self, construct, execute, base_method, cmd_sub, ignore_stderr=False, **base_method_kwargs
     ):
@@ -249,6 +381,7 @@ class BaseCliTestCase(unittest2.TestCase):
         """Check executed build ssh method and returns raw response"""
         settings.locale = 'en_US'
         settings.performance = False
+        settings.ssh_client.hammer_shell = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
         response = Base.execute('some_cmd', return_raw_response=True)
@@ -262,6 +395,24 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         assert response is command.return_value
 
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_hostname(self, settings, command):
+        """Check the class bound to a hostname executes the commands there,
+        without changing the hostname of its parent class
+        """
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.ssh_client.hammer_shell = False
+        bound = CLIClass.with_hostname('satellite2.example.com')
+        assert bound.__name__ == 'CLIClass'
+        assert issubclass(bound, CLIClass)
+        assert CLIClass.hostname is None
+        bound.execute('some_cmd', return_raw_response=True)
+        assert command.call_args[1]['hostname'] == 'satellite2.example.com'
+        CLIClass.execute('some_cmd', return_raw_response=True)
+        assert command.call_args[1]['hostname'] is None
+
     @mock.patch('robottelo.cli.base.Base._handle_response')
     @mock.patch('robottelo.cli.base.ssh.command')
     @mock.patch('robottelo.cli.base.settings')
@@ -269,6 +420,7 @@ class BaseCliTestCase(unittest2.TestCase):
         """Check executed build ssh method and delegate response handling"""
         settings.locale = 'en_US'
         settings.performance.timer_hammer = True
+        settings.ssh_client.hammer_shell = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
         response = Base.execute('some_cmd', output_format='json')
@@ -283,12 +435,86 @@ class BaseCliTestCase(unittest2.TestCase):
         handle_resp.assert_called_once_with(command.return_value, ignore_stderr=None)
         assert response is handle_resp.return_value
 
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_timing_hook(self, settings, command):
+        """Check the time report is stripped from stderr and passed to the
+        timing hooks
+        """
+        settings.locale = 'en_US'
+        settings.performance.time_hammer = True
+        settings.server.hostname = 'satellite.example.com'
+        command.return_value = SSHCommandResult(
+            stdout='', stderr='real 1.50\nuser 0.80\nsys 0.10\n', return_code=0
+        )
+        records = []
+        add_timing_hook(records.append)
+        try:
+            with mock.patch('robottelo.cli.base.Base.logger.warning') as warning:
+                Base.execute('host list')
+        finally:
+            remove_timing_hook(records.append)
+        warning.assert_not_called()
+        assert command.return_value.stderr == ''
+        assert len(records) == 1
+        assert records[0].command == 'host list'
+        assert records[0].hostname == 'satellite.example.com'
+        assert (records[0].real, records[0].user, records[0].sys) == (1.5, 0.8, 0.1)
+        assert records[0].return_code == 0
+
+    @mock.patch('robottelo.cli.base.Base._handle_response')
+    @mock.patch('robottelo.cli.base.hammer_shell.execute')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_hammer_shell(self, settings, command, shell_execute, handle_resp):
+        """Check the command is run in the hammer shell when enabled"""
+        settings.performance = False
+        settings.ssh_client.hammer_shell = True
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        response = Base.execute('some_cmd', output_format='csv', timeout=10)
+        shell_execute.assert_called_once_with(
+            'some_cmd',
+            hostname=None,
+            user='admin',
+            password='password',
+            output_format='csv',
+            timeout=10,
+        )
+        command.assert_not_called()
+        handle_resp.assert_called_once_with(shell_execute.return_value, ignore_stderr=None)
+        assert response is handle_resp.return_value
+
+    @mock.patch('robottelo.cli.base.hammer_shell.execute')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_hammer_shell_fallback(self, settings, command, shell_execute):
+        """Check the command runs in its own hammer process when the hammer
+        shell can not run it
+        """
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.ssh_client.hammer_shell = True
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        shell_execute.return_value = None
+        response = Base.execute('some_cmd', return_raw_response=True)
+        assert shell_execute.called
+        command.assert_called_once_with(
+            'LANG=en_US  hammer -v -u admin -p password  some_cmd'.encode('utf-8'),
+            hostname=None,
+            output_format=None,
+            timeout=None,
+            connection_timeout=None,
+        )
+        assert response is command.return_value
+
     @mock.patch('robottelo.cli.base.Base.list')
     def test_exists_without_option_and_empty_return(self, lst_method):
         """Check exists method without options and empty return"""
         lst_method.return_value = []
         response = Base.exists(search=['id', 1])
-        lst_method.assert_called_once_with({'search': 'id=\\"1\\"'})
+        lst_method.assert_called_once_with({'search': 'id=\\"1\\"', 'page': 1, 'per-page': 1})
         assert [] == response
 
     @mock.patch('robottelo.cli.base.Base.list')
@@ -297,9 +523,63 @@ class BaseCliTestCase(unittest2.TestCase):
         lst_method.return_value = [1, 2]
         my_options = {'search': 'foo=bar'}
         response = Base.exists(my_options, search=['id', 1])
-        lst_method.assert_called_once_with(my_options)
+        lst_method.assert_called_once_with({'search': 'foo=bar', 'page': 1, 'per-page': 1})
         assert 1 == response
 
+    @mock.patch('robottelo.cli.base.Base.list')
+    def test_iter_list(self, lst_method):
+        """Check iter_list fetches the pages until one is not full"""
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        lst_method.side_effect = lambda options: pages[options['page']]
+        options = {'search': 'foo=bar'}
+        assert list(Base.iter_list(options, per_page=2)) == [1, 2, 3, 4, 5]
+        assert lst_method.call_args_list == [
+            mock.call({'search': 'foo=bar', 'page': page, 'per-page': 2}) for page in (1, 2, 3)
+        ]
+        assert options == {'search': 'foo=bar'}
+
+    @mock.patch('robottelo.cli.base.Base.list')
+    def test_iter_list_full_last_page(self, lst_method):
+        """Check iter_list stops on an empty page"""
+        pages = {1: [1, 2], 2: [3, 4], 3: []}
+        lst_method.side_effect = lambda options: pages[options['page']]
+        assert list(Base.iter_list(per_page=2, prefetch=False)) == [1, 2, 3, 4]
+        assert lst_method.call_count == 3
+
+    @mock.patch('robottelo.cli.base.Base.list')
+    def test_iter_list_stop_early(self, lst_method):
+        """Check the pages after the one being consumed are not fetched when
+        the iteration stops
+        """
+        lst_method.side_effect = lambda options: [options['page']] * 2
+        entities = Base.iter_list(per_page=2)
+        assert next(entities) == 1
+        entities.close()
+        assert [call[0][0]['page'] for call in lst_method.call_args_list] in ([1], [1, 2])
+        entities = Base.iter_list(per_page=2, prefetch=False)
+        assert next(entities) == 1
+        entities.close()
+        assert lst_method.call_args_list[-1][0][0]['page'] == 1
+
+    @mock.patch('robottelo.cli.base.Base.list')
+    def test_iter_list_prefetch_error(self, lst_method):
+        """Check the error of a page fetched in advance is raised once the
+        page is reached
+        """
+        pages = {1: [1, 2], 2: CLIReturnCodeError(1, 'error', 'msg')}
+
+        def list_page(options):
+            page = pages[options['page']]
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        lst_method.side_effect = list_page
+        entities = Base.iter_list(per_page=2)
+        assert [next(entities), next(entities)] == [1, 2]
+        with pytest.raises(CLIReturnCodeError):
+            next(entities)
+
     @mock.patch('robottelo.cli.base.Base.command_requires_org')
     def test_info_requires_organization_id(self, _):
         """Check info raises CLIError with organization-id is not present in
@@ -428,3 +708,96 @@ class CLIBaseErrorTestCase(unittest2.TestCase):
         """Check if message is exposed to assertRaisesRegex"""
         with pytest.raises(CLIBaseError, match='msg'):
             raise CLIBaseError(1, 'stderr', 'msg')
+
+
+FAKE_HAMMER = '''#!/bin/bash
+echo "$*"
+if [[ "$*" == *fail* ]]; then echo 'failed' >&2; exit 65; fi
+'''
+
+
+class Entity(Base):
+    """Class used for the batch tests"""
+
+    command_base = 'entity'
+
+
+class BatchCLIClass(CLIClass):
+    """Class used for the batch tests with credentials"""
+
+    command_base = 'entity'
+
+
+class CLIBatchTestCase(unittest2.TestCase):
+    """Tests for the CLIBatch class, running the batch script locally"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        hammer = os.path.join(tmp_dir.name, 'hammer')
+        with open(hammer, 'w') as hammer_file:
+            hammer_file.write(FAKE_HAMMER)
+        os.chmod(hammer, 0o755)
+        self.env = dict(os.environ, PATH=f'{tmp_dir.name}:{os.environ["PATH"]}')
+        self.scripts = []
+        settings = mock.patch('robottelo.cli.base.settings').start()
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        mock.patch('robottelo.cli.base.ssh.command', self.command).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def command(self, cmd, hostname=None, output_format=None, timeout=None):
+        """Run the batch script locally, as ``ssh.command`` would remotely"""
+        self.scripts.append(cmd.decode('utf-8'))
+        process = subprocess.run(['bash', '-c', cmd], capture_output=True, env=self.env)
+        return SSHCommandResult(
+            process.stdout.decode(), process.stderr.decode(), process.returncode, output_format
+        )
+
+    def test_batch(self):
+        """Check the commands run in one script and return their output"""
+        with Base.batch() as batch:
+            info = batch.add(BatchCLIClass, 'info', {'id': 1})
+            raw = batch.add(Entity, 'list', return_raw_response=True)
+        assert len(self.scripts) == 1
+        assert info.result() == ['-v -u adminusername -p adminpassword entity info --id=1', '']
+        response = raw.result()
+        assert response.stdout == ['-v -u admin -p password entity list', '']
+        assert response.return_code == 0
+
+    def test_batch_parallel(self):
+        """Check the commands run concurrently keep their own output"""
+        with Base.batch(parallel=True) as batch:
+            results = [batch.add(Entity, 'info', {'id': index}) for index in range(5)]
+        assert [result.result()[0][-1] for result in results] == list('01234')
+
+    def test_batch_error(self):
+        """Check a failed command raises the error of Base.execute"""
+        with Base.batch() as batch:
+            failed = batch.add(Entity, 'fail', {'name': 'a b'})
+            info = batch.add(Entity, 'info', {'id': 1})
+        with pytest.raises(CLIReturnCodeError) as error:
+            failed.result()
+        assert error.value.return_code == 65
+        assert error.value.stderr == 'failed\n'
+        assert info.result()
+
+    def test_batch_not_run(self):
+        """Check the results are not available before the batch has run"""
+        batch = Base.batch()
+        result = batch.add(Entity, 'info', {'id': 1})
+        with pytest.raises(CLIError):
+            result.result()
+        with pytest.raises(ZeroDivisionError):
+            with batch:
+                raise ZeroDivisionError
+        assert not self.scripts
+
+    def test_batch_script_failure(self):
+        """Check a batch whose script failed raises a CLIError"""
+        self.env['TMPDIR'] = '/nonexistent'
+        with pytest.raises(CLIError):
+            with Base.batch() as batch:
+                batch.add(Entity, 'info', {'id': 1})
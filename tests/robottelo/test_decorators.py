@@ -1,50 +1,103 @@
 """Unit tests for :mod:`robottelo.decorators`."""
+import time
 from itertools import chain
 from unittest import mock
 
 import pytest
+from fauxfactory import gen_integer
 from unittest2 import SkipTest
 
 from robottelo import decorators
+from robottelo.decorators.func_shared.file_storage import FileStorageHandler
 
 
 class TestCacheable:
     """Tests for :func:`robottelo.decorators.cacheable`."""
 
     @pytest.fixture(scope="function")
-    def make_foo(self):
-        mocked_object_cache_patcher = mock.patch.dict('robottelo.decorators.OBJECT_CACHE')
-        mocked_object_cache_patcher.start()
+    def object_cache(self):
+        object_cache = decorators.ObjectCache(maxsize=2)
+        with mock.patch('robottelo.decorators.OBJECT_CACHE', object_cache), mock.patch.object(
+            object_cache, '_storage', return_value=None
+        ):
+            yield object_cache
 
+    @pytest.fixture(scope="function")
+    def make_foo(self, object_cache):
         # decorators.cacheable uses the function name as the key, removing make_
         def make_foo(options):
-            return {'id': 42}
-
-        yield decorators.cacheable(make_foo)
+            return {'id': next(ids), 'options': options}
 
-        mocked_object_cache_patcher.stop()
+        ids = iter(range(42, 100))
+        return decorators.cacheable(make_foo)
 
-    def test_create_and_not_add_to_cache(self, make_foo):
-        """Create a new object and not add it to the cache.
-        First test in the class, as the other tests add to the cache
-        """
+    def test_create_and_not_add_to_cache(self, make_foo, object_cache):
+        """Create a new object and not add it to the cache."""
         make_foo(cached=False)
-        assert 'foo' not in decorators.OBJECT_CACHE
-        assert decorators.OBJECT_CACHE == {}
+        assert len(object_cache) == 0
 
-    def test_build_cache(self, make_foo):
+    def test_build_cache(self, make_foo, object_cache):
         """Create a new object and add it to the cache."""
         obj = make_foo(cached=True)
-        assert decorators.OBJECT_CACHE == {'foo': {'id': 42}}
-        assert id(decorators.OBJECT_CACHE['foo']) == id(obj)
+        assert len(object_cache) == 1
+        assert object_cache.get(decorators._object_cache_key('foo', None)) is obj
 
-    def test_return_from_cache(self, make_foo):
+    def test_return_from_cache(self, make_foo, object_cache):
         """Return an already cached object."""
         cache_obj = {'id': 42}
-        decorators.OBJECT_CACHE['foo'] = cache_obj
+        object_cache.set(decorators._object_cache_key('foo', {}), cache_obj)
         obj = make_foo(cached=True)
         assert id(cache_obj) == id(obj)
 
+    def test_cache_by_options(self, make_foo):
+        """The objects are cached by their normalized options."""
+        obj = make_foo({'name': 'foo', 'organization-ids': [1, 2]}, cached=True)
+        assert (
+            make_foo({'organization-ids': '1,2', 'name': 'foo', 'label': None}, cached=True) is obj
+        )
+        assert make_foo({'name': 'bar'}, cached=True)['id'] == obj['id'] + 1
+        assert make_foo(cached=True)['id'] == obj['id'] + 2
+
+    def test_evict_least_recently_used(self, make_foo, object_cache):
+        """The least recently used objects are evicted beyond maxsize."""
+        foo, bar = make_foo({'name': 'foo'}, cached=True), make_foo({'name': 'bar'}, cached=True)
+        assert make_foo({'name': 'foo'}, cached=True) is foo
+        make_foo({'name': 'baz'}, cached=True)
+        assert len(object_cache) == 2
+        assert make_foo({'name': 'foo'}, cached=True) is foo
+        assert make_foo({'name': 'bar'}, cached=True) is not bar
+
+    def test_expire(self, make_foo, object_cache):
+        """The objects expire after ttl seconds."""
+        object_cache.ttl = 60
+        obj = make_foo(cached=True)
+        with mock.patch('robottelo.decorators.time.time', return_value=time.time() + 61):
+            assert make_foo(cached=True) is not obj
+
+    def test_validate(self, object_cache):
+        """A new object is made when the cached one is not valid anymore."""
+        validate = mock.Mock(side_effect=[True, False, True])
+
+        @decorators.cacheable(validate=validate)
+        def make_foo(options):
+            return {'id': gen_integer()}
+
+        obj = make_foo({'name': 'foo'}, cached=True)
+        assert make_foo({'name': 'foo'}, cached=True) is obj
+        validate.assert_called_with(obj, {'name': 'foo'})
+        new_obj = make_foo({'name': 'foo'}, cached=True)
+        assert new_obj is not obj
+        assert make_foo({'name': 'foo'}, cached=True) is new_obj
+
+    def test_shared_storage(self, make_foo, object_cache, tmpdir):
+        """The objects are reused from the shared functions storage."""
+        storage = FileStorageHandler(root_dir=str(tmpdir))
+        object_cache._storage.return_value = (storage, 'scope.object_cache')
+        obj = make_foo({'name': 'foo'}, cached=True)
+        object_cache.clear()
+        assert make_foo({'name': 'foo'}, cached=True) == obj
+        assert len(object_cache) == 1
+
 
 class TestSkipIfNotSet:
     """Tests for :func:`robottelo.decorators.skip_if_not_set`."""
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+from unittest import mock
+
+import pytest
+
+from robottelo import download_cache
+from robottelo import helpers
+from robottelo import ssh
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path):
+    with mock.patch('robottelo.download_cache.get_temp_dir', return_value=str(tmp_path)):
+        yield tmp_path / download_cache.CACHE_DIR_NAME
+
+
+class MockResponse:
+    def __init__(self, status_code=200, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        half = len(self.content) // 2
+        yield self.content[:half]
+        yield self.content[half:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class TestDownloadCache:
+    """Tests for ``robottelo.download_cache``."""
+
+    def test_store(self, cache_dir):
+        checksum = hashlib.sha256(b'content').hexdigest()
+        assert download_cache.get_blob(checksum) is None
+        blob = download_cache.store([b'con', b'tent'], checksum=checksum)
+        assert blob == str(cache_dir / 'blobs' / checksum)
+        assert download_cache.get_blob(checksum) == blob
+        with open(blob, 'rb') as handler:
+            assert handler.read() == b'content'
+
+    def test_store_checksum_mismatch(self, cache_dir):
+        with pytest.raises(OSError):
+            download_cache.store([b'content'], checksum='0' * 64)
+        assert os.listdir(cache_dir / 'blobs') == []
+
+    def test_store_error(self, cache_dir):
+        def chunks():
+            yield b'content'
+            raise ConnectionError
+
+        with pytest.raises(ConnectionError):
+            download_cache.store(chunks())
+        assert os.listdir(cache_dir / 'blobs') == []
+
+    @mock.patch('robottelo.download_cache.requests')
+    def test_fetch_url(self, requests):
+        requests.get.return_value = MockResponse(content=b'content', headers={'ETag': '"1"'})
+        blob = download_cache.fetch_url('http://example.com/file')
+        requests.get.assert_called_once_with('http://example.com/file', headers={}, stream=True)
+        assert os.path.basename(blob) == hashlib.sha256(b'content').hexdigest()
+
+        # not modified, the cached file is used
+        requests.get.return_value = MockResponse(status_code=304)
+        assert download_cache.fetch_url('http://example.com/file') == blob
+        requests.get.assert_called_with(
+            'http://example.com/file', headers={'If-None-Match': '"1"'}, stream=True
+        )
+
+        # modified, the new content is cached
+        requests.get.return_value = MockResponse(content=b'new content')
+        new_blob = download_cache.fetch_url('http://example.com/file')
+        assert os.path.basename(new_blob) == hashlib.sha256(b'new content').hexdigest()
+
+    @mock.patch('robottelo.download_cache.requests')
+    def test_fetch_url_missing_blob(self, requests):
+        requests.get.return_value = MockResponse(content=b'content', headers={'ETag': '"1"'})
+        blob = download_cache.fetch_url('http://example.com/file')
+        os.unlink(blob)
+        assert download_cache.fetch_url('http://example.com/file') == blob
+        requests.get.assert_called_with('http://example.com/file', headers={}, stream=True)
+        assert os.path.exists(blob)
+
+    def test_copy_to(self, tmp_path):
+        blob = download_cache.store([b'content'])
+        local_file = download_cache.copy_to(blob, str(tmp_path / 'file'))
+        with open(local_file, 'rb') as handler:
+            assert handler.read() == b'content'
+
+    @mock.patch('robottelo.download_cache.requests')
+    def test_file_downloader(self, requests, tmp_path):
+        requests.get.return_value = MockResponse(content=b'content')
+        local_file, file_name = helpers.file_downloader(
+            'http://example.com/file.xml', local_path=f'{tmp_path}/'
+        )
+        assert file_name == 'file.xml'
+        with open(local_file, 'rb') as handler:
+            assert handler.read() == b'content'
+
+
+class MockRemoteFile(io.BytesIO):
+    def prefetch(self):
+        pass
+
+
+@mock.patch('robottelo.ssh._get_connection')
+@mock.patch('robottelo.ssh.execute_command')
+def test_ssh_download_file(execute_command, get_connection, tmp_path):
+    checksum = hashlib.sha256(b'content').hexdigest()
+    execute_command.return_value = ssh.SSHCommandResult(stdout=f'{checksum}  /remote/file\n')
+    connection = get_connection.return_value.__enter__.return_value
+    connection.open_sftp.return_value.open.side_effect = lambda *args: MockRemoteFile(b'content')
+    for index in range(2):
+        ssh.download_file('/remote/file', str(tmp_path / f'file{index}'), cache=True)
+        with open(tmp_path / f'file{index}', 'rb') as handler:
+            assert handler.read() == b'content'
+    # the second download is served from the cache
+    connection.open_sftp.return_value.open.assert_called_once_with('/remote/file', 'rb')
+    connection.open_sftp.return_value.get.assert_not_called()
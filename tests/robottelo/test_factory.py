@@ -0,0 +1,96 @@
+"""Tests for module ``robottelo.cli.factory``."""
+import threading
+from unittest import mock
+
+import pytest
+
+from robottelo.cli.factory import _bulk_options
+from robottelo.cli.factory import add_role_permissions
+from robottelo.cli.factory import CLIFactoryError
+from robottelo.cli.factory import make_bulk
+
+
+def make_foo(options=None):
+    """a factory function failing when asked to"""
+    if options.get('fail'):
+        raise CLIFactoryError(f'Failed to create foo {options["name"]}')
+    return {'id': options['name'], 'name': options['name']}
+
+
+class TestMakeBulk:
+    """Tests for :func:`robottelo.cli.factory.make_bulk`"""
+
+    def test_make_bulk(self):
+        result = make_bulk(make_foo, [{'name': name} for name in 'abc'], max_workers=2)
+        assert result == [{'id': name, 'name': name} for name in 'abc']
+        assert result.created == result
+        assert result.errors == {}
+        result.raise_for_errors()
+
+    def test_make_bulk_concurrently(self):
+        """The entities are created at the same time"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def make_bar(options=None):
+            barrier.wait()
+            return options
+
+        assert make_bulk(make_bar, [{'id': 1}, {'id': 2}, {'id': 3}], max_workers=3) == [
+            {'id': 1},
+            {'id': 2},
+            {'id': 3},
+        ]
+
+    def test_make_bulk_failures(self):
+        """The failures are reported per entity, the others are created"""
+        options_list = [{'name': 'a'}, {'name': 'b', 'fail': True}, {'name': 'c'}]
+        result = make_bulk(make_foo, options_list, max_workers=1)
+        assert result == [{'id': 'a', 'name': 'a'}, None, {'id': 'c', 'name': 'c'}]
+        assert result.created == [{'id': 'a', 'name': 'a'}, {'id': 'c', 'name': 'c'}]
+        assert list(result.errors) == [1]
+        with pytest.raises(CLIFactoryError, match='1 of 3 entities failed') as context:
+            result.raise_for_errors()
+        assert '1: Failed to create foo b' in str(context.value)
+
+    def test_make_bulk_empty(self):
+        assert make_bulk(make_foo, []) == []
+
+
+class TestBulkOptions:
+    """Tests for :func:`robottelo.cli.factory._bulk_options`"""
+
+    def test_shared_options(self):
+        options = {'organization-id': 1}
+        options_list = _bulk_options(2, options)
+        assert options_list == [options, options]
+        # each entity gets its own copy, the factories update the options
+        assert options_list[0] is not options_list[1]
+
+    def test_options_list(self):
+        assert _bulk_options(None, [{'name': 'a'}, None]) == [{'name': 'a'}, {}]
+
+    def test_invalid(self):
+        with pytest.raises(CLIFactoryError):
+            _bulk_options(None, {'organization-id': 1})
+        with pytest.raises(CLIFactoryError):
+            _bulk_options(3, [{'name': 'a'}])
+
+
+@mock.patch('robottelo.cli.factory.Filter')
+def test_add_role_permissions(filter_cli):
+    """Only the options supported by make_filter are given to hammer"""
+    filter_cli.available_permissions.return_value = [
+        {'name': 'view_hosts', 'resource': 'Host'},
+        {'name': 'edit_hosts', 'resource': 'Host'},
+    ]
+    batch = filter_cli.batch.return_value.__enter__.return_value
+    add_role_permissions(
+        1, {'Host': {'permissions': ['view_hosts'], 'search': 'name ~ host', 'unknown': 'value'}}
+    )
+    options = batch.add.call_args[0][2]
+    assert {key: value for key, value in options.items() if value is not None} == {
+        'role-id': 1,
+        'permissions': ['view_hosts'],
+        'search': 'name ~ host',
+    }
+    assert 'unknown' not in options
@@ -0,0 +1,158 @@
+"""Tests for the pooled functions of ``robottelo.decorators.func_shared.shared``."""
+import importlib
+import multiprocessing
+import time
+import uuid
+from unittest import mock
+
+import pytest
+from fauxfactory import gen_string
+
+from robottelo.decorators.func_shared.shared import _set_configured
+from robottelo.decorators.func_shared.shared import enable_shared_function
+from robottelo.decorators.func_shared.shared import EntityPool
+from robottelo.decorators.func_shared.shared import pooled
+from robottelo.decorators.func_shared.shared import set_default_scope
+
+POOL_SIZE = 4
+
+# the shared attribute of the package is the shared decorator
+shared = importlib.import_module('robottelo.decorators.func_shared.shared')
+
+_set_configured(True)
+
+
+@pooled(size=POOL_SIZE)
+def pooled_uuid():
+    """a pooled function returning a new value each time called"""
+    return uuid.uuid4().hex
+
+
+def _checkout_pooled_uuid(_):
+    return pooled_uuid()
+
+
+class Counter:
+    """Count the calls and return the calls count"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def _wait_filled(pool):
+    pool._fill_thread.join(timeout=10)
+    assert not pool._fill_thread.is_alive()
+
+
+@pytest.fixture(autouse=True)
+def shared_scope():
+    # each time a new name space
+    set_default_scope(gen_string('alpha', 10))
+    enable_shared_function(True)
+    yield
+    enable_shared_function(False)
+    set_default_scope(None)
+
+
+class TestEntityPool:
+    """Tests for :class:`robottelo.decorators.func_shared.shared.EntityPool`"""
+
+    def test_defaults(self):
+        """The defaults are read when used, from the settings"""
+        pool = EntityPool('counter', Counter())
+        with mock.patch.object(shared, 'DEFAULT_POOL_SIZE', 3), mock.patch.object(
+            shared, 'SHARE_DEFAULT_TIMEOUT', 600
+        ):
+            assert pool.size == 3
+            assert pool.timeout == 600
+        with mock.patch.object(shared.file_storage, 'LOCK_TIMEOUT', 300):
+            assert pool.fill_timeout == 300
+
+    def test_checkout_disabled(self):
+        """The function is called when the shared functions are disabled"""
+        enable_shared_function(False)
+        pool = EntityPool('counter', Counter(), size=2)
+        assert [pool.checkout() for _ in range(3)] == [1, 2, 3]
+        assert pool._fill_thread is None
+
+    def test_warm(self):
+        counter = Counter()
+        pool = EntityPool('counter', counter, size=2)
+        pool.warm()
+        _wait_filled(pool)
+        assert counter.calls == 2
+        assert [entry['result'] for entry in pool.storage.get(pool.key)['ready']] == [1, 2]
+
+    def test_checkout(self):
+        """The ready results are checked out once and the pool refilled"""
+        counter = Counter()
+        pool = EntityPool('counter', counter, size=2)
+        pool.fill()
+        assert pool.checkout() == 1
+        _wait_filled(pool)
+        assert pool.checkout() == 2
+        _wait_filled(pool)
+        assert pool.checkout() == 3
+        _wait_filled(pool)
+        assert counter.calls == 5
+        state = pool.storage.get(pool.key)
+        assert [entry['result'] for entry in state['ready']] == [4, 5]
+        assert state['filling'] == []
+
+    def test_checkout_empty(self):
+        """A new result is made when none is ready"""
+        counter = Counter()
+        pool = EntityPool('counter', counter, size=1)
+        assert pool.checkout() in (1, 2)
+        _wait_filled(pool)
+        assert counter.calls == 2
+
+    def test_checkout_expired(self):
+        """The expired results are not checked out"""
+        counter = Counter()
+        pool = EntityPool('counter', counter, size=1, timeout=1)
+        pool.fill()
+        time.sleep(2)
+        assert pool.checkout() in (2, 3)
+        _wait_filled(pool)
+
+    def test_dead_filler(self):
+        """The results being made by a dead process are not waited for"""
+        pool = EntityPool('counter', Counter(), size=1)
+        process = multiprocessing.Process(target=time.sleep, args=(0,))
+        process.start()
+        process.join()
+        entry = pool._new_entry()
+        entry['pid'] = process.pid
+        pool.storage.set(pool.key, {'ready': [], 'filling': [entry]})
+        assert pool._reserve() is not None
+
+    def test_fill_failure(self):
+        """The failed results are not waited for by the pool"""
+
+        def fail():
+            raise ValueError('failed')
+
+        pool = EntityPool('failure', fail, size=1)
+        with pytest.raises(ValueError):
+            pool.fill()
+        assert pool.storage.get(pool.key) == {'ready': [], 'filling': []}
+
+    def test_checkout_multiprocess(self):
+        """Each process checks out a different result"""
+        pooled_uuid.pool.fill()
+        ready = {
+            entry['result']
+            for entry in pooled_uuid.pool.storage.get(pooled_uuid.pool.key)['ready']
+        }
+        process_pool = multiprocessing.Pool(POOL_SIZE)
+        try:
+            results = process_pool.map(_checkout_pooled_uuid, range(POOL_SIZE))
+        finally:
+            process_pool.terminate()
+            process_pool.join()
+        assert set(results) == ready
@@ -1,6 +1,19 @@
 """Tests for Robottelo's hammer helpers"""
+import glob
+import json
+import os
+
+import pytest
+
 from robottelo.cli import hammer
 
+INFO_CORPUS = sorted(
+    glob.glob(os.path.join(os.path.dirname(__file__), 'data', 'hammer_info', '*.txt'))
+)
+JSON_CORPUS = sorted(
+    glob.glob(os.path.join(os.path.dirname(__file__), 'data', 'hammer_json', '*.out'))
+)
+
 
 class TestParseCSV:
     """Tests for parsing CSV hammer output"""
@@ -20,6 +33,41 @@ class TestParseCSV:
             {'header': 'unicode', 'header-2': 'chårs'},
         ]
 
+    def test_parse_csv_output(self):
+        """The raw output string is cleaned as ``execute_command`` does"""
+        output = (
+            'Puppet and OSTree will no longer be supported in Katello 3.16\n'
+            'Id,Name,Description\n'
+            '[ INFO 2021-01-01] rails log line\n'
+            '1,"",\x1b[31mred\x1b[0m\n'
+            '2,"multi\nline","quoted ""value"""\n'
+            '\n'
+        )
+        assert hammer.parse_csv(output) == [
+            {'id': '1', 'name': '', 'description': 'red'},
+            {'id': '2', 'name': 'multi\nline', 'description': 'quoted value'},
+        ]
+
+    def test_parse_csv_output_chunks(self, monkeypatch):
+        """The rows spanning several chunks are parsed as a whole"""
+        output = 'Id,Name\n' + ''.join(f'{index},"name\n{index}"\n' for index in range(50))
+        expected = hammer.parse_csv(output)
+        monkeypatch.setattr(hammer, '_CHUNK_SIZE', 7)
+        assert hammer.parse_csv(output) == expected
+        assert expected[49] == {'id': '49', 'name': 'name\n49'}
+
+    def test_iter_csv(self):
+        """The rows are built lazily and share their keys"""
+        rows = hammer.iter_csv('Id,Long Name\n1,a\n2,b\n')
+        assert not isinstance(rows, list)
+        first, second = rows
+        assert first == {'id': '1', 'long-name': 'a'}
+        assert [id(key) for key in first] == [id(key) for key in second]
+
+    def test_iter_csv_empty(self):
+        assert list(hammer.iter_csv('')) == []
+        assert list(hammer.iter_csv('\n')) == []
+
 
 class TestParseJSON:
     """Tests for parsing JSON hammer output"""
@@ -107,6 +155,71 @@ class TestParseJSON:
 
         assert hammer.parse_json(json_output) == hammer.parse_csv(csv_ouput_lines)[0]
 
+    def test_parse_json_values(self):
+        """Integers are converted to strings wherever they are, other values
+        are kept
+        """
+        assert hammer.parse_json('12') == '12'
+        assert hammer.parse_json('[1, -2, 2.5, true, false, null, "3"]') == [
+            '1',
+            '-2',
+            2.5,
+            True,
+            False,
+            None,
+            '3',
+        ]
+        assert hammer.parse_json('{"Big ID": 123456789012345678901234567890}') == {
+            'big-id': '123456789012345678901234567890'
+        }
+
+    def test_parse_json_last_document(self):
+        """Only the last of several printed documents is parsed"""
+        output = '{\n  "Message": "Repository created."\n}\n{\n  "Name": "repo"\n}\n'
+        assert hammer.parse_json(output) == {'name': 'repo'}
+
+    def test_parse_json_invalid(self):
+        """Invalid output fails as with json.loads"""
+        with pytest.raises(json.JSONDecodeError):
+            hammer.parse_json('{"Name": ')
+
+    @pytest.mark.parametrize(
+        'output_path', JSON_CORPUS, ids=[os.path.basename(path) for path in JSON_CORPUS]
+    )
+    def test_parse_corpus(self, output_path):
+        """Parses the json outputs of the corpus as recorded in their json
+        file, generated by the former implementation
+        """
+        with open(output_path) as output_file:
+            output = output_file.read()
+        with open(f'{os.path.splitext(output_path)[0]}.json') as expected_file:
+            expected = json.load(expected_file)
+        assert hammer.parse_json(output) == expected
+
+
+class TestParseTiming:
+    """Tests for parsing the time report of hammer commands"""
+
+    def test_parse_timing(self):
+        stderr, timing = hammer.parse_timing('Warning!\nreal 1.50\nuser 0.80\nsys 0.10\n')
+        assert stderr == 'Warning!\n'
+        assert timing == {'real': 1.5, 'user': 0.8, 'sys': 0.1}
+
+    def test_parse_timing_failure(self):
+        """The exit status reported by time is stripped too, decimal commas
+        are accepted
+        """
+        stderr, timing = hammer.parse_timing(
+            'Error: not found\nCommand exited with non-zero status 65\n'
+            'real 2,00\nuser 1,00\nsys 0,20\n'
+        )
+        assert stderr == 'Error: not found\n'
+        assert timing == {'real': 2.0, 'user': 1.0, 'sys': 0.2}
+
+    @pytest.mark.parametrize('stderr', ['', None, 'Warning!\n', 'real 1.50\nuser 0.80\n'])
+    def test_parse_timing_without_report(self, stderr):
+        assert hammer.parse_timing(stderr) == (stderr, None)
+
 
 class TestParseHelp:
     """Tests for parsing hammer help output"""
@@ -291,6 +404,31 @@ class TestParseHelp:
         }
 
 
+class TestCommandsIndex:
+    """Tests for the index of the hammer commands help"""
+
+    def test_command_info(self):
+        info = hammer.command_info('hammer host list')
+        assert 'search' in {option['name'] for option in info['options']}
+        assert hammer.command_info(' hammer  host list ') is info
+        assert (
+            hammer.command_info('hammer')['options']
+            == hammer.commands_index()['hammer']['options']
+        )
+
+    @pytest.mark.parametrize(
+        'command', ['hammer host unknown', 'hammer unknown list', 'host list']
+    )
+    def test_command_info_unknown(self, command):
+        assert hammer.command_info(command) is None
+        assert hammer.command_options(command) is None
+
+    def test_command_options(self):
+        options = hammer.command_options('hammer host list')
+        assert {'search', 'per-page', 'organization-id', 'h', 'verbose'} <= options
+        assert 'content-view-id' not in options
+
+
 class TestParseInfo:
     """Tests for parsing info hammer output"""
 
@@ -526,3 +664,21 @@ class TestParseInfo:
     def test_parse_json_list(self):
         """Can parse a list in json"""
         assert hammer.parse_json('["item1", "item2"]') == ['item1', 'item2']
+
+    @pytest.mark.parametrize(
+        'output_path', INFO_CORPUS, ids=[os.path.basename(path) for path in INFO_CORPUS]
+    )
+    def test_parse_corpus(self, output_path):
+        """Parses the info outputs of the corpus as recorded in their json
+        file, generated by the former implementation
+        """
+        with open(output_path) as output_file:
+            output = output_file.read().split('\n')
+        with open(f'{os.path.splitext(output_path)[0]}.json') as expected_file:
+            expected = json.load(expected_file)
+        assert hammer.parse_info(output) == expected
+
+    def test_parse_missing_group(self):
+        """A sub-property without group fails as it always did"""
+        with pytest.raises(KeyError):
+            hammer.parse_info(['    Name: value'])
@@ -0,0 +1,65 @@
+import json
+
+from pytest_plugins import hammer_metrics
+from robottelo.cli import base
+
+
+def make_record(command='host list', real=1.0, return_code=0, timestamp=0.0, nodeid='t'):
+    return {
+        'hostname': 'example.com',
+        'command': command,
+        'real': real,
+        'user': 0.5,
+        'sys': 0.1,
+        'return_code': return_code,
+        'timestamp': timestamp,
+        'nodeid': nodeid,
+    }
+
+
+class TestHammerMetrics:
+    """Tests for the ``pytest_plugins.hammer_metrics`` report."""
+
+    def test_command_name(self):
+        assert hammer_metrics.command_name('org info --id="1"') == 'hammer org info'
+        assert hammer_metrics.command_name('ping') == 'hammer ping'
+
+    def test_build_report(self):
+        records = [make_record(real=float(real)) for real in range(1, 101)]
+        records.append(make_record('org create --name="x"', 500.0, 65))
+        report = hammer_metrics.build_report(records)
+        total = report['total']
+        assert total['count'] == 101
+        assert total['failed'] == 1
+        assert total['user'] == 50.5
+        assert report['commands']['hammer host list']['p50'] == 50.0
+        assert report['commands']['hammer host list']['p95'] == 95.0
+        assert report['commands']['hammer host list']['max'] == 100.0
+        assert list(report['commands']) == ['hammer host list', 'hammer org create']
+        assert len(report['slowest']) == 20
+        assert report['slowest'][0]['command'] == 'org create --name="x"'
+        assert report['slowest'][1]['real'] == 100.0
+
+    def test_build_report_without_records(self):
+        assert hammer_metrics.build_report([])['total'] is None
+
+    def test_build_buckets(self):
+        # listed out of time order, as merged from xdist workers
+        records = [make_record(real=float(time), timestamp=time) for time in range(10, 0, -1)]
+        records.append(make_record('ping', timestamp=5))
+        rows = hammer_metrics.build_buckets(records, 3)
+        assert [(row['command'], row['bucket'], row['count']) for row in rows] == [
+            ('hammer host list', 1, 3),
+            ('hammer host list', 2, 3),
+            ('hammer host list', 3, 4),
+            ('hammer ping', 1, 1),
+        ]
+        assert [row['start'] for row in rows[:3]] == [1, 4, 7]
+        assert rows[2]['max'] == 10.0
+        assert set(rows[0]) == set(hammer_metrics._CSV_FIELDS)
+
+    def test_recorder(self):
+        recorder = hammer_metrics.HammerMetricsRecorder()
+        recorder(base.HammerTimingRecord(**make_record()))
+        assert recorder.records == [make_record()]
+        json.dumps(hammer_metrics.build_report(recorder.records))
@@ -0,0 +1,242 @@
+"""Tests for module ``robottelo.cli.hammer_shell``."""
+import shutil
+import socket
+import subprocess
+import threading
+from unittest import mock
+
+import pytest
+
+from robottelo import ssh
+from robottelo.cli import hammer_shell
+
+FAKE_HAMMER = '''\
+#!/usr/bin/env ruby
+sleep 5 if ARGV.include?('slow')
+puts "#{ARGV.join(' ')} LANG=#{ENV['LANG']}"
+warn 'failed' if ARGV.include?('fail')
+exit(ARGV.include?('fail') ? 3 : 0)
+'''
+
+
+class SocketChannel:
+    """The ssh channel of the runner, over a local socket"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+    def recv_stderr_ready(self):
+        return False
+
+
+@pytest.fixture
+def shell(tmp_path):
+    """A hammer shell running the runner script locally, with a fake hammer"""
+    if shutil.which('ruby') is None:
+        pytest.skip('ruby is not installed')
+    hammer = tmp_path / 'hammer'
+    hammer.write_text(FAKE_HAMMER)
+    runner = tmp_path / 'runner.rb'
+    runner.write_text(hammer_shell._RUNNER_SCRIPT)
+    shell = hammer_shell.HammerShell('satellite')
+    local, remote = socket.socketpair()
+    process = subprocess.Popen(
+        ['ruby', str(runner), str(hammer), shell.sentinel.decode()],
+        stdin=remote,
+        stdout=remote,
+        stderr=subprocess.DEVNULL,
+    )
+    remote.close()
+    shell.client = mock.Mock()
+    shell.channel = SocketChannel(local)
+    assert shell._read_header(hammer_shell.time.monotonic() + 30) == [b'ready']
+    yield shell
+    local.close()
+    process.wait(timeout=10)
+
+
+class TestHammerShell:
+    def test_run(self, shell):
+        stdout, stderr, return_code = shell.run(['host', 'list'], {'LANG': 'C'}, 30)
+        assert stdout == b'host list LANG=C\n'
+        assert stderr == b''
+        assert return_code == 0
+
+    def test_run_failure(self, shell):
+        stdout, stderr, return_code = shell.run(['fail'], {}, 30)
+        assert stdout == b'fail LANG=\n'
+        assert stderr == b'failed\n'
+        assert return_code == 3
+        # the next command is not mixed with the previous one
+        assert shell.run(['ping'], {}, 30)[0] == b'ping LANG=\n'
+
+    def test_run_timeout(self, shell):
+        with pytest.raises(ssh.SSHCommandTimeoutError):
+            shell.run(['slow'], {}, 1)
+        assert not shell.closed
+        assert shell.run(['ping'], {}, 30)[2] == 0
+
+    def test_unanswered_command_closes_shell(self):
+        shell = hammer_shell.HammerShell('satellite')
+        client = shell.client = mock.Mock()
+        shell.channel = mock.Mock()
+        shell.channel.recv.side_effect = socket.timeout
+        with pytest.raises(ssh.SSHCommandTimeoutError):
+            shell.run(['host', 'list'], {}, 1)
+        assert shell.closed
+        client.close.assert_called_once_with()
+
+    def test_exited_shell(self):
+        shell = hammer_shell.HammerShell('satellite')
+        shell.client = mock.Mock()
+        shell.channel = mock.Mock()
+        shell.channel.recv.return_value = b''
+        shell.channel.recv_stderr_ready.return_value = False
+        with pytest.raises(hammer_shell.HammerShellError):
+            shell.run(['host', 'list'], {}, 1)
+
+    def test_closed_shell(self):
+        shell = hammer_shell.HammerShell('satellite')
+        with pytest.raises(hammer_shell.HammerShellNotSentError):
+            shell.run(['host', 'list'], {}, 1)
+
+
+@mock.patch('robottelo.cli.hammer_shell.settings')
+@mock.patch('robottelo.cli.hammer_shell.ssh')
+def test_start(ssh_mock, settings):
+    """The runner is started with the locale of the hammer commands"""
+    settings.locale = 'en_US.UTF-8'
+    shell = hammer_shell.HammerShell('satellite')
+    channel = ssh_mock.get_client.return_value.get_transport.return_value.open_session()
+    channel.recv.return_value = shell.sentinel + b' ready\n'
+    shell.start()
+    command = channel.exec_command.call_args[0][0]
+    assert 'LANG=en_US.UTF-8 exec ' in command
+
+
+class TestHammerShellPool:
+    @pytest.fixture(autouse=True)
+    def hammer_shell_class(self):
+        with mock.patch.object(hammer_shell, 'HammerShell') as shell_class:
+            shell_class.side_effect = lambda hostname: mock.Mock(closed=False)
+            yield shell_class
+
+    def test_acquire(self):
+        """Each thread gets its own shell, the idle ones are reused"""
+        pool = hammer_shell.HammerShellPool('satellite', 'admin', size=2)
+        first, second = pool.acquire(), pool.acquire()
+        assert first is not second
+        pool.release(first)
+        assert pool.acquire() is first
+        assert pool.count == 2
+
+    def test_acquire_wait(self):
+        """A thread waits for a shell to be released when the pool is full"""
+        pool = hammer_shell.HammerShellPool('satellite', 'admin', size=1)
+        shell = pool.acquire()
+        timer = threading.Timer(0.5, pool.release, [shell])
+        timer.start()
+        assert pool.acquire() is shell
+        timer.join()
+
+    def test_release_closed(self):
+        """A closed shell is dropped from the pool"""
+        pool = hammer_shell.HammerShellPool('satellite', 'admin', size=1)
+        shell = pool.acquire()
+        shell.closed = True
+        pool.release(shell)
+        assert pool.count == 0
+        assert pool.acquire() is not shell
+
+    def test_start_failure(self, hammer_shell_class):
+        """The shells are not started again until the retry delay is over"""
+        pool = hammer_shell.HammerShellPool('satellite', 'admin')
+        hammer_shell_class.side_effect = None
+        hammer_shell_class.return_value.start.side_effect = OSError
+        assert pool.acquire() is None
+        assert pool.count == 0
+        hammer_shell_class.return_value.start.side_effect = None
+        assert pool.acquire() is None
+        with mock.patch.object(hammer_shell, '_RETRY_DELAY', 0):
+            assert pool.acquire() is hammer_shell_class.return_value
+
+    def test_get_pool(self):
+        """The pools are per host and user"""
+        try:
+            assert hammer_shell._get_pool('satellite', 'admin') is hammer_shell._get_pool(
+                'satellite', 'admin'
+            )
+            assert hammer_shell._get_pool('satellite', 'admin') is not hammer_shell._get_pool(
+                'satellite', 'user'
+            )
+        finally:
+            hammer_shell.close_shells()
+
+
+@mock.patch('robottelo.cli.hammer_shell.settings')
+class TestExecute:
+    @pytest.fixture(autouse=True)
+    def pool(self):
+        with mock.patch.object(hammer_shell, '_get_pool') as get_pool:
+            yield get_pool
+
+    def test_execute(self, settings, pool):
+        settings.locale = 'en_US'
+        shell = pool.return_value.acquire.return_value
+        shell.run.return_value = (b'Id,Name\n1,"host"\n', b'', 0)
+        result = hammer_shell.execute(
+            'host list --search "name = host"',
+            'satellite',
+            user='admin',
+            password='changeme',
+            output_format='csv',
+            timeout=30,
+        )
+        pool.assert_called_once_with('satellite', 'admin')
+        shell.run.assert_called_once_with(
+            [
+                '-v',
+                '-u',
+                'admin',
+                '-p',
+                'changeme',
+                '--output=csv',
+                'host',
+                'list',
+                '--search',
+                'name = host',
+            ],
+            {'LANG': 'en_US'},
+            30,
+        )
+        pool.return_value.release.assert_called_once_with(shell)
+        assert result.return_code == 0
+        assert result.stdout == [{'id': '1', 'name': 'host'}]
+
+    def test_execute_shell_syntax(self, settings, pool):
+        assert hammer_shell.execute('host list | wc -l', 'satellite') is None
+        pool.assert_not_called()
+
+    def test_execute_shell_unavailable(self, settings, pool):
+        pool.return_value.acquire.return_value = None
+        assert hammer_shell.execute('host list', 'satellite') is None
+
+    def test_execute_not_sent(self, settings, pool):
+        """The command not sent is run in a hammer process"""
+        shell = pool.return_value.acquire.return_value
+        shell.run.side_effect = hammer_shell.HammerShellNotSentError
+        assert hammer_shell.execute('host list', 'satellite', user='admin') is None
+        shell.close.assert_called_once_with()
+        pool.return_value.release.assert_called_once_with(shell)
+
+    def test_execute_shell_error(self, settings, pool):
+        """The command sent is not run again"""
+        shell = pool.return_value.acquire.return_value
+        shell.run.side_effect = hammer_shell.HammerShellError
+        with pytest.raises(hammer_shell.HammerShellError):
+            hammer_shell.execute('host list', 'satellite', user='admin')
+        shell.close.assert_called_once_with()
+        pool.return_value.release.assert_called_once_with(shell)
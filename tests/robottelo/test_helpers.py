@@ -7,6 +7,7 @@ from robottelo.helpers import escape_search
 from robottelo.helpers import get_available_capsule_port
 from robottelo.helpers import get_host_info
 from robottelo.helpers import get_server_version
+from robottelo.helpers import HOST_INFO_TTL
 from robottelo.helpers import HostInfoError
 from robottelo.helpers import slugify_component
 from robottelo.helpers import Storage
@@ -44,6 +45,11 @@ class TestGetServerVersion:
 class TestGetHostInfo:
     """Tests for method ``get_host_credentials``."""
 
+    @pytest.fixture(autouse=True)
+    def cache_clear(self):
+        yield
+        get_host_info.cache_clear()
+
     @mock.patch('robottelo.helpers.ssh')
     def test_fedora_info(self, ssh):
         ssh.command = mock.MagicMock(
@@ -72,6 +78,21 @@ class TestGetHostInfo:
         with pytest.raises(HostInfoError, match=r'.*Not able to parse release string "".*'):
             get_host_info()
 
+    @mock.patch('robottelo.host_info.time.monotonic')
+    @mock.patch('robottelo.helpers.ssh')
+    def test_info_expires(self, ssh, monotonic):
+        """The release is queried again once the cached one expired"""
+        ssh.command = mock.MagicMock(
+            return_value=FakeSSHResult(['Fedora release 20 (Heisenbug)'], 0)
+        )
+        monotonic.return_value = 0
+        get_host_info('host.example.com')
+        get_host_info('host.example.com')
+        assert ssh.command.call_count == 1
+        monotonic.return_value = HOST_INFO_TTL + 1
+        assert get_host_info('host.example.com') == ('Fedora', 20, None)
+        assert ssh.command.call_count == 2
+
 
 class TestEscapeSearch:
     def test_return_type(self):
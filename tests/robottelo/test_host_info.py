@@ -28,7 +28,7 @@ class TestGetHostOsVersion:
         """
         ssh_result.return_value.stdout = [ssh_version]
         assert parsed_version == host_info.get_host_os_version.__wrapped__()
-        ssh_result.assert_called_once_with('cat /etc/redhat-release')
+        ssh_result.assert_called_once_with('cat /etc/redhat-release', hostname=None)
 
     def test_rhel_major_version_parsing(self, ssh_result):
         """Check if can parse major versions.
@@ -58,11 +58,31 @@ class TestGetHostOsVersion:
         """Check get_host_os_version() calls are cached"""
         ssh_result.return_value.stdout = ['Red Hat Enterprise Linux Server release 7.2.1 (Maipo)']
         assert 'RHEL7.2.1' == host_info.get_host_os_version()
-        ssh_result.assert_called_once_with('cat /etc/redhat-release')
+        ssh_result.assert_called_once_with('cat /etc/redhat-release', hostname=None)
         ssh_result.return_value.stdout = ['Doesnt matter because because its cached']
         assert 'RHEL7.2.1' == host_info.get_host_os_version()
         # if called more than once cache didn't worked
-        ssh_result.assert_called_once_with('cat /etc/redhat-release')
+        ssh_result.assert_called_once_with('cat /etc/redhat-release', hostname=None)
+
+    def test_cache_per_host(self, ssh_result):
+        """Check get_host_os_version() results are cached per host"""
+        ssh_result.return_value.stdout = ['Red Hat Enterprise Linux Server release 7.2 (Maipo)']
+        assert 'RHEL7.2' == host_info.get_host_os_version(hostname='sat1')
+        ssh_result.return_value.stdout = ['Red Hat Enterprise Linux Server release 7.9 (Maipo)']
+        assert 'RHEL7.9' == host_info.get_host_os_version(hostname='sat2')
+        assert 'RHEL7.2' == host_info.get_host_os_version('sat1')
+        assert ssh_result.call_count == 2
+
+    def test_invalidate_host_cache(self, ssh_result):
+        """Check invalidate_host_cache() drops the results of the host only"""
+        ssh_result.return_value.stdout = ['Red Hat Enterprise Linux Server release 7.2 (Maipo)']
+        host_info.get_host_os_version(hostname='sat1')
+        host_info.get_host_os_version(hostname='sat2')
+        host_info.invalidate_host_cache('sat1')
+        ssh_result.return_value.stdout = ['Red Hat Enterprise Linux Server release 7.9 (Maipo)']
+        assert 'RHEL7.9' == host_info.get_host_os_version(hostname='sat1')
+        assert 'RHEL7.2' == host_info.get_host_os_version(hostname='sat2')
+        assert ssh_result.call_count == 3
 
     @mock.patch('robottelo.host_info.LOGGER')
     def test_command_error(self, logger, ssh_result):
@@ -77,7 +97,7 @@ class TestGetHostOsVersion:
 
         os_version = host_info.get_host_os_version.__wrapped__()
         assert 'Not Available' == os_version
-        ssh_result.assert_called_once_with('cat /etc/redhat-release')
+        ssh_result.assert_called_once_with('cat /etc/redhat-release', hostname=None)
         logger.warning.assert_called_once_with('Host version not available: %r' % cmd)
 
     @mock.patch('robottelo.host_info.LOGGER')
@@ -89,7 +109,7 @@ class TestGetHostOsVersion:
         ssh_result.return_value = cmd
         os_version = host_info.get_host_os_version.__wrapped__()
         assert 'Not Available' == os_version
-        ssh_result.assert_called_once_with('cat /etc/redhat-release')
+        ssh_result.assert_called_once_with('cat /etc/redhat-release', hostname=None)
         logger.warning.assert_called_once_with('Host version not available: %r' % cmd)
 
 
@@ -116,7 +136,7 @@ class TestGetHostSatVersion:
         """Check if can parse major 6.2.x versions"""
         ssh_result.return_value.stdout = ['satellite-6.2.0-21.1.el7sat.noarch']
         assert '6.2' == host_info.get_host_sat_version.__wrapped__()
-        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND)
+        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND, hostname=None)
 
     def test_sat_6_dot_1(self, ssh_result):
         """Check if can parse major 6.2.x versions"""
@@ -129,8 +149,8 @@ class TestGetHostSatVersion:
 
         assert "6.1" == sat_version
         calls = [
-            call(host_info._SAT_6_2_VERSION_COMMAND),
-            call(host_info._SAT_6_1_VERSION_COMMAND),
+            call(host_info._SAT_6_2_VERSION_COMMAND, hostname=None),
+            call(host_info._SAT_6_1_VERSION_COMMAND, hostname=None),
         ]
         ssh_result.assert_has_calls(calls)
 
@@ -138,11 +158,11 @@ class TestGetHostSatVersion:
         """Check get_host_sat_version() calls are cached"""
         ssh_result.return_value.stdout = ['  SATELLITE_SHORT_VERSION = "6.2"']
         assert '6.2' == host_info.get_host_sat_version()
-        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND)
+        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND, hostname=None)
         ssh_result.return_value.stdout = ['Doesnt matter because because its cached']
         assert '6.2' == host_info.get_host_sat_version()
         # if called more than once cache didn't worked
-        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND)
+        ssh_result.assert_called_once_with(host_info._SAT_6_2_VERSION_COMMAND, hostname=None)
 
     @mock.patch('robottelo.host_info.LOGGER')
     def test_command_error(self, logger, ssh_result):
@@ -152,8 +172,8 @@ class TestGetHostSatVersion:
         sat_version = host_info.get_host_sat_version.__wrapped__()
         assert 'Not Available' == sat_version
         calls = [
-            call(host_info._SAT_6_2_VERSION_COMMAND),
-            call(host_info._SAT_6_1_VERSION_COMMAND),
+            call(host_info._SAT_6_2_VERSION_COMMAND, hostname=None),
+            call(host_info._SAT_6_1_VERSION_COMMAND, hostname=None),
         ]
         ssh_result.assert_has_calls(calls)
         logger.warning.assert_called_once_with(
@@ -161,6 +181,38 @@ class TestGetHostSatVersion:
         )
 
 
+class TestCachedHostQuery:
+    """Tests for cached_host_query decorator"""
+
+    def test_ttl(self):
+        query = mock.Mock(side_effect=[1, 2])
+
+        @host_info.cached_host_query(ttl=60)
+        def cached_query(hostname=None):
+            return query()
+
+        with mock.patch('robottelo.host_info.time.monotonic', return_value=100):
+            assert cached_query(hostname='sat') == 1
+        with mock.patch('robottelo.host_info.time.monotonic', return_value=159):
+            assert cached_query(hostname='sat') == 1
+        with mock.patch('robottelo.host_info.time.monotonic', return_value=161):
+            assert cached_query(hostname='sat') == 2
+
+    def test_arguments(self):
+        @host_info.cached_host_query()
+        def cached_query(path, hostname=None):
+            return f'{hostname}:{path}'
+
+        with mock.patch('robottelo.host_info.settings') as settings:
+            settings.server.hostname = 'default'
+            assert cached_query('/a') == 'None:/a'
+            assert cached_query('/b', hostname='sat') == 'sat:/b'
+            settings.server.hostname = 'sat'
+            # the default host is resolved when called
+            assert cached_query('/b') == 'sat:/b'
+        cached_query.cache_clear()
+
+
 class TestSatVersionDependentValues:
     """Tests for SatVersionDependentValues class"""
 
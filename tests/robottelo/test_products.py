@@ -0,0 +1,76 @@
+"""Tests for module ``robottelo.products``."""
+from unittest import mock
+
+import pytest
+
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.products import RepositoryCollection
+from robottelo.products import YumRepository
+
+
+@pytest.fixture
+def hammer():
+    """Mock the hammer commands run by the repositories"""
+    with mock.patch('robottelo.products.make_product_wait') as make_product, mock.patch(
+        'robottelo.products.make_repository'
+    ) as make_repository, mock.patch('robottelo.products.Repository') as repository, mock.patch(
+        'robottelo.products.Task'
+    ) as task:
+        make_product.return_value = {'id': 1, 'name': 'product'}
+        make_repository.side_effect = [{'id': 10}, {'id': 11}]
+        repository.synchronize.side_effect = lambda options, **kwargs: [
+            {'id': f'task-{options["id"]}'}
+        ]
+        yield repository, task
+
+
+@pytest.fixture
+def repos_collection():
+    return RepositoryCollection(
+        repositories=[
+            YumRepository(url='http://repo1.example.com'),
+            YumRepository(url='http://repo2.example.com'),
+        ]
+    )
+
+
+class TestRepositoryCollection:
+    """Tests for :class:`robottelo.products.RepositoryCollection`"""
+
+    def test_setup(self, hammer, repos_collection):
+        """The repositories are synced one after the other"""
+        repository, task = hammer
+        product, repos_info = repos_collection.setup(1, async_sync=False)
+        assert repos_info == [{'id': 10}, {'id': 11}]
+        assert repository.synchronize.call_args_list == [
+            mock.call({'id': 10}, timeout=4800),
+            mock.call({'id': 11}, timeout=4800),
+        ]
+        task.progress.assert_not_called()
+
+    def test_setup_async_sync(self, hammer, repos_collection):
+        """The syncs are all started then waited for together"""
+        repository, task = hammer
+        product, repos_info = repos_collection.setup(1, async_sync=True)
+        assert repos_info == [{'id': 10}, {'id': 11}]
+        assert repository.synchronize.call_args_list == [
+            mock.call({'id': 10, 'async': True}),
+            mock.call({'id': 11, 'async': True}),
+        ]
+        assert sorted(call[0][0]['id'] for call in task.progress.call_args_list) == [
+            'task-10',
+            'task-11',
+        ]
+
+    def test_wait_for_sync_tasks_failure(self, hammer):
+        """All the tasks are waited for and the failure raised"""
+        _, task = hammer
+
+        def progress(options, **kwargs):
+            if options['id'] == 'task-1':
+                raise CLIReturnCodeError(1, 'sync failed', 'sync failed')
+
+        task.progress.side_effect = progress
+        with pytest.raises(CLIReturnCodeError):
+            RepositoryCollection.wait_for_sync_tasks(['task-1', 'task-2'])
+        assert task.progress.call_count == 2
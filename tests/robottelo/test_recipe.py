@@ -0,0 +1,99 @@
+"""Tests for module ``robottelo.cli.recipe``."""
+import threading
+
+import pytest
+
+from robottelo.cli.recipe import Recipe
+from robottelo.cli.recipe import RecipeError
+
+
+class TestRecipe:
+    """Tests for :class:`robottelo.cli.recipe.Recipe`"""
+
+    def test_run(self):
+        recipe = Recipe(max_workers=4)
+        calls = []
+
+        @recipe.step('org')
+        def org(values):
+            calls.append('org')
+            return 1
+
+        @recipe.step('product', requires=['org'])
+        def product(values):
+            calls.append('product')
+            return {'org': values['org'], 'id': 2}
+
+        @recipe.step('repository', requires=['product'])
+        def repository(values):
+            calls.append('repository')
+            return values['product']['id'] + 1
+
+        values = recipe.run()
+        assert values == {'org': 1, 'product': {'org': 1, 'id': 2}, 'repository': 3}
+        assert calls == ['org', 'product', 'repository']
+
+    def test_run_concurrently(self):
+        """The steps requiring the same value run at the same time"""
+        recipe = Recipe(max_workers=2)
+        barrier = threading.Barrier(2, timeout=5)
+
+        @recipe.step('org')
+        def org(values):
+            return 1
+
+        @recipe.step('lce', requires=['org'])
+        def lce(values):
+            barrier.wait()
+            return 'lce'
+
+        @recipe.step('cv', requires=['org'])
+        def cv(values):
+            barrier.wait()
+            return 'cv'
+
+        assert recipe.run() == {'org': 1, 'lce': 'lce', 'cv': 'cv'}
+
+    def test_run_given_values(self):
+        """The steps providing the given values are skipped"""
+        recipe = Recipe(max_workers=1)
+
+        @recipe.step('org')
+        def org(values):
+            raise AssertionError('the organization is given')
+
+        @recipe.step('product', requires=['org'])
+        def product(values):
+            return values['org'] * 2
+
+        assert recipe.run({'org': 21}) == {'org': 21, 'product': 42}
+
+    def test_run_failure(self):
+        """No step is started after a failure, which is raised"""
+        recipe = Recipe(max_workers=1)
+        calls = []
+
+        @recipe.step('org')
+        def org(values):
+            raise ValueError('org failed')
+
+        @recipe.step('product', requires=['org'])
+        def product(values):
+            calls.append('product')
+
+        with pytest.raises(ValueError, match='org failed'):
+            recipe.run()
+        assert calls == []
+
+    def test_run_missing_value(self):
+        recipe = Recipe(max_workers=1)
+        recipe.step('product', requires=['org'])(lambda values: None)
+        with pytest.raises(RecipeError, match="'org'"):
+            recipe.run()
+
+    def test_run_cycle(self):
+        recipe = Recipe(max_workers=1)
+        recipe.step('org', requires=['product'])(lambda values: None)
+        recipe.step('product', requires=['org'])(lambda values: None)
+        with pytest.raises(RecipeError, match='depend on each other'):
+            recipe.run()
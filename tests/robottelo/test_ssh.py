@@ -1,5 +1,9 @@
 """Tests for module ``robottelo.ssh``."""
+import asyncio
+import hashlib
 import os
+import threading
+import time
 from io import StringIO
 from unittest import mock
 
@@ -10,24 +14,70 @@ from robottelo import ssh
 
 
 class MockChannel:
-    def __init__(self, ret, status_ready=True):
+    """A mock ``paramiko.Channel`` serving the given stdout and stderr.
+
+    When ``status_ready`` is false the command keeps running until
+    :meth:`send` is called with ``exit=True``.
+    """
+
+    def __init__(self, ret, status_ready=True, stdout=b'', stderr=b''):
         self.ret = ret
-        self.status_ready = status_ready
+        self.stdout = b''
+        self.stderr = b''
+        self.status_event = threading.Event()
+        self.eof_received = False
+        self.closed = False
+        self._pipe = os.pipe()
+        self.send(stdout, stderr, exit=status_ready)
+
+    def send(self, stdout=b'', stderr=b'', exit=False):
+        """Simulate data, end of file and exit status received from server"""
+        self.stdout += stdout.encode() if isinstance(stdout, str) else stdout
+        self.stderr += stderr.encode() if isinstance(stderr, str) else stderr
+        if exit:
+            self.eof_received = True
+            self.status_event.set()
+        os.write(self._pipe[1], b'x')
+
+    def fileno(self):
+        return self._pipe[0]
+
+    def recv_ready(self):
+        return bool(self.stdout)
+
+    def recv(self, nbytes):
+        data, self.stdout = self.stdout[:nbytes], self.stdout[nbytes:]
+        return data
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, nbytes):
+        data, self.stderr = self.stderr[:nbytes], self.stderr[nbytes:]
+        return data
 
     def recv_exit_status(self):
         return self.ret
 
     def exit_status_ready(self):
-        return self.status_ready
+        return self.status_event.is_set()
+
+    def close(self):
+        self.closed = True
 
 
 class MockStdout:
-    def __init__(self, cmd, ret):
-        self.cmd = cmd
-        self.channel = MockChannel(ret=ret)
+    def __init__(self, channel):
+        self.channel = channel
+
 
-    def read(self):
-        return self.cmd
+class MockTransport:
+    def __init__(self):
+        self.active = True
+        self.sock = mock.Mock()
+
+    def is_active(self):
+        return self.active
 
 
 class MockSSHClient:
@@ -51,6 +101,7 @@ class MockSSHClient:
         self.pkey = None
         self.password = None
         self.ret_code = 0
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):
         """A no-op stub method."""
@@ -90,9 +141,14 @@ class MockSSHClient:
     def close(self):
         """A no-op stub method."""
         self.close_ += 1
+        self.transport.active = False
+
+    def get_transport(self):
+        return self.transport
 
     def exec_command(self, cmd, *args, **kwargs):
-        return (self.ret_code, MockStdout(cmd, self.ret_code), MockStdout('', self.ret_code))
+        channel = MockChannel(self.ret_code, stdout=cmd)
+        return (self.ret_code, MockStdout(channel), MockStdout(channel))
 
 
 class TestSSH:
@@ -285,6 +341,32 @@ class TestSSH:
             assert ret.stdout == ['ls -la']
             assert isinstance(ret, ssh.SSHCommandResult)
 
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_command_hook(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        records = []
+        ssh.add_command_hook(records.append)
+        try:
+            with ssh.get_connection() as connection:
+                ssh.execute_command('ls -la', connection)
+                ssh.execute_command(b'pwd', connection)
+        finally:
+            ssh.remove_command_hook(records.append)
+        assert [record.command for record in records] == ['ls -la', 'pwd']
+        assert [record.hostname for record in records] == ['example.com'] * 2
+        assert [record.bytes_received for record in records] == [6, 3]
+        assert records[0].connect_time > 0
+        assert records[1].connect_time == 0
+        assert all(record.return_code == 0 for record in records)
+        assert all(record.exec_time >= 0 for record in records)
+        assert records[0].nodeid == os.environ['PYTEST_CURRENT_TEST'].split()[0]
+
     @mock.patch('robottelo.ssh.settings')
     def test_execute_command_base_output(self, settings):
         ssh._call_paramiko_sshclient = MockSSHClient
@@ -356,5 +438,346 @@ class TestSSH:
         assert ret.stdout == {'a': '1', 'b': True}
         assert isinstance(ret, ssh.SSHCommandResult)
 
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_command_returns_on_exit_status(self, settings):
+        """The command result is returned as soon as the exit status is
+        received, without waiting for a polling interval.
+        """
+        settings.ssh_client.connection_timeout = 10
+        channel = MockChannel(ret=0, status_ready=False)
+        connection = mock.Mock()
+        connection.exec_command.return_value = (None, MockStdout(channel), MockStdout(channel))
+        threading.Timer(0.05, channel.send, ('ls -la',), {'exit': True}).start()
+        start = time.monotonic()
+        ret = ssh.execute_command('ls -la', connection, timeout=10)
+        assert time.monotonic() - start < 0.5
+        assert ret.stdout == ['ls -la']
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_command_timeout(self, settings):
+        settings.ssh_client.connection_timeout = 10
+        channel = MockChannel(ret=0, status_ready=False)
+        connection = mock.Mock()
+        connection.exec_command.return_value = (None, MockStdout(channel), MockStdout(channel))
+        with pytest.raises(ssh.SSHCommandTimeoutError):
+            ssh.execute_command('ls -la', connection, timeout=0.1)
+        assert channel.closed
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_command_drains_output_while_running(self, settings):
+        """Output is read while the command runs and both streams are kept
+        apart, even when the data arrives after the exit status.
+        """
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.output_spool_size = 16
+        channel = MockChannel(ret=3, status_ready=False)
+        connection = mock.Mock()
+        connection.exec_command.return_value = (None, MockStdout(channel), MockStdout(channel))
+        channel.send('first line\n', 'warning\n')
+        channel.status_event.set()
+        threading.Timer(0.05, channel.send, ('last line', 'error'), {'exit': True}).start()
+        ret = ssh.execute_command('cmd', connection, output_format='base', timeout=10)
+        assert ret.stdout == 'first line\nlast line'
+        assert ret.stderr == 'warning\nerror'
+        assert ret.return_code == 3
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_stream_command(self, settings):
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.output_spool_size = 16
+        channel = MockChannel(ret=0, status_ready=False)
+        connection = mock.MagicMock()
+        connection.exec_command.return_value = (None, MockStdout(channel), MockStdout(channel))
+        with mock.patch('robottelo.ssh._get_connection') as get_connection:
+            get_connection.return_value.__enter__.return_value = connection
+            stream = ssh.stream_command('cat file', hostname='example.com')
+            lines = iter(stream)
+            channel.send('line 1\nline', '\x1b[31merror\x1b[0m')
+            assert next(lines) == 'line 1'
+            channel.send(' 2\nchår'.encode()[:-1])
+            assert next(lines) == 'line 2'
+            channel.send('chår'.encode()[-1:], exit=True)
+            assert list(lines) == ['chår']
+        assert stream.return_code == 0
+        assert stream.stderr == 'error'
+        assert channel.closed
+
     def test_call_paramiko_client(self):
         assert isinstance(ssh._call_paramiko_sshclient(), (paramiko.SSHClient, MockSSHClient))
+
+
+class TestSSHConnectionPool:
+    """Tests for the ``robottelo.ssh`` connection pool."""
+
+    @pytest.fixture(autouse=True)
+    def settings(self):
+        ssh._call_paramiko_sshclient = MockSSHClient
+        ssh.close_pooled_connections()
+        with mock.patch('robottelo.ssh.settings') as settings:
+            settings.server.hostname = 'example.com'
+            settings.server.ssh_username = 'nobody'
+            settings.server.ssh_key = None
+            settings.server.ssh_password = 'test_password'
+            settings.ssh_client.command_timeout = 300
+            settings.ssh_client.connection_timeout = 10
+            settings.ssh_client.connection_pooling = True
+            settings.ssh_client.pool_idle_timeout = 60
+            settings.ssh_client.pool_max_idle = 4
+            yield settings
+        ssh.close_pooled_connections()
+
+    def test_connection_is_reused(self):
+        with ssh.get_pooled_connection() as first:
+            pass
+        with ssh.get_pooled_connection() as second:
+            assert first is second
+        assert second.connect_ == 1
+        assert second.close_ == 0
+
+    def test_connection_is_keyed_by_host_and_credentials(self):
+        with ssh.get_pooled_connection() as first:
+            pass
+        with ssh.get_pooled_connection(hostname='other.example.com') as second:
+            assert first is not second
+        with ssh.get_pooled_connection(password='other_password') as third:
+            assert third not in (first, second)
+
+    def test_concurrent_checkouts_get_distinct_connections(self):
+        with ssh.get_pooled_connection() as first:
+            with ssh.get_pooled_connection() as second:
+                assert first is not second
+
+    def test_dead_connection_is_replaced(self):
+        with ssh.get_pooled_connection() as first:
+            pass
+        first.transport.active = False
+        with ssh.get_pooled_connection() as second:
+            assert first is not second
+        assert first.close_ == 1
+
+    def test_idle_connection_is_evicted(self, settings):
+        with ssh.get_pooled_connection() as first:
+            pass
+        settings.ssh_client.pool_idle_timeout = -1
+        with ssh.get_pooled_connection() as second:
+            assert first is not second
+        assert first.close_ == 1
+
+    def test_max_idle_connections(self, settings):
+        settings.ssh_client.pool_max_idle = 1
+        with ssh.get_pooled_connection() as first:
+            with ssh.get_pooled_connection() as second:
+                pass
+        # the least recently released connection is evicted
+        assert second.close_ == 1
+        assert first.close_ == 0
+
+    def test_connection_discarded_on_error(self):
+        with pytest.raises(ValueError):
+            with ssh.get_pooled_connection() as first:
+                raise ValueError
+        assert first.close_ == 1
+
+    def test_command_uses_pool(self):
+        clients = []
+        ssh._call_paramiko_sshclient = lambda: clients.append(MockSSHClient()) or clients[-1]
+        ssh.command('ls -la')
+        ssh.command('ls -la')
+        assert len(clients) == 1
+        assert clients[0].close_ == 0
+
+    def test_command_without_pool(self, settings):
+        settings.ssh_client.connection_pooling = False
+        clients = []
+        ssh._call_paramiko_sshclient = lambda: clients.append(MockSSHClient()) or clients[-1]
+        ssh.command('ls -la')
+        ssh.command('ls -la')
+        assert len(clients) == 2
+        assert all(client.close_ == 1 for client in clients)
+
+    def test_command_reconnects_when_transport_dies(self):
+        with ssh.get_pooled_connection() as first:
+            pass
+        first.exec_command = mock.Mock(side_effect=paramiko.SSHException('not active'))
+        ret = ssh.command('ls -la')
+        assert ret.stdout == ['ls -la']
+        assert first.close_ == 1
+
+    def test_command_does_not_retry_started_command(self):
+        """A command failing after being started is not run again"""
+        with ssh.get_pooled_connection() as first:
+            pass
+        first.exec_command = mock.Mock(wraps=first.exec_command)
+        with mock.patch.object(
+            ssh, '_iter_channel', side_effect=paramiko.SSHException('not active')
+        ):
+            with pytest.raises(paramiko.SSHException):
+                ssh.command('ls -la')
+        assert first.exec_command.call_count == 1
+
+    def test_command_does_not_retry_new_connection(self):
+        with mock.patch.object(
+            MockSSHClient, 'exec_command', side_effect=paramiko.SSHException('not active')
+        ) as exec_command:
+            with pytest.raises(paramiko.SSHException):
+                ssh.command('ls -la')
+        assert exec_command.call_count == 1
+
+    def test_command_many_sequential(self):
+        clients = []
+        ssh._call_paramiko_sshclient = lambda: clients.append(MockSSHClient()) or clients[-1]
+        results = ssh.command_many(['ls', 'pwd', 'id'], parallel=False)
+        assert [result.stdout for result in results] == [['ls'], ['pwd'], ['id']]
+        assert len(clients) == 1
+
+    def test_command_many_parallel(self):
+        clients = []
+        ssh._call_paramiko_sshclient = lambda: clients.append(MockSSHClient()) or clients[-1]
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def exec_command(cmd, *args, **kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            channel = MockChannel(0, stdout=cmd)
+            return 0, MockStdout(channel), MockStdout(channel)
+
+        with mock.patch.object(MockSSHClient, 'exec_command', side_effect=exec_command):
+            cmds = [f'echo {i}' for i in range(5)]
+            results = ssh.command_many(cmds, max_channels=3)
+        assert [result.stdout for result in results] == [[cmd] for cmd in cmds]
+        assert len(clients) == 1
+        assert state['peak'] == 3
+
+
+class MockSFTPClient:
+    """A mock ``paramiko.SFTPClient`` storing files in the ``remote`` dict"""
+
+    def __init__(self, remote):
+        self.remote = remote
+
+    def put(self, local_file, remote_file):
+        with open(local_file, 'rb') as handler:
+            self.remote[remote_file] = [handler.read(), 0]
+
+    def stat(self, remote_file):
+        if remote_file not in self.remote:
+            raise FileNotFoundError(remote_file)
+        content, mtime = self.remote[remote_file]
+        return paramiko.SFTPAttributes.from_stat(
+            os.stat_result((0, 0, 0, 0, 0, 0, len(content), 0, mtime, 0))
+        )
+
+    def utime(self, remote_file, times):
+        self.remote[remote_file][1] = int(times[1])
+
+    def close(self):
+        pass
+
+
+class TestUploadFiles:
+    """Tests for ``robottelo.ssh.upload_files``."""
+
+    @pytest.fixture
+    def local_dir(self, tmp_path):
+        for index in range(5):
+            (tmp_path / f'file{index}.txt').write_text(f'content {index}')
+        (tmp_path / 'ignored.xml').write_text('ignored')
+        return tmp_path
+
+    @pytest.fixture
+    def connection(self):
+        connection = mock.MagicMock()
+        connection.remote = {}
+        connection.open_sftp.side_effect = lambda: MockSFTPClient(connection.remote)
+        connection.sha256sum_output = ''
+        with mock.patch('robottelo.ssh._get_connection') as get_connection, mock.patch(
+            'robottelo.ssh.execute_command'
+        ) as execute_command:
+            get_connection.return_value.__enter__.return_value = connection
+            execute_command.side_effect = lambda cmd, *args, **kwargs: ssh.SSHCommandResult(
+                stdout=connection.sha256sum_output
+            )
+            yield connection
+
+    def test_upload_files(self, local_dir, connection):
+        uploaded = ssh.upload_files(local_dir, '/remote')
+        assert uploaded == [f'/remote/file{index}.txt' for index in range(5)]
+        assert connection.remote['/remote/file3.txt'][0] == b'content 3'
+        assert connection.open_sftp.call_count == 1
+
+    def test_upload_files_parallel(self, local_dir, connection):
+        uploaded = ssh.upload_files(local_dir, '/remote', workers=3)
+        assert uploaded == [f'/remote/file{index}.txt' for index in range(5)]
+        assert connection.open_sftp.call_count == 3
+
+    def test_upload_files_incremental(self, local_dir, connection):
+        assert len(ssh.upload_files(local_dir, '/remote', incremental=True)) == 5
+        assert ssh.upload_files(local_dir, '/remote', incremental=True) == []
+        (local_dir / 'file1.txt').write_text('new content 1')
+        assert ssh.upload_files(local_dir, '/remote', incremental=True) == ['/remote/file1.txt']
+        assert connection.remote['/remote/file1.txt'][0] == b'new content 1'
+
+    def test_upload_files_incremental_checksum(self, local_dir, connection):
+        checksum = hashlib.sha256(b'content 2').hexdigest()
+        connection.sha256sum_output = f'{checksum}  file2.txt\n{checksum}  file3.txt\n'
+        uploaded = ssh.upload_files(local_dir, '/remote', incremental=True, checksum=True)
+        assert uploaded == [f'/remote/file{index}.txt' for index in (0, 1, 3, 4)]
+
+
+class TestSSHAsync:
+    """Tests for the ``robottelo.ssh`` asyncio API."""
+
+    @pytest.fixture
+    def command(self):
+        """Mock ``ssh.command`` recording the peak number of concurrent calls"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def command(cmd, hostname=None, **kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            if hostname == 'broken.example.com':
+                raise ssh.SSHCommandTimeoutError(cmd)
+            return ssh.SSHCommandResult(stdout=[f'{cmd}@{hostname}'])
+
+        with mock.patch('robottelo.ssh.command', side_effect=command) as mocked:
+            mocked.state = state
+            yield mocked
+
+    def test_acommand(self, command):
+        result = asyncio.run(ssh.acommand('ls', hostname='a.example.com', timeout=5))
+        assert isinstance(result, ssh.SSHCommandResult)
+        assert result.stdout == ['ls@a.example.com']
+        assert command.call_args[1]['timeout'] == 5
+
+    def test_agather(self, command):
+        hostnames = [f'host{i}.example.com' for i in range(6)]
+        results = asyncio.run(ssh.agather('ls', hostnames, concurrency=3))
+        assert [result.stdout for result in results] == [[f'ls@{h}'] for h in hostnames]
+        assert command.state['peak'] == 3
+
+    def test_agather_commands_per_host(self, command):
+        cmds = {'a.example.com': 'ls', 'b.example.com': 'pwd'}
+        results = asyncio.run(ssh.agather(cmds, cmds.keys()))
+        assert [result.stdout for result in results] == [
+            ['ls@a.example.com'],
+            ['pwd@b.example.com'],
+        ]
+
+    def test_agather_errors(self, command):
+        hostnames = ['a.example.com', 'broken.example.com']
+        with pytest.raises(ssh.SSHCommandTimeoutError):
+            asyncio.run(ssh.agather('ls', hostnames))
+        results = asyncio.run(ssh.agather('ls', hostnames, return_exceptions=True))
+        assert results[0].stdout == ['ls@a.example.com']
+        assert isinstance(results[1], ssh.SSHCommandTimeoutError)
@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_plugins import ssh_metrics
+from robottelo import ssh
+
+
+def make_record(hostname='example.com', command='ls', exec_time=1.0, return_code=0, nodeid='t'):
+    return {
+        'hostname': hostname,
+        'command': command,
+        'connect_time': 0.5,
+        'exec_time': exec_time,
+        'bytes_sent': len(command),
+        'bytes_received': 10,
+        'return_code': return_code,
+        'nodeid': nodeid,
+    }
+
+
+class TestSSHMetrics:
+    """Tests for the ``pytest_plugins.ssh_metrics`` report."""
+
+    @pytest.mark.parametrize(
+        'command, prefix',
+        [
+            ('ls -la', 'ls'),
+            ('/usr/bin/yum install -y foo', 'yum'),
+            (
+                'LANG=en_US.UTF-8 time -p hammer -v -u admin -p changeme host list',
+                'hammer host list',
+            ),
+            (
+                'LANG=en_US  hammer -v --interactive no --output=csv org info --id 1',
+                'hammer org info',
+            ),
+            ('hammer -v -u admin -p changeme --output json ping', 'hammer ping'),
+            ('', ''),
+        ],
+    )
+    def test_command_prefix(self, command, prefix):
+        assert ssh_metrics.command_prefix(command) == prefix
+
+    def test_build_report(self):
+        records = [make_record(exec_time=float(time)) for time in range(1, 101)]
+        records.append(make_record('other.com', 'hammer -v host list', 5.0, 1, 'slow'))
+        report = ssh_metrics.build_report(records)
+        total = report['total']
+        assert total['count'] == 101
+        assert total['failed'] == 1
+        assert total['connect_time'] == 50.5
+        assert report['hosts']['example.com']['p50'] == 50.0
+        assert report['hosts']['example.com']['p95'] == 95.0
+        assert report['hosts']['example.com']['max'] == 100.0
+        assert report['hosts']['other.com']['p99'] == 5.0
+        assert set(report['commands']) == {'ls', 'hammer host list'}
+        assert list(report['tests']) == ['t', 'slow']
+
+    def test_build_report_without_records(self):
+        assert ssh_metrics.build_report([])['total'] is None
+
+    def test_recorder(self):
+        recorder = ssh_metrics.SSHMetricsRecorder()
+        record = ssh.SSHCommandRecord(**make_record())
+        recorder(record)
+        assert recorder.records == [make_record()]
+        json.dumps(ssh_metrics.build_report(recorder.records))
+
+    def test_merge_worker_records(self, tmp_path):
+        """The workers write their records, merged by the controller"""
+        path = str(tmp_path / 'report.json')
+        for workerid, hostname in (('gw0', 'a.example.com'), ('gw1', 'b.example.com')):
+            worker = SimpleNamespace(workerinput={'workerid': workerid})
+            assert ssh_metrics.merge_worker_records(worker, path, [make_record(hostname)]) is None
+        records = ssh_metrics.merge_worker_records(SimpleNamespace(), path, [make_record()])
+        assert sorted(record['hostname'] for record in records) == [
+            'a.example.com',
+            'b.example.com',
+            'example.com',
+        ]
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,86 @@
+"""Tests of ``robottelo.ssh`` over a real SSH connection to the local
+stand-in server
+"""
+import os
+from unittest import mock
+
+import pytest
+
+from robottelo import ssh
+from tests.robottelo.ssh_server import sized_output
+from tests.robottelo.ssh_server import SSHServer
+
+
+@pytest.fixture
+def ssh_server():
+    # the other tests may have left a mock client in place
+    with SSHServer() as server, mock.patch(
+        'robottelo.ssh._call_paramiko_sshclient', ssh.SSHClient
+    ):
+        yield server
+
+
+class TestSSHServer:
+    """Tests for ``robottelo.ssh`` against ``tests.robottelo.ssh_server``."""
+
+    def test_command(self, ssh_server):
+        ssh_server.script(r'^ls', stdout=b'file1\nfile2\n', stderr=b'warning\n', return_code=2)
+        result = ssh.command('ls -la', **ssh_server.connection_kwargs)
+        assert result.stdout == ['file1', 'file2', '']
+        assert result.stderr == 'warning\n'
+        assert result.return_code == 2
+        assert ssh_server.commands == ['ls -la']
+
+    def test_command_not_scripted(self, ssh_server):
+        result = ssh.command('unknown', **ssh_server.connection_kwargs)
+        assert result.return_code == 127
+
+    def test_command_large_output(self, ssh_server):
+        output = sized_output(5 * 1024 * 1024)
+        ssh_server.script('cat', stdout=output)
+        result = ssh.command('cat', output_format='plain', **ssh_server.connection_kwargs)
+        assert result.stdout.encode() == output
+
+    def test_command_reuses_connection(self, ssh_server):
+        ssh_server.script('true')
+        with ssh_server.patch():
+            for _ in range(3):
+                assert ssh.command('true').return_code == 0
+        assert ssh_server.connections == 1
+
+    def test_command_timeout(self, ssh_server):
+        ssh_server.script('sleep', latency=5)
+        with pytest.raises(ssh.SSHCommandTimeoutError):
+            ssh.command('sleep 5', timeout=0.2, **ssh_server.connection_kwargs)
+
+    def test_stream_command(self, ssh_server):
+        ssh_server.script('tail', stdout=b'line1\nline2\n')
+        stream = ssh.stream_command('tail', **ssh_server.connection_kwargs)
+        assert list(stream) == ['line1', 'line2']
+        assert stream.return_code == 0
+
+    def test_command_many(self, ssh_server):
+        ssh_server.script('echo', stdout=lambda command: command[5:].encode())
+        cmds = [f'echo {index}' for index in range(20)]
+        results = ssh.command_many(cmds, **ssh_server.connection_kwargs)
+        assert [result.stdout for result in results] == [[str(index)] for index in range(20)]
+        assert ssh_server.connections == 1
+
+    def test_upload_download_file(self, ssh_server, tmp_path):
+        local_file = tmp_path / 'file'
+        local_file.write_bytes(sized_output(1024 * 1024))
+        with ssh_server.patch():
+            ssh.upload_file(str(local_file), '/file')
+            ssh.download_file('/file', str(tmp_path / 'downloaded'))
+        assert (tmp_path / 'downloaded').read_bytes() == local_file.read_bytes()
+        assert os.path.exists(os.path.join(ssh_server.root, 'file'))
+
+    def test_upload_files_incremental(self, ssh_server, tmp_path):
+        os.mkdir(os.path.join(ssh_server.root, 'remote'))
+        ssh_server.script('mkdir')
+        for index in range(4):
+            (tmp_path / f'file{index}.txt').write_text(f'content {index}')
+        with ssh_server.patch():
+            uploaded = ssh.upload_files(tmp_path, '/remote', workers=2, incremental=True)
+            assert len(uploaded) == 4
+            assert ssh.upload_files(tmp_path, '/remote', workers=2, incremental=True) == []